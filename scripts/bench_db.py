@@ -0,0 +1,81 @@
+"""Rows/s of the runner's DB writes (one case row + one seen-text row per eval).
+
+Compares a commit per row on the caller's thread (what crash-safe per-row writes would
+cost) with `BatchWriter`, which commits in batches on a background thread.  The
+producer time is what the event loop would spend; the total includes the final drain.
+
+Usage (from the repo root): PYTHONPATH=. python scripts/bench_db.py [--rows 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import pathlib
+import tempfile
+import time
+import uuid
+
+from tts_bug_finder.db import BatchWriter, BugDB
+
+
+def _rows(n: int) -> list[tuple[dict, tuple[str, str, str]]]:
+    out = []
+    for i in range(n):
+        text = f"测试句子第{i}号，今天的温度是{i % 40}度。"
+        out.append(
+            (
+                {
+                    "id": str(uuid.uuid4()),
+                    "created_at": "2026-01-01T00:00:00+00:00",
+                    "ref_text": text,
+                    "hyp_text": text[::-1],
+                    "cer": 0.5,
+                    "wer": 0.0,
+                    "score_total": 42.0,
+                    "tags": "[]",
+                    "status": "rejected",
+                },
+                (hashlib.sha1(text.encode("utf-8")).hexdigest(), text, "2026-01-01T00:00:00+00:00"),
+            )
+        )
+    return out
+
+
+def _per_row_commit(path: pathlib.Path, rows: list) -> tuple[float, float]:
+    with BugDB(path) as db:
+        t0 = time.perf_counter()
+        for row, (key, norm, ts) in rows:
+            db.mark_text_seen(text_key=key, text_norm=norm, first_seen_at=ts)
+            db.upsert_case(row)
+            db.conn.commit()
+        dt = time.perf_counter() - t0
+    return dt, dt
+
+
+def _batch_writer(path: pathlib.Path, rows: list) -> tuple[float, float]:
+    with BugDB(path):
+        pass
+    t0 = time.perf_counter()
+    with BatchWriter(path) as writer:
+        for row, (key, norm, ts) in rows:
+            writer.mark_text_seen(text_key=key, text_norm=norm, first_seen_at=ts)
+            writer.upsert_case(row)
+        produced = time.perf_counter() - t0
+    return produced, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20000)
+    args = ap.parse_args()
+    rows = _rows(args.rows)
+    print(f"{len(rows)} evals (2 statements each)")
+    with tempfile.TemporaryDirectory() as td:
+        for name, fn in (("commit per row", _per_row_commit), ("BatchWriter", _batch_writer)):
+            produced, total = fn(pathlib.Path(td) / f"{name.replace(' ', '_')}.sqlite", rows)
+            print(f"{name:<16} {len(rows) / produced:10.0f} rows/s (caller)  {len(rows) / total:10.0f} rows/s (committed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Micro-benchmarks for the alignment kernels in `tts_bug_finder.metrics`.
+
+Usage (from the repo root): PYTHONPATH=. python scripts/bench_metrics.py [--pairs 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+from tts_bug_finder.metrics import align_tokens, batch_edit_distance, edit_distance, intern_pairs
+from tts_bug_finder.seeds import SEEDS
+
+# The reference implementations live with the tests that check against them.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "tests"))
+from _reference import align_tokens_dp  # noqa: E402
+
+
+def _make_pairs(count: int, rng: random.Random) -> list[tuple[list[str], list[str]]]:
+    pairs: list[tuple[list[str], list[str]]] = []
+    texts = [s.text for s in SEEDS]
+    for _ in range(count):
+        ref = ""
+        while len(ref) < 300 + rng.randrange(150):
+            ref += rng.choice(texts)
+        hyp = list(ref)
+        for _ in range(len(hyp) // 8):
+            k = rng.randrange(len(hyp))
+            op = rng.randrange(3)
+            if op == 0:
+                hyp[k] = rng.choice(ref)
+            elif op == 1:
+                del hyp[k]
+            else:
+                hyp.insert(k, rng.choice(ref))
+        pairs.append((list(ref), hyp))
+    return pairs
+
+
+def _bench(name: str, fn, pairs) -> float:
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        fn(a, b)
+    dt = time.perf_counter() - t0
+    print(f"{name:<28} {len(pairs) / dt:10.1f} pairs/s  ({1000.0 * dt / len(pairs):.3f} ms/pair)")
+    return dt
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    pairs = _make_pairs(args.pairs, random.Random(args.seed))
+    print(f"{len(pairs)} pairs, mean ref len {sum(len(a) for a, _ in pairs) / len(pairs):.0f} tokens")
+    for a, b in pairs:
+        if align_tokens(a, b) != align_tokens_dp(a, b):
+            raise SystemExit("align_tokens differs from reference DP")
+    base = _bench("reference DP", align_tokens_dp, pairs)
+    fast = _bench("align_tokens (bit-parallel)", align_tokens, pairs)
+    dist = _bench("edit_distance (no opcodes)", edit_distance, pairs)
+    print(f"speedup: align_tokens x{base / fast:.1f}, edit_distance x{base / dist:.1f}")
+
+    a_ids, b_ids = intern_pairs(pairs)
+    t0 = time.perf_counter()
+    batched = batch_edit_distance(a_ids, b_ids)
+    dt = time.perf_counter() - t0
+    if batched != [edit_distance(a, b) for a, b in pairs]:
+        raise SystemExit("batch_edit_distance differs from edit_distance")
+    print(f"{'batch_edit_distance':<28} {len(pairs) / dt:10.1f} pairs/s  ({1000.0 * dt / len(pairs):.3f} ms/pair)")
+
+
+if __name__ == "__main__":
+    main()
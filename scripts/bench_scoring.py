@@ -0,0 +1,134 @@
+"""Per-eval CPU cost of `tts_bug_finder.scoring.evaluate_pair`.
+
+Compares the text analysis evaluate_pair needs when every helper re-normalizes and
+re-tokenizes its input (the old call pattern) with a shared `TextView` per text, and
+the one-pass number/negation scanners with the per-regex reference implementations, and
+the Traditional->Simplified fast path with plain OpenCC.
+
+Usage (from the repo root): PYTHONPATH=. python scripts/bench_scoring.py [--pairs 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+from tts_bug_finder.mutators import mutate_all
+from tts_bug_finder.scoring import evaluate_pair
+from tts_bug_finder.seeds import SEEDS
+from tts_bug_finder.text_utils import (
+    TextView,
+    _negation_markers_nfkc,
+    _number_tokens_nfkc,
+    extract_negation_markers,
+    extract_number_tokens,
+    guess_language,
+    tokenize_cer,
+    tokenize_wer,
+)
+from tts_bug_finder.zh_normalize import _convert_t2s, _get_opencc_t2s, normalize_for_eval
+
+# The reference implementations live with the tests that check against them.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "tests"))
+from _reference import negation_markers_reference, number_tokens_reference  # noqa: E402
+
+
+def _make_pairs(count: int, rng: random.Random) -> list[tuple[str, str]]:
+    pairs: list[tuple[str, str]] = []
+    while len(pairs) < count:
+        seed = rng.choice(SEEDS)
+        cands = mutate_all(seed.text, seed.tags, rng)
+        hyp = rng.choice(cands).text if cands else seed.text
+        pairs.append((seed.text, hyp))
+    return pairs
+
+
+def _tokens(text: str, lang: str) -> list[str]:
+    return tokenize_wer(text) if lang == "en" else tokenize_cer(text)
+
+
+def _analysis_per_call(ref: str, hyp: str) -> None:
+    lang = guess_language(ref)
+    for _ in range(3):  # alignment, len_ratio, top_substitutions
+        _tokens(ref, lang)
+        _tokens(hyp, lang)
+    extract_number_tokens(ref)
+    extract_number_tokens(hyp)
+    extract_negation_markers(ref)
+    extract_negation_markers(hyp)
+
+
+def _analysis_view(ref: str, hyp: str) -> None:
+    ref_view = TextView(ref)
+    hyp_view = TextView(hyp)
+    lang = ref_view.language
+    for _ in range(3):
+        ref_view.tokens(lang)
+        hyp_view.tokens(lang)
+    ref_view.number_tokens
+    hyp_view.number_tokens
+    ref_view.negations
+    hyp_view.negations
+
+
+def _bench(name: str, fn, pairs) -> float:
+    t0 = time.process_time()
+    for ref, hyp in pairs:
+        fn(ref, hyp)
+    dt = time.process_time() - t0
+    print(f"{name:<32} {1e6 * dt / len(pairs):9.1f} us/eval (cpu)")
+    return dt
+
+
+def _bench_scanner(name: str, fn, texts: list[str]) -> float:
+    t0 = time.perf_counter()
+    for text in texts:
+        fn(text)
+    dt = time.perf_counter() - t0
+    print(f"{name:<32} {len(texts) / dt:9.0f} texts/s")
+    return dt
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    raw = _make_pairs(args.pairs, random.Random(args.seed))
+    pairs = [(normalize_for_eval(r), normalize_for_eval(h)) for r, h in raw]
+    print(f"{len(pairs)} pairs")
+    old = _bench("text analysis, per-helper", _analysis_per_call, pairs)
+    new = _bench("text analysis, TextView", _analysis_view, pairs)
+    print(f"text analysis speedup x{old / new:.2f}")
+
+    texts = [t for pair in pairs for t in pair]
+    for text in texts:
+        if _number_tokens_nfkc(text) != number_tokens_reference(text):
+            raise SystemExit(f"number scanner differs from reference on {text!r}")
+        if _negation_markers_nfkc(text) != negation_markers_reference(text):
+            raise SystemExit(f"negation scanner differs from reference on {text!r}")
+    old = _bench_scanner("numbers, one regex at a time", number_tokens_reference, texts)
+    new = _bench_scanner("numbers, one-pass scanner", _number_tokens_nfkc, texts)
+    print(f"number scan speedup x{old / new:.2f}")
+    old = _bench_scanner("negations, per-marker search", negation_markers_reference, texts)
+    new = _bench_scanner("negations, Aho-Corasick", _negation_markers_nfkc, texts)
+    print(f"negation scan speedup x{old / new:.2f}")
+
+    cc = _get_opencc_t2s()
+    if cc:
+        texts = [t for pair in raw for t in pair]
+        for text in texts:
+            if _convert_t2s.__wrapped__(text) != cc.convert(text):
+                raise SystemExit(f"t2s fast path differs from OpenCC on {text!r}")
+        old = _bench_scanner("t2s, OpenCC convert", cc.convert, texts)
+        new = _bench_scanner("t2s, fast path (uncached)", _convert_t2s.__wrapped__, texts)
+        print(f"t2s speedup x{old / new:.2f}")
+    _bench("evaluate_pair (end to end)", lambda r, h: evaluate_pair(ref_text=r, hyp_text=h), raw)
+
+
+if __name__ == "__main__":
+    main()
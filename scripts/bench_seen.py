@@ -0,0 +1,118 @@
+"""Disk and memory cost of the persisted seen-text store.
+
+Builds the same N entries in the old layout (`seen_texts`: hex SHA1 TEXT key + text +
+ISO timestamp, with a rowid and a timestamp index) and in `seen_keys` (8-byte BLOB
+keys, WITHOUT ROWID, with and without text), then reports the file size, the time to
+load the keys at startup, the memory they take (tracemalloc) and lookup throughput for
+the old `set[str]` of hex keys and for `SeenSet`.
+
+Usage (from the repo root): PYTHONPATH=. python scripts/bench_seen.py [--entries 10000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import pathlib
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from tts_bug_finder.db import BugDB, seen_key
+
+_BATCH = 100000
+
+
+def _texts(start: int, stop: int) -> list[str]:
+    return [f"测试句子第{i}号，温度是{i % 40}度，请注意保暖。" for i in range(start, stop)]
+
+
+def _build_old(path: pathlib.Path, n: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE seen_texts (text_key TEXT PRIMARY KEY, text_norm TEXT, first_seen_at TEXT NOT NULL)")
+    conn.execute("CREATE INDEX idx_seen_first_seen ON seen_texts(first_seen_at)")
+    for i in range(0, n, _BATCH):
+        rows = [
+            (hashlib.sha1(t.encode("utf-8")).hexdigest(), t, "2026-01-01T00:00:00.000000+00:00")
+            for t in _texts(i, min(n, i + _BATCH))
+        ]
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO seen_texts VALUES (?,?,?)", rows)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+
+def _build_new(path: pathlib.Path, n: int, *, store_text: bool) -> None:
+    with BugDB(path) as db:
+        for i in range(0, n, _BATCH):
+            rows = [(seen_key(t), 1767225600, t if store_text else None) for t in _texts(i, min(n, i + _BATCH))]
+            with db.conn:
+                db.conn.executemany("INSERT OR IGNORE INTO seen_keys VALUES (?,?,?)", rows)
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def _load_old(path: pathlib.Path) -> set[str]:
+    conn = sqlite3.connect(path)
+    keys = {r[0] for r in conn.execute("SELECT text_key FROM seen_texts")}
+    conn.close()
+    return keys
+
+
+def _load_new(path: pathlib.Path):
+    with BugDB(path) as db:
+        return db.load_seen()
+
+
+def _measure(name: str, path: pathlib.Path, load, probes: list, n: int) -> None:
+    t0 = time.perf_counter()
+    store = load(path)
+    load_dt = time.perf_counter() - t0
+    del store
+    # Memory from a second, traced load (tracing slows the load itself down).
+    tracemalloc.start()
+    store = load(path)
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    hits = sum(1 for p in probes if p in store)
+    lookup_dt = time.perf_counter() - t0
+    disk = sum(p.stat().st_size for p in path.parent.glob(path.name + "*"))
+    print(
+        f"{name:<26} disk {disk / 1e6:9.1f} MB ({disk / n:5.1f} B/entry)  load {load_dt:6.2f}s  "
+        f"memory {mem / 1e6:8.1f} MB ({mem / n:5.1f} B/entry)  {len(probes) / lookup_dt / 1e6:5.2f}M lookups/s ({hits} hits)"
+    )
+    del store
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=10_000_000)
+    ap.add_argument("--probes", type=int, default=200_000)
+    args = ap.parse_args()
+    n = args.entries
+    rng = random.Random(0)
+    # Half the probes hit (stored texts), half miss (texts past the end).
+    idx = [rng.randrange(n) if k % 2 else n + k for k in range(args.probes)]
+    texts = [_texts(i, i + 1)[0] for i in idx]
+    print(f"{n} entries, {len(texts)} probes")
+    with tempfile.TemporaryDirectory() as td:
+        root = pathlib.Path(td)
+        old = root / "old" / "bugs.sqlite"
+        old.parent.mkdir()
+        _build_old(old, n)
+        _measure("seen_texts (hex TEXT)", old, _load_old, [hashlib.sha1(t.encode("utf-8")).hexdigest() for t in texts], n)
+        old.unlink()
+        for store_text in (False, True):
+            new = root / f"new_{int(store_text)}" / "bugs.sqlite"
+            new.parent.mkdir()
+            _build_new(new, n, store_text=store_text)
+            name = "seen_keys (8B BLOB" + (", text)" if store_text else ")")
+            _measure(name, new, _load_new, [seen_key(t) for t in texts], n)
+            new.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ cd "$ROOT"
 
 ARTIFACTS_DIR="${ARTIFACTS_DIR:-artifacts_live}"
 DB_PATH="${DB_PATH:-$ARTIFACTS_DIR/bugs.sqlite}"
-REPORT_PATH="${REPORT_PATH:-$ARTIFACTS_DIR/report.html}"
+REPORT_PATH="${REPORT_PATH:-$ARTIFACTS_DIR/report/index.html}"   # + report/index_files/
 
 TTS_KIND="${TTS_KIND:-macos_say}"
 SEED_TAGS="${SEED_TAGS:-}"
@@ -77,11 +77,14 @@ while true; do
   PYTHONUNBUFFERED=1 python -m tts_bug_finder run \
     "${RUN_ARGS[@]}"
 
+  # Only the cases added or changed during this cycle are rendered (see report --incremental).
   python -m tts_bug_finder report \
     --db "$DB_PATH" \
     --out "$REPORT_PATH" \
     --status accepted \
-    --bundle-audio
+    --bundle-audio \
+    --layout sharded \
+    --incremental
 
   echo "Cycle done=$(date). Sleeping ${SLEEP_SEC}s..."
   sleep "$SLEEP_SEC"
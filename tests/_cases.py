@@ -0,0 +1,17 @@
+"""Row builder shared by the tests that fill a `BugDB`."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def case_row(case_id: str, **columns: Any) -> dict[str, Any]:
+    """The NOT NULL columns of a `cases` row (ref_text `参考<case_id>`, accepted), plus `columns`."""
+    return {
+        "id": case_id,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "ref_text": f"参考<{case_id}>",
+        "hyp_text": "识别",
+        "status": "accepted",
+        **columns,
+    }
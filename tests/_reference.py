@@ -0,0 +1,88 @@
+"""Straightforward reference implementations the optimized code is checked against."""
+
+from __future__ import annotations
+
+import re
+from typing import Sequence
+
+from tts_bug_finder import text_utils
+from tts_bug_finder.metrics import Alignment, _merge_steps
+
+
+def align_tokens_dp(a: Sequence[str], b: Sequence[str]) -> Alignment:
+    """Full-matrix DP; `align_tokens` must produce exactly the same result."""
+    n = len(a)
+    m = len(b)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        dp[i][0] = i
+    for j in range(m + 1):
+        dp[0][j] = j
+    for i in range(1, n + 1):
+        ai = a[i - 1]
+        for j in range(1, m + 1):
+            cost = 0 if ai == b[j - 1] else 1
+            dp[i][j] = min(
+                dp[i - 1][j] + 1,  # delete
+                dp[i][j - 1] + 1,  # insert
+                dp[i - 1][j - 1] + cost,  # replace/equal
+            )
+
+    i, j = n, m
+    steps: list[tuple[str, int, int, int, int]] = []
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            if dp[i][j] == dp[i - 1][j - 1] + cost:
+                tag = "equal" if cost == 0 else "replace"
+                steps.append((tag, i - 1, i, j - 1, j))
+                i -= 1
+                j -= 1
+                continue
+        if i > 0 and dp[i][j] == dp[i - 1][j] + 1:
+            steps.append(("delete", i - 1, i, j, j))
+            i -= 1
+            continue
+        if j > 0 and dp[i][j] == dp[i][j - 1] + 1:
+            steps.append(("insert", i, i, j - 1, j))
+            j -= 1
+            continue
+        raise RuntimeError("Backtrace failed")
+
+    steps.reverse()
+
+    return Alignment(distance=dp[n][m], opcodes=_merge_steps(steps))
+
+
+def number_tokens_reference(text: str) -> list[str]:
+    """One `finditer` per regex, then a stable sort."""
+    tokens: list[tuple[int, str]] = []
+
+    for regex in text_utils._NUMBER_REGEXES:
+        for m in regex.finditer(text):
+            tokens.append((m.start(), m.group(0)))
+
+    tokens.sort(key=lambda x: x[0])
+    merged: list[str] = []
+    last_start = -10
+    last_tok = ""
+    for start, tok in tokens:
+        if merged and start == last_start and tok == last_tok:
+            continue
+        merged.append(tok)
+        last_start = start
+        last_tok = tok
+    return merged
+
+
+def negation_markers_reference(text_nfkc: str) -> set[str]:
+    """Substring/regex search per marker."""
+    found: set[str] = set()
+    for t in text_utils._NEG_ZH:
+        if t in text_nfkc:
+            found.add(t)
+    low = text_nfkc.lower()
+    for w in text_utils._NEG_EN:
+        if re.search(rf"(?<![A-Za-z]){re.escape(w)}(?![A-Za-z])", low):
+            found.add(w)
+    return found
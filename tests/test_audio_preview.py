@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import io
+import math
+import pathlib
+import struct
+import tempfile
+import unittest
+import wave
+
+from tts_bug_finder import audio_preview
+from tts_bug_finder.audio_preview import check_preview, preview_wav
+
+
+def _tone(path: pathlib.Path, *, rate: int, freq: float, seconds: float) -> None:
+    n = int(rate * seconds)
+    frames = b"".join(struct.pack("<h", int(12000 * math.sin(2 * math.pi * freq * i / rate))) for i in range(n))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+
+
+@unittest.skipUnless(audio_preview._get_numpy(), "numpy not installed")
+class TestPreviewWav(unittest.TestCase):
+    def test_downsample_and_requantize(self) -> None:
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as td:
+            src = pathlib.Path(td) / "tone.wav"
+            _tone(src, rate=24000, freq=1000.0, seconds=0.5)
+            data = preview_wav(src, rate=16000, bits=8)
+            self.assertLess(len(data), src.stat().st_size / 2.5)
+            with wave.open(io.BytesIO(data), "rb") as w:
+                self.assertEqual((w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()), (1, 1, 16000, 8000))
+                x = np.frombuffer(w.readframes(8000), dtype=np.uint8).astype(float) - 128.0
+            spectrum = np.abs(np.fft.rfft(x))
+            self.assertAlmostEqual(np.argmax(spectrum) * 16000 / len(x), 1000.0, delta=5.0)
+            self.assertAlmostEqual(np.abs(x).max(), 12000 / 32768 * 127, delta=3.0)
+
+            # A higher target rate keeps the original rate.
+            with wave.open(io.BytesIO(preview_wav(src, rate=48000, bits=16)), "rb") as w:
+                self.assertEqual((w.getsampwidth(), w.getframerate(), w.getnframes()), (2, 24000, 12000))
+
+    def test_check_preview(self) -> None:
+        self.assertIsNone(check_preview(rate=0, bits=0))
+        self.assertEqual(check_preview(rate=16000, bits=0), (16000, 16))
+        self.assertEqual(check_preview(rate=0, bits=8), (0, 8))
+        with self.assertRaises(ValueError):
+            check_preview(rate=16000, bits=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+
+from tts_bug_finder.db import BatchWriter, BugDB, CaseFilter, SeenSet, seen_key
+
+from _cases import case_row
+
+
+class TestBatchWriter(unittest.TestCase):
+    def test_writes_are_committed_in_batches(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path) as db:
+                self.assertEqual(db.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                with BatchWriter(path, batch_rows=3, flush_ms=60_000) as writer:
+                    for i in range(4):
+                        writer.upsert_case(case_row(f"c{i}"))
+                        writer.mark_text_seen(key=seen_key(f"t{i}"), first_seen_at=1)
+                    writer.flush()
+                    # Committed rows are visible to other connections while the run goes on.
+                    self.assertEqual(db.count_by_status(), {"accepted": 4})
+                    self.assertEqual(len(db.load_seen()), 4)
+                    writer.upsert_case(dict(case_row("c0"), status="duplicate"))
+                    writer.mark_text_seen(key=seen_key("t0"), first_seen_at=2)
+                self.assertEqual(writer.rows_written, 10)
+                self.assertEqual(db.count_by_status(), {"accepted": 3, "duplicate": 1})
+
+    def test_errors_surface_to_the_caller(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path):
+                pass
+            with self.assertRaises(sqlite3.OperationalError):
+                with BatchWriter(path, batch_rows=1) as writer:
+                    writer.upsert_case(dict(case_row("c0"), no_such_column=1))
+                    writer.flush()
+
+
+class TestSeenStore(unittest.TestCase):
+    def test_load_and_lookup(self) -> None:
+        texts = [f"句子{i}" for i in range(1000)]
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path) as db:
+                for t in texts[:500]:
+                    self.assertTrue(db.mark_text_seen(key=seen_key(t), first_seen_at=1))
+                self.assertFalse(db.mark_text_seen(key=seen_key(texts[0]), first_seen_at=2))
+                seen = db.load_seen()
+            self.assertEqual(len(seen), 500)
+            self.assertTrue(all(seen_key(t) in seen for t in texts[:500]))
+            self.assertFalse(any(seen_key(t) in seen for t in texts[500:]))
+            seen.add(seen_key(texts[700]))
+            seen.add(seen_key(texts[0]))
+            self.assertEqual(len(seen), 501)
+            self.assertIn(seen_key(texts[700]), seen)
+            self.assertNotIn(seen_key(texts[701]), SeenSet())
+
+    def test_migrates_hex_seen_texts(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE seen_texts (text_key TEXT PRIMARY KEY, text_norm TEXT, first_seen_at TEXT NOT NULL)")
+            conn.executemany(
+                "INSERT INTO seen_texts VALUES (?,?,?)",
+                [(hashlib.sha1(t.encode("utf-8")).hexdigest(), t, "2026-01-01T00:00:00+00:00") for t in ("甲", "乙")],
+            )
+            conn.commit()
+            conn.close()
+            with BugDB(path) as db:
+                seen = db.load_seen()
+                tables = {r[0] for r in db.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+                rows = db.conn.execute("SELECT first_seen_at, text_norm FROM seen_keys ORDER BY text_norm").fetchall()
+            self.assertNotIn("seen_texts", tables)
+            self.assertIn(seen_key("甲"), seen)
+            self.assertIn(seen_key("乙"), seen)
+            self.assertNotIn(seen_key("丙"), seen)
+            self.assertEqual([tuple(r) for r in rows], [(1767225600, "乙"), (1767225600, "甲")])
+
+
+class TestCaseTags(unittest.TestCase):
+    def _tags(self, db: BugDB) -> list[tuple[str, str]]:
+        return [tuple(r) for r in db.conn.execute("SELECT case_id, tag FROM case_tags ORDER BY case_id, tag")]
+
+    def test_triggers_keep_tags_in_sync(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path) as db:
+                db.upsert_case(dict(case_row("c0"), tags='["polyphone", "negation"]'))
+                db.upsert_case(dict(case_row("c1"), tags="not json"))
+                db.upsert_case(case_row("c2"))
+                db.conn.commit()
+                with BatchWriter(path, batch_rows=1) as writer:
+                    writer.upsert_case(dict(case_row("c1"), tags='["numbers"]'))
+                    writer.upsert_case(dict(case_row("c0"), tags='["negation"]'))
+                    writer.upsert_case(dict(case_row("c2"), status="duplicate"))
+                self.assertEqual(self._tags(db), [("c0", "negation"), ("c1", "numbers")])
+                db.conn.execute("DELETE FROM cases WHERE id = 'c1'")
+                self.assertEqual(self._tags(db), [("c0", "negation")])
+
+    def test_backfills_existing_db_and_filters_by_index(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path) as db:
+                for i in range(50):
+                    tags = ["polyphone"] if i % 10 == 0 else ["numbers"]
+                    db.upsert_case(dict(case_row(f"c{i}"), tags=json.dumps(tags), cluster_id=f"k{i % 3}"))
+            # As written before case_tags and schema_version existed.
+            with contextlib.closing(sqlite3.connect(path)) as conn, conn:
+                conn.execute("DROP TABLE case_tags")
+                conn.execute("DROP TABLE schema_version")
+                conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+            with BugDB(path) as db:
+                self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM case_tags").fetchone()[0], 50)
+                # Planner statistics are collected, so tag filters start from `case_tags`.
+                self.assertIsNotNone(db.conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'case_tags'").fetchone())
+                conds, params = CaseFilter.parse(tag="polyphone,negation", cluster="k0").conditions()
+                sql = "SELECT id FROM cases WHERE status = ? AND " + " AND ".join(conds)
+                ids = [r[0] for r in db.conn.execute(sql, ("accepted", *params))]
+                plan = " ".join(r[3] for r in db.conn.execute("EXPLAIN QUERY PLAN " + sql, ("accepted", *params)))
+            self.assertEqual(sorted(ids), ["c0", "c30"])
+            self.assertIn("idx_case_tags_tag", plan)
+
+    def test_filter_conditions(self) -> None:
+        self.assertEqual(CaseFilter.parse().conditions(), ([], ()))
+        self.assertEqual(CaseFilter.parse(tag=" a, b,a ").tags, ("a", "b"))
+        f = CaseFilter.parse(created_after="2026-01-02", created_before="2026-02")
+        self.assertEqual(f.conditions(), (["created_at >= ?", "created_at < ?"], ("2026-01-02", "2026-02")))
+        self.assertEqual(f.describe(), "created>=2026-01-02 created<2026-02")
+
+
+if __name__ == "__main__":
+    unittest.main()
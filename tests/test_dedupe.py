@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import pathlib
+import tempfile
 import unittest
 
 from tts_bug_finder.dedupe import signature_similarity, text_similarity_no_punct
+from tts_bug_finder.dedupe_index import GlobalDedupeIndex
 
 
 class TestDedupe(unittest.TestCase):
@@ -19,6 +22,21 @@ class TestDedupe(unittest.TestCase):
         self.assertLessEqual(signature_similarity(s1, s3), 0.5)
 
 
+class TestGlobalDedupeIndex(unittest.TestCase):
+    def test_incremental_read_across_writers(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "index.jsonl"
+            with GlobalDedupeIndex(path, source="a") as a, GlobalDedupeIndex(path, source="b") as b:
+                self.assertEqual(a.append([{"id": "1", "ref_text": "银行行长", "hyp_text": "银行行走"}]), 1)
+                self.assertEqual(a.append([{"id": "1", "ref_text": "银行行长", "hyp_text": "银行行走"}]), 0)
+                self.assertEqual(b.refresh(), 1)
+                b.append([{"id": "2", "ref_text": "x", "hyp_text": "y", "signature": {"tags": ["numbers"]}}])
+                self.assertEqual(a.refresh(), 1)
+                self.assertEqual([e["id"] for e in a.entries], ["1", "2"])
+                self.assertEqual(a.entries[1]["source"], "b")
+                self.assertIn("2", a)
+
+
 if __name__ == "__main__":
     unittest.main()
 
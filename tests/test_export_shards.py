@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import pathlib
+import tarfile
+import tempfile
+import unittest
+
+from tts_bug_finder.db import BugDB
+from tts_bug_finder.export_shards import export_shards
+
+from _cases import case_row
+
+
+class TestExportShards(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.td = pathlib.Path(self._td.name)
+        self.db_path = self.td / "bugs.sqlite"
+        self.out = self.td / "shards"
+        with BugDB(self.db_path) as db:
+            for i in range(5):
+                wav = None
+                if i != 2:
+                    wav = self.td / f"{i}.wav"
+                    wav.write_bytes(bytes([i]) * 1500)
+                db.upsert_case(case_row(f"case{i}", tags='["polyphone"]', audio_path_wav=str(wav) if wav else None))
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _export(self) -> dict[str, int]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            # ~2 samples (4 members each, 1.5 KB audio) per shard
+            return export_shards(db_path=self.db_path, out_dir=self.out, status="accepted", shard_size_mb=12 / 1024, workers=2)
+
+    def _shards(self) -> list[list[str]]:
+        out = []
+        for manifest_path in sorted(self.out.glob("shard-*.json")):
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            tar_path = self.out / manifest["shard"]
+            self.assertEqual(hashlib.sha256(tar_path.read_bytes()).hexdigest(), manifest["sha256"])
+            with tarfile.open(tar_path) as tar:
+                names = tar.getnames()
+                for sample in manifest["samples"]:
+                    for ext, info in sample["members"].items():
+                        data = tar.extractfile(f"{sample['key']}.{ext}").read()
+                        self.assertEqual(hashlib.sha256(data).hexdigest(), info["sha256"])
+                first = sample = manifest["samples"][0]
+                self.assertEqual(tar.extractfile(f"{first['key']}.ref.txt").read().decode("utf-8"), f"参考<{first['key']}>")
+                self.assertEqual(json.loads(tar.extractfile(f"{first['key']}.json").read())["tags"], ["polyphone"])
+            out.append(sorted({n.split(".")[0] for n in names}))
+        return out
+
+    def test_shards_resume_and_append(self) -> None:
+        self.assertEqual(self._export(), {"shards": 2, "samples": 4, "skipped": 1})
+        expected = [["case0", "case1"], ["case3", "case4"]]
+        self.assertEqual(self._shards(), expected)
+        first_tar = (self.out / "shard-000000.tar").read_bytes()
+
+        # Interrupted before the last manifest was written: that shard is redone.
+        (self.out / "shard-000001.json").unlink()
+        (self.out / "shard-000002.tar.tmp").write_bytes(b"partial")
+        # Not shard files: reported and kept.
+        (self.out / "shard-old.tar").write_bytes(b"backup")
+        (self.out / "shard-000009.tar.bak").write_bytes(b"backup")
+        (self.out / "shard-000003.tar").mkdir()
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            stats = export_shards(db_path=self.db_path, out_dir=self.out, status="accepted", shard_size_mb=12 / 1024, workers=2)
+        self.assertEqual(stats, {"shards": 1, "samples": 2, "skipped": 1})
+        self.assertIn("shard-000003.tar, shard-000009.tar.bak, shard-old.tar", stdout.getvalue())
+        self.assertTrue((self.out / "shard-old.tar").is_file() and (self.out / "shard-000003.tar").is_dir())
+        self.assertEqual(self._shards(), expected)
+        self.assertEqual((self.out / "shard-000000.tar").read_bytes(), first_tar)
+        self.assertEqual(sorted(p.name for p in self.out.iterdir() if p.name.endswith(".tmp")), [])
+
+        self.assertEqual(self._export()["samples"], 0)
+        wav = self.td / "5.wav"
+        wav.write_bytes(b"\x05" * 100)
+        with BugDB(self.db_path) as db:
+            db.upsert_case(case_row("case5", tags='["polyphone"]', audio_path_wav=str(wav)))
+        self._export()
+        self.assertEqual(self._shards(), [*expected, ["case5"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
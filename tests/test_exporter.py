@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import gzip
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+
+from tts_bug_finder.db import BugDB, CaseFilter
+from tts_bug_finder.exporter import export_cases, hwm_path
+
+from _cases import case_row
+
+
+def _case(i: int, status: str = "accepted") -> dict:
+    # Quotes, a newline and `%s` in ref_text exercise the CSV/JSON escaping.
+    return case_row(
+        f"c{i}",
+        created_at=f"2026-01-01T00:00:{i:02d}+00:00",
+        ref_text=f"参考 \"{i}\"\n%s",
+        score_total=10.0 * i + 0.1,
+        cer=1 / 3,
+        tags=json.dumps(["polyphone", f"t{i}"], ensure_ascii=False),
+        signature=json.dumps({"top_subs": [["行", "航"]]}, ensure_ascii=False),
+        status=status,
+    )
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.td = pathlib.Path(self._td.name)
+        self.db_path = self.td / "bugs.sqlite"
+        with BugDB(self.db_path) as db:
+            for i in range(3):
+                db.upsert_case(_case(i))
+            db.upsert_case(_case(3, status="rejected"))
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _export(self, out: pathlib.Path, **kwargs) -> int:
+        kwargs.setdefault("status", "accepted")
+        with contextlib.redirect_stdout(io.StringIO()):
+            return export_cases(db_path=self.db_path, out_path=out, **kwargs)
+
+    def test_jsonl_matches_decoded_rows(self) -> None:
+        out = self.td / "out.jsonl"
+        self.assertEqual(self._export(out, fmt="jsonl"), 3)
+        with BugDB(self.db_path) as db:
+            expected = [
+                json.dumps(r, ensure_ascii=False) + "\n"
+                for r in db.iter_cases(status="accepted")
+            ]
+        self.assertEqual(out.read_text(encoding="utf-8").splitlines(True), expected)
+        self.assertEqual(json.loads(expected[0])["tags"], ["polyphone", "t2"])
+
+    def test_gzip_and_csv(self) -> None:
+        self._export(self.td / "out.jsonl", fmt="jsonl", status="all")
+        self._export(self.td / "out.jsonl.gz", fmt="jsonl.gz", status="all")
+        with gzip.open(self.td / "out.jsonl.gz", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), (self.td / "out.jsonl").read_text(encoding="utf-8"))
+
+        self._export(self.td / "out.csv", fmt="csv")
+        with (self.td / "out.csv").open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["id"] for r in rows], ["c2", "c1", "c0"])
+        self.assertEqual(rows[0]["ref_text"], "参考 \"2\"\n%s")
+        self.assertEqual(json.loads(rows[0]["tags"]), ["polyphone", "t2"])
+
+    def test_since_last_appends_new_cases(self) -> None:
+        for fmt, name in (("jsonl.gz", "inc.jsonl.gz"), ("csv", "inc.csv")):
+            out = self.td / name
+            self.assertEqual(self._export(out, fmt=fmt, since="last"), 3)
+            self.assertEqual(self._export(out, fmt=fmt, since="last"), 0)
+            with BugDB(self.db_path) as db:
+                db.upsert_case(_case(4))
+                db.upsert_case(_case(5, status="rejected"))
+                db.upsert_case(_case(1))  # updated in place: not new
+                db.conn.commit()
+            self.assertEqual(self._export(out, fmt=fmt, since="last"), 1)
+            if fmt == "csv":
+                with out.open(newline="", encoding="utf-8") as f:
+                    ids = [r["id"] for r in csv.DictReader(f)]
+            else:
+                with gzip.open(out, "rt", encoding="utf-8") as f:
+                    ids = [json.loads(line)["id"] for line in f]
+            self.assertEqual(ids, ["c0", "c1", "c2", "c4"])
+            with BugDB(self.db_path) as db:
+                db.conn.execute("DELETE FROM cases WHERE id IN ('c4', 'c5')")
+                db.conn.commit()
+
+        self.assertEqual(self._export(self.td / "ts.jsonl", fmt="jsonl", since="2026-01-01T00:00:00+00:00"), 2)
+        self.assertEqual(self._export(self.td / "rowid.jsonl", fmt="jsonl", since="2"), 1)
+
+        hwm_path(self.td / "inc.csv").write_text(json.dumps({"db": "other.sqlite", "rowid": 1}), encoding="utf-8")
+        with self.assertRaises(ValueError):
+            self._export(self.td / "inc.csv", fmt="csv", since="last")
+
+    def test_tag_cluster_and_time_filters(self) -> None:
+        out = self.td / "f.jsonl"
+        with BugDB(self.db_path) as db:
+            db.conn.execute("UPDATE cases SET cluster_id = 'k1' WHERE id IN ('c0', 'c2')")
+            db.conn.commit()
+
+        def ids(case_filter: CaseFilter) -> list[str]:
+            self._export(out, fmt="jsonl", status="all", case_filter=case_filter)
+            return [json.loads(line)["id"] for line in out.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual(ids(CaseFilter.parse(tag="t1,t3")), ["c3", "c1"])
+        self.assertEqual(ids(CaseFilter.parse(tag="polyphone", cluster="k1")), ["c2", "c0"])
+        self.assertEqual(ids(CaseFilter.parse(created_after="2026-01-01T00:00:01", created_before="2026-01-01T00:00:03")), ["c2", "c1"])
+        self.assertEqual(ids(CaseFilter.parse(tag="missing")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
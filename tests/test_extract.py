@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import random
 import unittest
 
-from tts_bug_finder.text_utils import extract_negation_markers, extract_number_tokens
+from tts_bug_finder.text_utils import (
+    TextView,
+    _negation_markers_nfkc,
+    _number_tokens_nfkc,
+    extract_negation_markers,
+    extract_number_tokens,
+    guess_language,
+    tokenize_cer,
+    tokenize_wer,
+)
+
+from _reference import negation_markers_reference, number_tokens_reference
 
 
 class TestExtract(unittest.TestCase):
@@ -22,6 +34,34 @@ class TestExtract(unittest.TestCase):
         found = extract_negation_markers("不要把验证码告诉任何人。")
         self.assertIn("不要", found)
 
+    def test_text_view_matches_helpers(self) -> None:
+        for text in [
+            "",
+            "金额：¥1,234,567.89，请核对。",
+            "Do not restart server 10.0.0.1 before v2.3.1, it can't wait.",
+            "ＡＢＣ　１２３ 不要 百分之五十",
+        ]:
+            view = TextView(text)
+            self.assertEqual(view.cer_tokens, tokenize_cer(text))
+            self.assertEqual(view.wer_tokens, tokenize_wer(text))
+            self.assertEqual(view.number_tokens, extract_number_tokens(text))
+            self.assertEqual(set(view.negations), extract_negation_markers(text))
+            self.assertEqual(view.language, guess_language(text))
+            self.assertIs(view.cer_tokens, view.cer_tokens)
+
+    def test_scanners_match_reference(self) -> None:
+        rng = random.Random(0)
+        alphabet = list("0123456789.,:+-%eEvxXaF 不要没有沒无無非未别別禁止百分之零一二三四五六七八九十千万亿两点幺〇notNOcan'tdswrhi")
+        texts = [
+            "IP 10.0.0.1, ratio 16:9, 1.5e-3, 0xFF, v1.2.3-rc.1+b5, 百分之五十, 1,234.5%",
+            "It can't be none, no, never. Nothing is not cannotx.",
+            "不要没有禁止无法不必",
+        ]
+        texts += ["".join(rng.choice(alphabet) for _ in range(rng.randrange(40))) for _ in range(3000)]
+        for text in texts:
+            self.assertEqual(_number_tokens_nfkc(text), number_tokens_reference(text), text)
+            self.assertEqual(_negation_markers_nfkc(text), negation_markers_reference(text), text)
+
 
 if __name__ == "__main__":
     unittest.main()
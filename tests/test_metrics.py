@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import random
 import unittest
 
-from tts_bug_finder.metrics import align_tokens
-from tts_bug_finder.scoring import compute_alignment
+from tts_bug_finder.metrics import (
+    align_batch,
+    align_tokens,
+    batch_edit_distance,
+    bounded_edit_distance,
+    edit_distance,
+)
+from tts_bug_finder.scoring import compute_alignment, evaluate_pair, evaluate_pairs
+
+from _reference import align_tokens_dp
 
 
 class TestMetrics(unittest.TestCase):
@@ -11,6 +20,96 @@ class TestMetrics(unittest.TestCase):
         ali = align_tokens(list("你好"), list("你号"))
         self.assertEqual(ali.distance, 1)
 
+    def test_bit_parallel_matches_reference_dp(self) -> None:
+        rng = random.Random(0)
+        for _ in range(3000):
+            k = rng.choice([1, 2, 3, 8, 40])
+            a = [chr(0x4E00 + rng.randrange(k)) for _ in range(rng.randrange(0, 30))]
+            b = [chr(0x4E00 + rng.randrange(k)) for _ in range(rng.randrange(0, 30))]
+            ref = align_tokens_dp(a, b)
+            self.assertEqual(align_tokens(a, b), ref, (a, b))
+            self.assertEqual(edit_distance(a, b), ref.distance)
+
+    def test_checkpointed_columns_match_reference_dp(self) -> None:
+        rng = random.Random(1)
+        for _ in range(500):
+            a = [chr(0x61 + rng.randrange(3)) for _ in range(rng.randrange(1, 40))]
+            b = [chr(0x61 + rng.randrange(3)) for _ in range(rng.randrange(1, 40))]
+            ref = align_tokens_dp(a, b)
+            for segment in (1, 2, 5, 64):
+                self.assertEqual(align_tokens(a, b, segment=segment), ref, (a, b, segment))
+
+    def test_long_form_looping_hypothesis(self) -> None:
+        ref = [chr(0x4E00 + (i * 7) % 500) for i in range(3000)]
+        ali = align_tokens(ref, ref * 2)
+        self.assertEqual(ali.distance, 3000)
+        self.assertEqual(ali.opcodes, [("insert", 0, 0, 0, 3000), ("equal", 0, 3000, 3000, 6000)])
+
+    def test_batch_edit_distance_matches_single(self) -> None:
+        rng = random.Random(2)
+        a_seqs: list[list[int]] = []
+        b_seqs: list[list[int]] = []
+        for _ in range(200):
+            a = [rng.randrange(rng.choice([2, 50, 5000])) for _ in range(rng.choice([0, 1, 7, 63, 64, 65, 150]))]
+            b = [t if rng.random() < 0.8 else rng.randrange(50) for t in a]
+            if rng.random() < 0.2:
+                b = b + b
+            a_seqs.append(a)
+            b_seqs.append(b)
+        self.assertEqual(batch_edit_distance(a_seqs, b_seqs), [edit_distance(a, b) for a, b in zip(a_seqs, b_seqs)])
+        pairs = [(list("你好世界"), list("你号世界")), (list("abc"), list(""))]
+        self.assertEqual([x.distance for x in align_batch(pairs)], [1, 3])
+        self.assertEqual(align_batch(pairs, with_opcodes=True), [align_tokens(a, b) for a, b in pairs])
+
+    def test_bounded_edit_distance(self) -> None:
+        rng = random.Random(3)
+        for _ in range(2000):
+            a = [rng.choice("abc") for _ in range(rng.randrange(0, 90))]
+            b = [t if rng.random() < 0.8 else "d" for t in a] if rng.random() < 0.5 else list(rng.choice(["", "abc", "cab" * 20]))
+            k = rng.randrange(0, 40)
+            d = edit_distance(a, b)
+            got = bounded_edit_distance(a, b, k)
+            if d < k:
+                self.assertEqual(got, d)
+            else:
+                self.assertGreaterEqual(got, k)
+
+    def test_tiered_evaluation(self) -> None:
+        thresholds = {"min_plausibility": 0.6, "min_cer": 0.2, "min_wer": 0.2, "min_critical": 0.8}
+        pairs = [
+            ("今天天气很好，我们去公园散步吧。", "今天天气很好，我们去公园散步吧。"),
+            ("今天天气很好，我们去公园散步吧。", "今天天汽很好，我们去公圆散步吧。"),
+            ("请在 3 月 14 日前缴纳 1,280 元。", "请在 3 月 40 日前缴纳 1280 元。"),
+            ("Please restart the server tonight.", "Please restart the server tonight."),
+            ("今天天气很好，我们去公园散步吧。", "今天很好。"),
+        ]
+        for ref, hyp in pairs:
+            full = evaluate_pair(ref_text=ref, hyp_text=hyp)
+            tiered = evaluate_pair(ref_text=ref, hyp_text=hyp, thresholds=thresholds)
+            for key in ("cer", "wer", "len_ratio", "plausibility", "critical_error_score", "tags"):
+                self.assertEqual(tiered[key], full[key], (ref, hyp, key))
+            if tiered["tier"] == 1:
+                self.assertIsNone(tiered["signature_json"])
+            else:
+                self.assertEqual(tiered["signature_json"], full["signature_json"])
+        self.assertEqual(evaluate_pair(ref_text=pairs[0][0], hyp_text=pairs[0][1], thresholds=thresholds)["tier"], 1)
+        self.assertEqual(evaluate_pair(ref_text=pairs[4][0], hyp_text=pairs[4][1], thresholds=thresholds)["tier"], 2)
+
+    def test_evaluate_pairs_matches_evaluate_pair(self) -> None:
+        pairs = [
+            {"ref_text": "请在 3 月 14 日前缴纳 1,280 元。", "hyp_text": "请在 3 月 40 日前缴纳 1280 元。", "base_tags": ("numbers",)},
+            {"ref_text": "不要把验证码告诉任何人。", "hyp_text": "要把验证码告诉任何人。", "base_tags": ()},
+            {"ref_text": "Do not restart the server.", "hyp_text": "Do restart the server.", "base_tags": ()},
+        ]
+        thresholds = {"min_plausibility": 0.6, "min_cer": 0.2, "min_wer": 0.2, "min_critical": 0.8}
+        pairs.append({"ref_text": "今天天气很好，我们去公园散步吧。", "hyp_text": "今天天汽很好，我们去公园散步吧。", "base_tags": ()})
+        for th in (None, thresholds):
+            batched = evaluate_pairs(pairs * 20, thresholds=th)
+            for p, ev in zip(pairs * 20, batched):
+                single = evaluate_pair(ref_text=p["ref_text"], hyp_text=p["hyp_text"], base_tags=p["base_tags"], thresholds=th)
+                self.assertEqual({k: v for k, v in ev.items() if k != "alignment"}, {k: v for k, v in single.items() if k != "alignment"})
+            self.assertEqual({ev["tier"] for ev in batched}, {2} if th is None else {1, 2})
+
     def test_cer(self) -> None:
         ali, cer, wer = compute_alignment("你好", "你号", "zh")
         self.assertEqual(ali.distance, 1)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+
+from tts_bug_finder.db import SCHEMA_VERSION, BugDB, connect, migrate, schema_state, seen_key
+from tts_bug_finder.exporter import export_cases
+from tts_bug_finder.migrate import migrate_db
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _legacy_db(path: pathlib.Path, n: int) -> None:
+    """A DB as the first versions wrote it: no metric columns, indexes or schema_version."""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE cases (id TEXT PRIMARY KEY, created_at TEXT NOT NULL, seed_id TEXT, mutation_trace TEXT, "
+        "ref_text TEXT NOT NULL, hyp_text TEXT NOT NULL, audio_path_wav TEXT, audio_path_mp3 TEXT, duration_sec REAL, "
+        "lang_guess TEXT, cer REAL, wer REAL, len_ratio REAL, critical_error_score REAL, score_total REAL, tags TEXT, "
+        "signature TEXT, cluster_id TEXT, llm_summary TEXT, status TEXT NOT NULL)"
+    )
+    conn.executemany(
+        "INSERT INTO cases(id, created_at, ref_text, hyp_text, tags, signature, status) VALUES (?,?,?,?,?,?,?)",
+        [
+            (
+                f"c{i}",
+                "2026-01-01T00:00:00+00:00",
+                "不是",
+                "是",
+                json.dumps(["negation"] if i % 2 else ["numbers"]),
+                json.dumps({"negation_flip": i % 2 == 1}) if i < n - 1 else "broken{",
+                "accepted",
+            )
+            for i in range(n)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestMigrate(unittest.TestCase):
+    def test_new_db_records_every_step(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path) as db:
+                state = schema_state(db.conn)
+            self.assertEqual(sorted(state), list(range(1, SCHEMA_VERSION + 1)))
+            self.assertTrue(all(applied_at is not None for applied_at, _ in state.values()))
+
+    def test_interrupted_backfill_resumes(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            _legacy_db(path, 7)
+            chunks = []
+
+            def interrupt(m, rowid, end) -> None:
+                chunks.append((m.version, rowid, end))
+                raise _Interrupted
+
+            conn = connect(path)
+            with self.assertRaises(_Interrupted):
+                migrate(conn, chunk_rows=3, progress=interrupt)
+            (version, rowid, end), = chunks
+            applied_at, backfilled = schema_state(conn)[version]
+            conn.close()
+            self.assertEqual((rowid, end, backfilled), (3, 7, 3))
+            self.assertIsNone(applied_at)
+
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(migrate_db(db_path=path, dry_run=True), SCHEMA_VERSION - version + 1)
+                migrate_db(db_path=path, chunk_rows=3)
+                self.assertEqual(migrate_db(db_path=path), 0)
+            self.assertIn("backfill resumes after rowid 3", out.getvalue())
+            with BugDB(path) as db:
+                tags = db.conn.execute("SELECT tag, COUNT(*) FROM case_tags GROUP BY tag ORDER BY tag").fetchall()
+                crit = [r[0] for r in db.conn.execute("SELECT crit_negation FROM cases ORDER BY rowid")]
+            self.assertEqual([tuple(r) for r in tags], [("negation", 3), ("numbers", 4)])
+            self.assertEqual(crit, [0.0, 1.0, 0.0, 1.0, 0.0, 1.0, None])
+
+    def test_readers_do_not_migrate(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            _legacy_db(path, 3)
+            before = path.read_bytes()
+            with self.assertRaisesRegex(RuntimeError, "run `python -m tts_bug_finder migrate"):
+                export_cases(db_path=path, out_path=pathlib.Path(td) / "out.jsonl", fmt="jsonl", status="accepted")
+            self.assertEqual(path.read_bytes(), before)
+            with self.assertRaises(FileNotFoundError):
+                with BugDB(pathlib.Path(td) / "missing.sqlite", readonly=True):
+                    pass
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                # A dry run opens the DB read-only: not even the switch to WAL is written.
+                self.assertEqual(migrate_db(db_path=path, dry_run=True), SCHEMA_VERSION)
+                self.assertEqual(path.read_bytes(), before)
+                self.assertEqual(sorted(p.name for p in pathlib.Path(td).iterdir()), ["bugs.sqlite"])
+                migrate_db(db_path=path)
+            with BugDB(path, readonly=True) as db:
+                self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM case_tags").fetchone()[0], 3)
+
+    def test_seen_texts_copied_in_chunks(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            _legacy_db(path, 1)
+            texts = [f"文本{i}" for i in range(5)]
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE seen_texts (text_key TEXT PRIMARY KEY, text_norm TEXT, first_seen_at TEXT NOT NULL)")
+            conn.executemany(
+                "INSERT INTO seen_texts VALUES (?, ?, ?)",
+                [(hashlib.sha1(t.encode("utf-8")).hexdigest(), t, "2026-01-01T00:00:00+00:00") for t in texts] + [("not hex", "x", "")],
+            )
+            conn.commit()
+            conn.close()
+
+            chunks = []
+            conn = connect(path)
+            migrate(conn, chunk_rows=2, progress=lambda m, rowid, end: chunks.append((m.version, rowid, end)))
+            self.assertEqual([c for c in chunks if c[0] == 7], [(7, 2, 6), (7, 4, 6), (7, 6, 6)])
+            self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'seen_texts'").fetchone())
+            conn.close()
+            with BugDB(path) as db:
+                seen = db.load_seen()
+            self.assertEqual(len(seen), 5)
+            self.assertTrue(all(seen_key(t) in seen for t in texts))
+
+    def test_refuses_newer_schema(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            with BugDB(path) as db:
+                db.conn.execute("INSERT INTO schema_version(version, name, applied_at) VALUES (?, 'future', 'x')", (SCHEMA_VERSION + 1,))
+            with self.assertRaises(RuntimeError):
+                with BugDB(path):
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
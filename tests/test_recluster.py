@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+from tts_bug_finder.db import BugDB
+from tts_bug_finder.dedupe import signature_similarity
+from tts_bug_finder.recluster import MIN_SIG_THRESHOLD, recluster
+
+
+def _row(case_id: str, ref: str, subs: list[list[str]], score: float) -> dict:
+    sig = {"top_subs": subs, "has_numbers": False, "negation_flip": False, "tags": ["polyphone"]}
+    return {
+        "id": case_id,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "ref_text": ref,
+        "hyp_text": ref,
+        "score_total": score,
+        "tags": json.dumps(["polyphone"]),
+        "signature": json.dumps(sig, ensure_ascii=False),
+        "cluster_id": case_id,
+        "status": "accepted",
+    }
+
+
+class TestRecluster(unittest.TestCase):
+    def test_merges_across_dbs(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            a = pathlib.Path(td) / "a.sqlite"
+            b = pathlib.Path(td) / "b.sqlite"
+            with BugDB(a) as db:
+                db.upsert_case(_row("a1", "银行的行长今天不在，请稍后再来。", [["行长", "行走"]], 70.0))
+                db.upsert_case(_row("a2", "请把行李放到行李架上。", [["行李", "星李"]], 50.0))
+            with BugDB(b) as db:
+                db.upsert_case(_row("b1", "银行的行长今天不在，请稍后再来！", [["今天", "金天"]], 80.0))
+
+            stats = recluster(db_paths=[a, b], statuses=None, workers=1)
+            self.assertEqual(stats["clusters"], 2)
+
+            with BugDB(a) as db:
+                rows = {r["id"]: dict(r) for r in db.conn.execute("SELECT id, cluster_id, is_representative FROM cases")}
+            with BugDB(b) as db:
+                b1 = dict(db.conn.execute("SELECT cluster_id, is_representative FROM cases").fetchone())
+            self.assertEqual(rows["a1"]["cluster_id"], b1["cluster_id"])
+            self.assertNotEqual(rows["a2"]["cluster_id"], b1["cluster_id"])
+            self.assertEqual(b1["is_representative"], 1)
+            self.assertEqual(rows["a1"]["is_representative"], 0)
+            self.assertEqual(rows["a2"]["is_representative"], 1)
+
+    def test_rejects_sig_threshold_below_blocking_bound(self) -> None:
+        # Without a shared top_subs pair, signatures cannot get above the bound.
+        sig_a = json.loads(_row("a", "r", [["行长", "行走"]], 0.0)["signature"])
+        sig_b = json.loads(_row("b", "r", [["今天", "金天"]], 0.0)["signature"])
+        self.assertLessEqual(signature_similarity(sig_a, sig_b), MIN_SIG_THRESHOLD)
+        with self.assertRaises(ValueError):
+            recluster(db_paths=[], statuses=None, workers=1, sig_threshold=0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import random
+import unittest
+from collections import Counter
+
+from tts_bug_finder.repetition import MIN_REPEAT, analyze_repetition
+from tts_bug_finder.scoring import critical_error_components, repetition_score
+
+
+def _brute(s: str) -> tuple[int, int, int, float]:
+    grams = Counter(s[i : i + MIN_REPEAT] for i in range(len(s) - MIN_REPEAT + 1))
+    longest = 0
+    longest_count = 0
+    for n in range(MIN_REPEAT, len(s)):
+        counts = Counter(s[i : i + n] for i in range(len(s) - n + 1))
+        repeated = [c for c in counts.values() if c >= 2]
+        if not repeated:
+            break
+        longest = n
+        longest_count = repeated[0] if len(set(repeated)) == 1 else -1
+    covered = set()
+    for i in range(len(s) - MIN_REPEAT + 1):
+        if grams[s[i : i + MIN_REPEAT]] >= 2:
+            covered.update(range(i, i + MIN_REPEAT))
+    return max(grams.values()), longest, longest_count, len(covered) / len(s)
+
+
+class TestRepetition(unittest.TestCase):
+    def test_matches_brute_force(self) -> None:
+        rng = random.Random(0)
+        for _ in range(1500):
+            s = "".join(rng.choice("aab") for _ in range(rng.randrange(MIN_REPEAT, 40)))
+            stats = analyze_repetition(s)
+            max_count, longest, longest_count, coverage = _brute(s)
+            self.assertEqual(stats.max_count, max_count, s)
+            self.assertEqual(len(stats.longest_repeat), longest, s)
+            if longest:
+                self.assertGreaterEqual(s.count(stats.longest_repeat), 1)
+                if longest_count > 0:
+                    self.assertEqual(stats.longest_count, longest_count, s)
+            self.assertAlmostEqual(stats.loop_coverage, coverage, msg=s)
+
+    def test_long_loop(self) -> None:
+        unit = "今天天气很好我们去公园散步"
+        stats = analyze_repetition(unit * 200)
+        self.assertEqual(stats.max_count, 200)
+        self.assertEqual(stats.longest_repeat, unit * 199)
+        self.assertEqual(stats.loop_coverage, 1.0)
+        self.assertEqual(analyze_repetition("没有 重复 的 句子").max_count, 1)
+
+    def test_repetition_score(self) -> None:
+        sentence = "请在三月十四日前缴纳一千二百八十元"
+        self.assertEqual(repetition_score(sentence + "，逾期将产生滞纳金。"), 0.0)
+        # A long span repeated twice is a loop unless the ref repeats it too.
+        self.assertEqual(repetition_score(sentence * 2, sentence), 0.8)
+        self.assertEqual(repetition_score(sentence * 2, sentence * 2), 0.4)
+        parts = critical_error_components(sentence, sentence * 2, 2.0)
+        self.assertEqual(parts["longest_repeat"], sentence)
+        self.assertEqual(parts["loop_coverage"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
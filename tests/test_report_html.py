@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import base64
+import contextlib
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from tts_bug_finder import report_html
+from tts_bug_finder.db import BugDB, CaseFilter
+from tts_bug_finder.report_html import write_html_report
+
+from _cases import case_row
+
+
+class TestHtmlReport(unittest.TestCase):
+    def _write(self, td: pathlib.Path, **kwargs) -> str:
+        out = td / "report.html"
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_html_report(out_path=out, **kwargs)
+        self.assertFalse((td / "report.html.tmp").exists())
+        return out.read_text(encoding="utf-8")
+
+    def test_merges_dbs_by_score_and_streams_audio(self) -> None:
+        with tempfile.TemporaryDirectory() as td_s:
+            td = pathlib.Path(td_s)
+            wav = td / "a.wav"
+            audio = bytes(range(256)) * 7 + b"xy"
+            wav.write_bytes(audio)
+            a = td / "a.sqlite"
+            b = td / "b.sqlite"
+            with BugDB(a) as db:
+                db.upsert_case(case_row("a1", score_total=80.0, audio_path_wav=str(wav)))
+                db.upsert_case(case_row("a2", score_total=40.0))
+                db.upsert_case(case_row("a3", score_total=99.0, status="rejected"))
+            with BugDB(b) as db:
+                db.upsert_case(case_row("b1", score_total=60.0, status="duplicate"))
+                db.upsert_case(case_row("b2", score_total=90.0))
+
+            # Chunks smaller than the file: the data URI must still be one valid base64 string.
+            with mock.patch.object(report_html, "AUDIO_CHUNK_BYTES", 30):
+                page = self._write(td, db_paths=[a, b], status="accepted,duplicate", limit=0, bundle_audio=True)
+            order = [page.index(f"参考&lt;{cid}&gt;</div>") for cid in ("b2", "a1", "b1", "a2")]
+            self.assertEqual(order, sorted(order))
+            self.assertNotIn("参考&lt;a3&gt;", page)
+            self.assertIn('<strong id="caseCount">4</strong>', page)
+            self.assertIn("data:audio/wav;base64," + base64.b64encode(audio).decode("ascii") + '"', page)
+            self.assertEqual(page.count("audio missing"), 3)
+            index = json.loads(page.split('<script id="searchIndex" type="application/json">')[1].split("</script>")[0])
+            self.assertEqual(index["n"], 4)
+            self.assertEqual(sorted(index["facets"]["status"]), ["accepted", "duplicate"])
+            self.assertIn("b2", index["terms"])
+
+            page = self._write(td, db_paths=[a, b], status="all", limit=2, bundle_audio=False)
+            self.assertIn('<strong id="caseCount">2</strong>', page)
+            self.assertEqual(page.count('<details class="case"'), 2)
+            self.assertLess(page.index("参考&lt;a3&gt;"), page.index("参考&lt;b2&gt;"))
+
+    def test_repeated_audio_is_embedded_once(self) -> None:
+        with tempfile.TemporaryDirectory() as td_s:
+            td = pathlib.Path(td_s)
+            for name in ("x.wav", "y.wav"):
+                (td / name).write_bytes(b"RIFF-same-audio")
+            (td / "z.wav").write_bytes(b"RIFF-other")
+            db_path = td / "a.sqlite"
+            with BugDB(db_path) as db:
+                db.upsert_case(case_row("c1", score_total=90.0, audio_path_wav=str(td / "x.wav")))
+                db.upsert_case(case_row("c2", score_total=80.0, audio_path_wav=str(td / "y.wav")))
+                db.upsert_case(case_row("c3", score_total=70.0, audio_path_wav=str(td / "z.wav")))
+                db.upsert_case(case_row("c4", score_total=60.0, audio_path_wav=str(td / "x.wav")))
+            page = self._write(td, db_paths=[db_path], status="accepted", limit=0, bundle_audio=True)
+            same = base64.b64encode(b"RIFF-same-audio").decode("ascii")
+            self.assertEqual(page.count(same), 1)
+            self.assertEqual(page.count("data:audio/wav;base64,"), 2)
+            ref = page.split(f'src="data:audio/wav;base64,{same}"')[0].rsplit('<audio id="', 1)[1].split('"')[0]
+            self.assertEqual(page.count(f'data-audio-ref="{ref}"'), 2)
+
+    def test_tag_and_cluster_filters(self) -> None:
+        with tempfile.TemporaryDirectory() as td_s:
+            td = pathlib.Path(td_s)
+            a = td / "a.sqlite"
+            b = td / "b.sqlite"
+            with BugDB(a) as db:
+                db.upsert_case(case_row("a1", score_total=80.0, tags='["negation"]', cluster_id="k1"))
+                db.upsert_case(case_row("a2", score_total=70.0))
+            with BugDB(b) as db:
+                db.upsert_case(case_row("b1", score_total=90.0, tags='["negation", "numbers"]'))
+                db.upsert_case(case_row("b2", score_total=60.0, cluster_id="k1"))
+            page = self._write(
+                td, db_paths=[a, b], status="accepted", limit=0, bundle_audio=False, case_filter=CaseFilter.parse(tag="negation")
+            )
+            self.assertIn('<strong id="caseCount">2</strong>', page)
+            self.assertLess(page.index("参考&lt;b1&gt;"), page.index("参考&lt;a1&gt;"))
+            self.assertNotIn("参考&lt;a2&gt;", page)
+            self.assertIn("tag=negation", page)
+            page = self._write(
+                td, db_paths=[a, b], status="all", limit=0, bundle_audio=False, case_filter=CaseFilter.parse(cluster="k1")
+            )
+            self.assertEqual(page.count('<details class="case"'), 2)
+            self.assertNotIn("参考&lt;b1&gt;", page)
+
+    def test_prefetched_stops_worker_and_reraises(self) -> None:
+        produced = []
+
+        def rows():
+            for i in range(10_000):
+                produced.append(i)
+                yield i
+
+        with mock.patch.object(report_html, "_PREFETCH_ROWS", 4), mock.patch.object(report_html, "_PREFETCH_DEPTH", 1):
+            it = report_html._prefetched(rows)
+            self.assertEqual([next(it) for _ in range(5)], [0, 1, 2, 3, 4])
+            it.close()
+        self.assertLess(len(produced), 100)
+
+        def failing():
+            yield 1
+            raise ValueError("boom")
+
+        with self.assertRaisesRegex(ValueError, "boom"):
+            list(report_html._prefetched(failing))
+
+
+if __name__ == "__main__":
+    unittest.main()
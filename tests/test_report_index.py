@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import base64
+import json
+import unittest
+
+from tts_bug_finder.report_index import SearchIndex, search_terms
+
+
+def _bits(b64: str, n: int) -> list[int]:
+    raw = base64.b64decode(b64)
+    return [i for i in range(n) if raw[i >> 3] >> (i & 7) & 1]
+
+
+def _ids(posting: list[int] | str, n: int) -> list[int]:
+    if isinstance(posting, str):
+        return _bits(posting, n)
+    out, cur = [], 0
+    for d in posting:
+        cur += d
+        out.append(cur)
+    return out
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_terms(self) -> None:
+        self.assertEqual(
+            search_terms("去银行 Polyphone_X 10:00"),
+            {"去", "银", "行", "去银", "银行", "polyphone_x", "10", "00"},
+        )
+
+    def test_postings_and_facets(self) -> None:
+        idx = SearchIndex()
+        for i in range(40):
+            text = "银行 common" + (" rare" if i in (3, 30) else "")
+            idx.add(text=text, status="accepted" if i % 2 else "duplicate", tags=["polyphone"] * 2, db="a.sqlite", score=50.04 + i)
+        d = json.loads(idx.to_json())
+        self.assertEqual(d["n"], 40)
+        self.assertEqual(d["terms"], sorted(d["terms"]))
+        postings = dict(zip(d["terms"], d["postings"]))
+        self.assertEqual(postings["rare"], [3, 27])  # delta-encoded
+        self.assertIsInstance(postings["银行"], str)  # present everywhere: a bitmap is smaller
+        self.assertEqual(_ids(postings["银行"], 40), list(range(40)))
+        self.assertEqual(_bits(d["facets"]["status"]["accepted"], 40), list(range(1, 40, 2)))
+        self.assertEqual(_bits(d["facets"]["tag"]["polyphone"], 40), list(range(40)))
+        self.assertEqual(d["scores"][:2], [50.0, 51.0])
+
+    def test_json_is_script_safe(self) -> None:
+        idx = SearchIndex()
+        idx.add(text="</script><b>", status="accepted", tags=[], db="x", score=1.0)
+        self.assertNotIn("</", idx.to_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from tts_bug_finder import report_sharded
+from tts_bug_finder.db import BugDB
+from tts_bug_finder.report_sharded import files_dir_for, write_sharded_report
+
+from _cases import case_row
+
+
+def _chunks(files_dir: pathlib.Path) -> list[list[dict]]:
+    out = []
+    for path in sorted((files_dir / "cases").glob("chunk-*.js")):
+        text = path.read_text(encoding="utf-8")
+        prefix = f"window.reportChunk({len(out)},"
+        assert text.startswith(prefix) and text.endswith(");\n"), text[:80]
+        out.append(json.loads(text[len(prefix) : -3]))
+    return out
+
+
+def _indexes(files_dir: pathlib.Path) -> list[dict]:
+    out = []
+    for path in sorted((files_dir / "cases").glob("index-*.js")):
+        text = path.read_text(encoding="utf-8")
+        prefix = f"window.reportIndex({len(out)},"
+        assert text.startswith(prefix) and text.endswith(");\n"), text[:80]
+        out.append(json.loads(text[len(prefix) : -3]))
+    return out
+
+
+class TestShardedReport(unittest.TestCase):
+    def _write(self, out: pathlib.Path, **kwargs) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_sharded_report(out_path=out, status="accepted", limit=0, **kwargs)
+
+    def test_chunks_and_content_addressed_audio(self) -> None:
+        with tempfile.TemporaryDirectory() as td_s:
+            td = pathlib.Path(td_s)
+            same_a, same_b, other = td / "x.wav", td / "y.wav", td / "z.wav"
+            same_a.write_bytes(b"RIFF-same")
+            same_b.write_bytes(b"RIFF-same")
+            other.write_bytes(b"RIFF-other")
+            a, b = td / "a.sqlite", td / "b.sqlite"
+            with BugDB(a) as db:
+                db.upsert_case(case_row("a1", score_total=80.0, audio_path_wav=str(same_a)))
+                db.upsert_case(case_row("a2", score_total=40.0))
+            with BugDB(b) as db:
+                db.upsert_case(case_row("b1", score_total=90.0, audio_path_wav=str(same_b)))
+                db.upsert_case(case_row("b2", score_total=60.0, audio_path_wav=str(other)))
+
+            out = td / "out" / "index.html"
+            with mock.patch.object(report_sharded, "CHUNK_CASES", 3):
+                self._write(out, db_paths=[a, b], bundle_audio=True)
+            files_dir = files_dir_for(out)
+            chunks = _chunks(files_dir)
+            self.assertEqual([len(c) for c in chunks], [3, 1])
+            cases = [c for chunk in chunks for c in chunk]
+            self.assertEqual([c["id"] for c in cases], ["b1", "a1", "b2", "a2"])
+            self.assertEqual(cases[0]["audio"], cases[1]["audio"])
+            self.assertNotEqual(cases[0]["audio"], cases[2]["audio"])
+            self.assertIsNone(cases[3]["audio"])
+            self.assertEqual((out.parent / cases[2]["audio"]).read_bytes(), b"RIFF-other")
+            self.assertEqual(len(list((files_dir / "audio").rglob("*.wav"))), 2)
+
+            page = out.read_text(encoding="utf-8")
+            self.assertIn('"index_files/cases/chunk-00001.js"', page)
+            self.assertIn('<strong id="caseCount">4</strong>', page)
+            self.assertNotIn("参考", page)
+
+            # Regenerating with fewer cases drops the stale chunk files.
+            self._write(out, db_paths=[a], bundle_audio=False)
+            chunks = _chunks(files_dir)
+            self.assertEqual([[c["id"] for c in chunk] for chunk in chunks], [["a1", "a2"]])
+            self.assertEqual(chunks[0][0]["audio"], same_a.resolve().as_uri())
+
+    def test_incremental_appends_only_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as td_s:
+            td = pathlib.Path(td_s)
+            wav = td / "x.wav"
+            wav.write_bytes(b"RIFF-1")
+            db_path = td / "a.sqlite"
+            with BugDB(db_path) as db:
+                for i in range(4):
+                    db.upsert_case(case_row(f"c{i}", score_total=10.0 * i, audio_path_wav=str(wav) if i == 0 else None))
+            out = td / "out" / "index.html"
+            files_dir = files_dir_for(out)
+
+            def run() -> list[dict]:
+                with mock.patch.object(report_sharded, "CHUNK_CASES", 3):
+                    self._write(out, db_paths=[db_path], bundle_audio=True, incremental=True)
+                return [c for chunk in _chunks(files_dir) for c in chunk]
+
+            self.assertEqual([c["id"] for c in run()], ["c3", "c2", "c1", "c0"])
+            with mock.patch.object(report_sharded, "_render", side_effect=AssertionError("re-rendered")):
+                self.assertEqual(len(run()), 4)
+
+            with BugDB(db_path) as db:
+                db.upsert_case(case_row("c1", score_total=99.0))
+                db.upsert_case(case_row("c4", score_total=5.0))
+                db.conn.execute("DELETE FROM cases WHERE id = 'c2'")
+                db.conn.commit()
+            wav.write_bytes(b"RIFF-22")  # re-synthesized audio counts as a change
+            records = run()
+            self.assertEqual([c["id"] for c in records[:4]], ["c3", "c2", "c1", "c0"])
+            self.assertEqual({c["id"] for c in records[4:7]}, {"c0", "c1", "c4"})
+            self.assertEqual(records[7], {"id": "c2", "db": str(db_path), "removed": True})
+            # Each chunk has a search index over its records, tombstones left out.
+            indexes = _indexes(files_dir)
+            self.assertEqual([idx["n"] for idx in indexes], [3, 3, 1])
+            self.assertEqual(indexes[2]["facets"]["status"], {"accepted": "AQ=="})
+            self.assertIn("c4", indexes[1]["terms"] + indexes[2]["terms"])
+            self.assertEqual((out.parent / records[4 + [c["id"] for c in records[4:7]].index("c0")]["audio"]).read_bytes(), b"RIFF-22")
+            manifest = json.loads((files_dir / report_sharded.MANIFEST_NAME).read_text(encoding="utf-8"))
+            self.assertEqual(len(manifest["cases"]), 4)
+            self.assertEqual(manifest["records"], 8)
+            self.assertEqual(manifest["indexes"], [c.replace("/chunk-", "/index-") for c in manifest["chunks"]])
+            self.assertIn('"count": 4', out.read_text(encoding="utf-8"))
+
+            # Once superseded records outnumber live ones the chunks are rewritten from scratch.
+            with BugDB(db_path) as db:
+                for i in (0, 1, 3, 4):
+                    db.upsert_case(case_row(f"c{i}", score_total=50.0 + i, audio_path_wav=None))
+            records = run()
+            self.assertEqual([c["id"] for c in records], ["c4", "c3", "c1", "c0"])
+            self.assertEqual(list((files_dir / "audio").rglob("*.wav")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+from tts_bug_finder.db import SCHEMA_VERSION, BugDB
+from tts_bug_finder.rescore import rescore
+from tts_bug_finder.scoring import evaluate_pair, score_total
+
+_THRESHOLDS = {"min_plausibility": 0.7, "min_cer": 0.35, "min_wer": 0.40, "min_critical": 0.8}
+
+
+def _row(case_id: str, ref: str, hyp: str, status: str, *, novelty: float = 0.5, duplicate: bool | None = None) -> dict:
+    # The runner penalizes every duplicate, whatever status it ends up with.
+    duplicate = status == "duplicate" if duplicate is None else duplicate
+    ev = evaluate_pair(ref_text=ref, hyp_text=hyp)
+    s_total = score_total(
+        cer=ev["cer"],
+        wer=ev["wer"],
+        critical=ev["critical_error_score"],
+        novelty=novelty,
+        duplication_penalty=1.0 if duplicate else 0.0,
+        lang_guess=ev["lang_guess"],
+    )
+    return {
+        "id": case_id,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "ref_text": ref,
+        "hyp_text": hyp,
+        "lang_guess": ev["lang_guess"],
+        "cer": ev["cer"],
+        "wer": ev["wer"],
+        "len_ratio": ev["len_ratio"],
+        "critical_error_score": ev["critical_error_score"],
+        "score_total": s_total,
+        "novelty": novelty,
+        "is_duplicate": int(duplicate),
+        "tags": json.dumps(ev["tags"]),
+        "signature": ev["signature_json"],
+        "cluster_id": ev["cluster_id"],
+        "status": status,
+    }
+
+
+class TestRescore(unittest.TestCase):
+    def _db(self, td: str) -> pathlib.Path:
+        path = pathlib.Path(td) / "bugs.sqlite"
+        with BugDB(path) as db:
+            db.upsert_case(_row("a", "银行的行长今天不在，请稍后再来。", "银行的行走今天不在，请稍后再来。", "rejected", novelty=0.0))
+            db.upsert_case(_row("b", "我今天不去公司。", "我今天去公司。", "accepted", novelty=0.8))
+            db.upsert_case(_row("c", "请把行李放到行李架上。", "请把星星放到星星架上。", "accepted"))
+            db.upsert_case(_row("d", "我明天不去学校。", "我明天去学校。", "duplicate"))
+        return path
+
+    def _snapshot(self, path: pathlib.Path) -> list[tuple]:
+        with BugDB(path) as db:
+            return [tuple(r) for r in db.conn.execute("SELECT id, status, round(score_total, 6), signature FROM cases ORDER BY id")]
+
+    def test_same_thresholds_change_nothing(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = self._db(td)
+            before = self._snapshot(path)
+            stats = rescore(db_path=path, statuses=None, thresholds=_THRESHOLDS, workers=1, batch_size=1)
+            self.assertEqual(stats["cases"], 4)
+            self.assertEqual(stats["changed"], 0)
+            self.assertEqual(self._snapshot(path), before)
+
+    def test_stricter_thresholds_and_dry_run(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = self._db(td)
+            before = self._snapshot(path)
+            strict = dict(_THRESHOLDS, min_cer=0.9, min_critical=0.99)
+            stats = rescore(db_path=path, statuses=None, thresholds=strict, workers=1, batch_size=2, dry_run=True)
+            self.assertEqual(stats["transitions"].get(("accepted", "rejected")), 1)
+            self.assertEqual(self._snapshot(path), before)
+
+            stats = rescore(db_path=path, statuses=["accepted"], thresholds=strict, workers=1, batch_size=2)
+            self.assertEqual(stats["cases"], 2)
+            with BugDB(path) as db:
+                status = dict(db.conn.execute("SELECT id, status FROM cases").fetchall())
+            self.assertEqual(status["c"], "rejected")
+            self.assertEqual(status["b"], "accepted")
+            self.assertEqual(status["d"], "duplicate")
+
+    def test_keeps_stored_novelty(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = self._db(td)
+            with BugDB(path) as db:
+                # A duplicate whose stored score was clamped at 0: nothing to solve novelty back from.
+                db.conn.execute("UPDATE cases SET novelty = 0.3, score_total = 0.0 WHERE id = 'd'")
+                # A row from before the novelty column: solved back from its score.
+                db.conn.execute("UPDATE cases SET novelty = NULL WHERE id = 'b'")
+            rescore(db_path=path, statuses=None, thresholds=_THRESHOLDS, workers=1)
+            with BugDB(path) as db:
+                rows = {r["id"]: r for r in db.conn.execute("SELECT id, status, novelty, score_total FROM cases")}
+            d = _row("d", "我明天不去学校。", "我明天去学校。", "duplicate", novelty=0.3)
+            self.assertEqual(rows["d"]["status"], "duplicate")
+            self.assertAlmostEqual(rows["d"]["novelty"], 0.3)
+            self.assertAlmostEqual(rows["d"]["score_total"], d["score_total"])
+            self.assertEqual(rows["b"]["status"], "accepted")
+            self.assertAlmostEqual(rows["b"]["novelty"], 0.8)
+            self.assertAlmostEqual(rows["a"]["novelty"], 0.0)
+
+    def test_rejected_duplicate_stays_duplicate(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = self._db(td)
+            with BugDB(path) as db:
+                db.upsert_case(_row("e", "银行的行长明天不在，请稍后再来。", "银行的行走明天不在，请稍后再来。", "rejected", novelty=0.1, duplicate=True))
+                # Stored before the is_duplicate column: the flag is solved back from the score.
+                db.upsert_case(_row("f", "医院的大夫今天不在，请稍后再来。", "医院的大夫今天不再，请稍后再来。", "rejected", novelty=0.1, duplicate=True))
+                db.conn.execute("UPDATE cases SET is_duplicate = NULL WHERE id = 'f'")
+            loose = dict(_THRESHOLDS, min_cer=0.05)
+            stats = rescore(db_path=path, statuses=["rejected"], thresholds=loose, workers=1)
+            self.assertEqual(stats["transitions"].get(("rejected", "duplicate")), 2)
+            self.assertEqual(stats["transitions"].get(("rejected", "accepted")), 1)
+            with BugDB(path) as db:
+                rows = {r["id"]: tuple(r)[1:] for r in db.conn.execute("SELECT id, status, is_duplicate FROM cases")}
+            self.assertEqual(rows["e"], ("duplicate", 1))
+            self.assertEqual(rows["f"], ("duplicate", 1))
+            self.assertEqual(rows["a"], ("accepted", 0))
+
+    def test_tier1_rows_get_novelty_once_they_pass(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = self._db(td)
+            with BugDB(path) as db:
+                # As the runner writes a tier-1 reject: never deduped, so no signature or novelty.
+                db.conn.execute(
+                    "UPDATE cases SET signature = NULL, cluster_id = NULL, novelty = NULL, is_duplicate = NULL WHERE id = 'a'"
+                )
+            rescore(db_path=path, statuses=["rejected"], thresholds=_THRESHOLDS, workers=1)
+            with BugDB(path) as db:
+                self.assertIsNone(db.conn.execute("SELECT novelty FROM cases WHERE id = 'a'").fetchone()[0])
+
+            loose = dict(_THRESHOLDS, min_cer=0.05)
+            rescore(db_path=path, statuses=["rejected"], thresholds=loose, workers=1)
+            with BugDB(path) as db:
+                row = db.conn.execute("SELECT status, novelty, signature FROM cases WHERE id = 'a'").fetchone()
+            self.assertIsNotNone(row["signature"])
+            # Deduped against the accepted b and c, neither of which is close to it.
+            self.assertGreater(row["novelty"], 0.5)
+            self.assertEqual(row["status"], "accepted")
+
+    def test_dry_run_writes_nothing(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = self._db(td)
+            with BugDB(path) as db:
+                db.conn.execute("DELETE FROM sqlite_stat1")
+            before = path.read_bytes()
+            rescore(db_path=path, statuses=None, thresholds=dict(_THRESHOLDS, min_cer=0.9), workers=1, dry_run=True)
+            # A WAL reader leaves an (empty) -wal file behind; the DB itself is untouched.
+            self.assertEqual(path.read_bytes(), before)
+            self.assertEqual(path.with_name(path.name + "-wal").read_bytes(), b"")
+
+            with BugDB(path) as db:
+                db.conn.execute("DELETE FROM schema_version WHERE version = ?", (SCHEMA_VERSION,))
+            with self.assertRaisesRegex(RuntimeError, "migrate"):
+                rescore(db_path=path, statuses=None, thresholds=_THRESHOLDS, workers=1, dry_run=True)
+            with self.assertRaises(FileNotFoundError):
+                rescore(db_path=path.with_name("missing.sqlite"), statuses=None, thresholds=_THRESHOLDS, dry_run=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
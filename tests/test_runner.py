@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import pathlib
+import tempfile
+import unittest
+
+from tts_bug_finder.db import BugDB
+from tts_bug_finder.runner import _score_batch, run_search
+
+_THRESHOLDS = {"min_plausibility": 0.7, "min_cer": 0.35, "min_wer": 0.40, "min_critical": 0.8}
+
+
+def _run(root: pathlib.Path, *, inline_scoring: bool, random_seed: int = 1337) -> list[tuple]:
+    db_path = root / "bugs.sqlite"
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_search(
+            db_path=db_path,
+            artifacts_dir=root,
+            budget_total_eval=80,
+            budget_accepted=1000,
+            concurrency=8,
+            time_limit_sec=0.0,
+            tts_kind="dummy",
+            asr_kind="dummy",
+            llm_kind="none",
+            enable_llm=False,
+            voice=None,
+            mutate=True,
+            random_seed=random_seed,
+            max_depth=2,
+            t2s=True,
+            seed_tags="",
+            only_hanzi=False,
+            bootstrap_from_accepted=True,
+            persist_seen=True,
+            kimi=False,
+            kimi_timeout_sec=1.0,
+            kimi_max_patterns=1,
+            thresholds=_THRESHOLDS,
+            scoring_workers=2,
+            inline_scoring=inline_scoring,
+        )
+    with BugDB(db_path) as db:
+        return [
+            tuple(r)
+            for r in db.conn.execute("SELECT ref_text, hyp_text, status, cluster_id FROM cases ORDER BY ref_text, hyp_text")
+        ]
+
+
+class TestRunner(unittest.TestCase):
+    def test_score_batch_is_compact(self) -> None:
+        pairs = [
+            {"ref_text": "今天天气很好，我们去公园散步吧。", "hyp_text": "今天天气很好，我们去公园散步吧。", "base_tags": ()},
+            {"ref_text": "不要把验证码告诉任何人。", "hyp_text": "要把验证码告诉任何人。", "base_tags": ()},
+        ]
+        same, flipped = _score_batch(pairs, t2s=True, thresholds=_THRESHOLDS, compared=[])
+        self.assertNotIn("alignment", same)
+        self.assertEqual(same["tier"], 1)
+        self.assertNotIn("sims", same)
+        self.assertEqual(flipped["tier"], 2)
+        self.assertEqual(flipped["sims"], (0.0, 0.0, 0.0))
+
+    def test_process_pool_matches_inline(self) -> None:
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            inline = _run(pathlib.Path(a), inline_scoring=True)
+            pooled = _run(pathlib.Path(b), inline_scoring=False)
+            self.assertEqual(len(inline), 80)
+            self.assertEqual(inline, pooled)
+            # A second run starts the workers with the first run's accepted cases as history.
+            inline = _run(pathlib.Path(a), inline_scoring=True, random_seed=7)
+            pooled = _run(pathlib.Path(b), inline_scoring=False, random_seed=7)
+        self.assertEqual(len(inline), 160)
+        self.assertEqual(inline, pooled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from tts_bug_finder import metrics
+from tts_bug_finder import sweep as sweep_mod
+from tts_bug_finder.db import BugDB
+from tts_bug_finder.scoring import is_accepted
+from tts_bug_finder.sweep import parse_grid, sweep
+
+_CASES = [
+    # (plausibility, cer, wer, critical, lang, cluster_id)
+    (0.9, 0.50, 0.0, 0.0, "zh", "c1"),
+    (0.9, 0.30, 0.0, 0.0, "zh", "c1"),
+    (0.75, 0.10, 0.0, 0.9, "zh", "c2"),
+    (0.65, 0.60, 0.0, 0.0, "zh", "c3"),
+    (1.0, 0.0, 0.45, 0.0, "en", "c4"),
+    (1.0, 0.0, 0.35, 0.0, "en", None),
+    (0.8, 0.38, 0.0, 0.0, "mixed", None),
+]
+
+_GRIDS = {
+    "min_plausibility": [0.6, 0.7, 0.8],
+    "min_cer": [0.3, 0.35, 0.4],
+    "min_wer": [0.3, 0.4],
+    "min_critical": [0.8, 0.95],
+}
+
+
+def _write_db(path: pathlib.Path, cases: list[tuple]) -> None:
+    with BugDB(path) as db:
+        for i, (plaus, cer, wer, crit, lang, cluster) in enumerate(cases):
+            db.upsert_case(
+                {
+                    "id": f"{path.stem}-{i}",
+                    "created_at": "2026-01-01T00:00:00+00:00",
+                    "ref_text": "r",
+                    "hyp_text": "h",
+                    "status": "rejected",
+                    "plausibility": plaus,
+                    "cer": cer,
+                    "wer": wer,
+                    "critical_error_score": crit,
+                    "lang_guess": lang,
+                    "cluster_id": cluster,
+                }
+            )
+
+
+def _expected(cases: list[tuple], row: dict) -> tuple[int, int, int]:
+    kept = [
+        c
+        for c in cases
+        if is_accepted(plausibility=c[0], cer=c[1], wer=c[2], critical=c[3], lang_guess=c[4], thresholds=row)
+    ]
+    return len(kept), len({c[5] for c in kept if c[5] is not None}), sum(c[5] is None for c in kept)
+
+
+def _run(db_paths: list[pathlib.Path]) -> list[dict]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sweep(db_paths=db_paths, grids=_GRIDS)
+
+
+class TestSweep(unittest.TestCase):
+    def test_parse_grid(self) -> None:
+        self.assertEqual(parse_grid("0.4,0.3,0.4"), [0.3, 0.4])
+        self.assertEqual(parse_grid("0.25:0.45:0.05"), [0.25, 0.3, 0.35, 0.4, 0.45])
+
+    def test_matches_is_accepted(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            path = pathlib.Path(td) / "bugs.sqlite"
+            _write_db(path, _CASES)
+            rows = _run([path])
+            self.assertEqual(len(rows), 3 * 3 * 2 * 2)
+            for row in rows:
+                self.assertEqual((row["kept"], row["clusters"], row["unclustered"]), _expected(_CASES, row), row)
+
+            # Pure-SQL path (no NumPy) gives the same table.
+            with mock.patch.object(metrics, "_NUMPY", False):
+                self.assertEqual(_run([path]), rows)
+
+    def test_extract_refreshes_and_merges_dbs(self) -> None:
+        if not metrics._get_numpy():
+            self.skipTest("numpy not installed")
+        with tempfile.TemporaryDirectory() as td:
+            a = pathlib.Path(td) / "a.sqlite"
+            b = pathlib.Path(td) / "b.sqlite"
+            _write_db(a, _CASES[:4])
+            _write_db(b, _CASES[4:] + [(0.9, 0.9, 0.0, 0.0, "zh", "c1")])
+            _, _, rebuilt = sweep_mod.load_extract(a)
+            self.assertTrue(rebuilt)
+            _, _, rebuilt = sweep_mod.load_extract(a)
+            self.assertFalse(rebuilt)
+
+            extra = [(0.9, 0.9, 0.0, 0.0, "zh", "c1")]
+            rows = _run([a, b])
+            for row in rows:
+                self.assertEqual((row["kept"], row["clusters"], row["unclustered"]), _expected(_CASES + extra, row), row)
+
+            with BugDB(a) as db:
+                db.conn.execute("UPDATE cases SET cluster_id='c9' WHERE cluster_id='c3'")
+            _, meta, rebuilt = sweep_mod.load_extract(a)
+            self.assertTrue(rebuilt)
+            self.assertIn("c9", meta["clusters"])
+
+
+if __name__ == "__main__":
+    unittest.main()
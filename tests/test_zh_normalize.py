@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import random
+import unittest
+
+from tts_bug_finder import zh_normalize
+from tts_bug_finder.seeds import SEEDS
+
+
+@unittest.skipUnless(zh_normalize._get_opencc_t2s(), "opencc not installed")
+class TestToSimplified(unittest.TestCase):
+    def test_matches_opencc(self) -> None:
+        cc = zh_normalize._get_opencc_t2s()
+        (_, _, phrases), (_, _, chars) = cc._dict_chain_data[0]
+        rng = random.Random(0)
+        pool = list(chars) + list("你好世界，。 .-abc123鍾乾") + list(phrases)
+        texts = [s.text for s in SEEDS]
+        texts += ["".join(rng.choice(pool) for _ in range(rng.randrange(12))) for _ in range(2000)]
+        texts += ["頭髮乾淨", "一目瞭然的說明", "乾隆", "老態龍鍾。鍾繇"]
+        zh_normalize._convert_t2s.cache_clear()
+        for text in texts:
+            self.assertEqual(zh_normalize.to_simplified(text), cc.convert(text), text)
+
+    def test_plain_text_is_returned_unchanged(self) -> None:
+        text = "这是简体中文 with ASCII 123。"
+        self.assertIs(zh_normalize.to_simplified(text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
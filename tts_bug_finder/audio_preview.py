@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import io
+import pathlib
+import wave
+
+from .metrics import _get_numpy
+
+PREVIEW_BITS = (8, 16)
+
+
+def check_preview(*, rate: int, bits: int) -> tuple[int, int] | None:
+    """Normalize the --preview-rate/--preview-bits pair: None when neither is set (keep the original WAV)."""
+    if not rate and not bits:
+        return None
+    if bits and bits not in PREVIEW_BITS:
+        raise ValueError(f"preview bits must be one of {PREVIEW_BITS}, got {bits}")
+    if rate < 0:
+        raise ValueError(f"preview rate must be positive, got {rate}")
+    if not _get_numpy():
+        raise RuntimeError("--preview-rate/--preview-bits need numpy (pip install -e '.[fast]')")
+    return rate, bits or 16
+
+
+def _read_pcm(path: pathlib.Path):
+    """(frames as float32 in [-1, 1], shape (n, channels), sample rate). Raises wave.Error for non-PCM files."""
+    np = _get_numpy()
+    with wave.open(str(path), "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        x = (np.where(v >= 1 << 23, v - (1 << 24), v)).astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise wave.Error(f"unsupported sample width {width}")
+    return x.reshape(-1, channels), rate
+
+
+def _resample(x, src_rate: int, dst_rate: int):
+    """Band-limited resampling of every channel by truncating the spectrum (one clip at a time)."""
+    np = _get_numpy()
+    n = x.shape[0]
+    m = max(1, int(round(n * dst_rate / src_rate)))
+    spec = np.fft.rfft(x, axis=0)[: m // 2 + 1]
+    return (np.fft.irfft(spec, n=m, axis=0) * (m / n)).astype(np.float32)
+
+
+def preview_wav(path: pathlib.Path, *, rate: int, bits: int) -> bytes:
+    """`path` re-encoded as a smaller WAV: downsampled to `rate` (0 or a higher rate keeps the
+    original) and requantized to `bits` (8: unsigned PCM, 16: signed PCM)."""
+    np = _get_numpy()
+    x, src_rate = _read_pcm(path)
+    out_rate = src_rate
+    if rate and rate < src_rate and x.shape[0] > 1:
+        x = _resample(x, src_rate, rate)
+        out_rate = rate
+    x = np.clip(x, -1.0, 1.0)
+    if bits == 8:
+        pcm = (np.round(x * 127.0) + 128.0).astype(np.uint8)
+    else:
+        pcm = np.round(x * 32767.0).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(x.shape[1])
+        w.setsampwidth(bits // 8)
+        w.setframerate(out_rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
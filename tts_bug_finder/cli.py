@@ -3,9 +3,40 @@ from __future__ import annotations
 import argparse
 import pathlib
 
-from .exporter import export_cases
+from .audio_preview import PREVIEW_BITS, check_preview
+from .db import MIGRATION_CHUNK_ROWS, BugDB, CaseFilter, parse_statuses
+from .export_shards import export_shards
+from .exporter import EXPORT_FORMATS, export_cases
+from .migrate import migrate_db
+from .recluster import MIN_SIG_THRESHOLD, recluster
 from .report_html import write_html_report
+from .report_sharded import write_sharded_report
+from .rescore import rescore
 from .runner import run_search
+from .sweep import parse_grid, sweep
+
+
+def _add_filter_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--tag", default="", help="Only cases with any of these comma-separated tags")
+    p.add_argument("--cluster", default="", help="Only cases in any of these comma-separated cluster ids")
+    p.add_argument("--created-after", default=None, help="Only cases created at or after this ISO timestamp (a date works)")
+    p.add_argument("--created-before", default=None, help="Only cases created before this ISO timestamp")
+
+
+def _case_filter(args: argparse.Namespace) -> CaseFilter:
+    return CaseFilter.parse(
+        tag=args.tag, cluster=args.cluster, created_after=args.created_after, created_before=args.created_before
+    )
+
+
+def _check_readable(parser: argparse.ArgumentParser, db_paths: list[str]) -> None:
+    # Read-only commands neither create nor migrate a DB; report why one cannot be read.
+    for p in db_paths:
+        try:
+            with BugDB(pathlib.Path(p), readonly=True):
+                pass
+        except (FileNotFoundError, RuntimeError) as e:
+            parser.error(str(e))
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -45,15 +76,45 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     run_p.add_argument("--bootstrap-from-accepted", action=argparse.BooleanOptionalAction, default=True)
     run_p.add_argument("--persist-seen", action=argparse.BooleanOptionalAction, default=True)
+    run_p.add_argument(
+        "--seen-store-text",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Also store the normalized text of each seen entry (debugging; only keys are needed)",
+    )
     run_p.add_argument("--kimi", action="store_true", help="Use `kimi` CLI for semantic + novelty checks")
     run_p.add_argument("--kimi-timeout-sec", type=float, default=60.0)
     run_p.add_argument("--kimi-max-patterns", type=int, default=120)
+    run_p.add_argument(
+        "--global-dedupe-index",
+        default=None,
+        help="Shared append-only index (JSONL) of accepted cases; dedupe also against other campaigns using it.",
+    )
+    run_p.add_argument("--scoring-workers", type=int, default=0, help="Scoring processes; 0 means os.cpu_count()")
+    run_p.add_argument(
+        "--inline-scoring",
+        action="store_true",
+        help="Score on the event loop thread instead of a process pool (debugging; reproducible order)",
+    )
 
     exp_p = sub.add_parser("export", help="Export cases from SQLite")
     exp_p.add_argument("--db", default="artifacts/bugs.sqlite")
     exp_p.add_argument("--out", default="artifacts/exports/export.jsonl")
-    exp_p.add_argument("--format", choices=["jsonl"], default="jsonl")
-    exp_p.add_argument("--status", default="accepted")
+    exp_p.add_argument(
+        "--format",
+        choices=[*EXPORT_FORMATS, "shards"],
+        default="jsonl",
+        help="shards: WebDataset-style tar shards (wav + ref/hyp text + json) in the --out directory",
+    )
+    exp_p.add_argument("--status", default="accepted", help="Comma-separated; 'all' for every case")
+    exp_p.add_argument(
+        "--since",
+        default=None,
+        help="Append only cases added after this: 'last' (where the previous export to --out stopped), a rowid, or a created_at timestamp",
+    )
+    exp_p.add_argument("--shard-size-mb", type=float, default=256.0, help="shards: target tar size")
+    exp_p.add_argument("--workers", type=int, default=8, help="shards: threads reading and hashing audio")
+    _add_filter_args(exp_p)
 
     rep_p = sub.add_parser("report", help="Generate a single static HTML report (audio + GT + ASR)")
     rep_p.add_argument("--db", nargs="+", default=["artifacts/bugs.sqlite"])
@@ -61,6 +122,69 @@ def _build_parser() -> argparse.ArgumentParser:
     rep_p.add_argument("--status", default="accepted")
     rep_p.add_argument("--limit", type=int, default=0, help="0 means no limit")
     rep_p.add_argument("--bundle-audio", action=argparse.BooleanOptionalAction, default=True)
+    rep_p.add_argument(
+        "--layout",
+        choices=["single", "sharded"],
+        default="single",
+        help="single: one self-contained HTML; sharded: small index + <out>_files/ (chunked metadata, audio loaded on open)",
+    )
+    rep_p.add_argument(
+        "--preview-rate",
+        type=int,
+        default=0,
+        help="Re-encode bundled audio at this sample rate (e.g. 16000; needs numpy). 0 keeps the original",
+    )
+    rep_p.add_argument(
+        "--preview-bits",
+        type=int,
+        choices=PREVIEW_BITS,
+        default=0,
+        help="Re-encode bundled audio as 8- or 16-bit PCM (needs numpy)",
+    )
+    rep_p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="sharded only: render just the cases that are new or changed since the last run (see <out>_files/manifest.json)",
+    )
+    _add_filter_args(rep_p)
+
+    rc_p = sub.add_parser("recluster", help="Offline re-clustering of all cases across one or more DBs")
+    rc_p.add_argument("--db", nargs="+", default=["artifacts/bugs.sqlite"])
+    rc_p.add_argument("--status", default="accepted,duplicate,candidate", help="Comma-separated; 'all' for every case")
+    rc_p.add_argument("--workers", type=int, default=0, help="0 means os.cpu_count()")
+    rc_p.add_argument("--text-threshold", type=float, default=0.85)
+    rc_p.add_argument(
+        "--sig-threshold",
+        type=float,
+        default=0.8,
+        help=f"Signature similarity above which cases merge; at least {MIN_SIG_THRESHOLD} (lower values need all-pairs comparison)",
+    )
+    rc_p.add_argument("--batch-size", type=int, default=20000, help="Pairs per worker task and rows per write transaction")
+    rc_p.add_argument("--dry-run", action="store_true")
+
+    rs_p = sub.add_parser("rescore", help="Re-run scoring and status decisions on stored cases (e.g. after changing thresholds)")
+    rs_p.add_argument("--db", default="artifacts/bugs.sqlite")
+    rs_p.add_argument("--status", default="all", help="Comma-separated; 'all' for every case")
+    rs_p.add_argument("--workers", type=int, default=0, help="0 means os.cpu_count()")
+    rs_p.add_argument("--batch-size", type=int, default=2000, help="Rows per worker task and per write transaction")
+    rs_p.add_argument("--min-plausibility", type=float, default=0.7)
+    rs_p.add_argument("--min-cer", type=float, default=0.35)
+    rs_p.add_argument("--min-wer", type=float, default=0.40)
+    rs_p.add_argument("--min-critical", type=float, default=0.8)
+    rs_p.add_argument("--t2s", action=argparse.BooleanOptionalAction, default=True)
+    rs_p.add_argument("--dry-run", action="store_true", help="Only print status transitions")
+
+    sw_p = sub.add_parser("sweep", help="Kept-case counts and cluster coverage over a grid of thresholds (stored metrics)")
+    sw_p.add_argument("--db", nargs="+", default=["artifacts/bugs.sqlite"])
+    sw_p.add_argument("--min-plausibility", default="0.6,0.7,0.8", help="Comma-separated values or start:stop:step")
+    sw_p.add_argument("--min-cer", default="0.25:0.45:0.05")
+    sw_p.add_argument("--min-wer", default="0.40")
+    sw_p.add_argument("--min-critical", default="0.8")
+
+    mg_p = sub.add_parser("migrate", help="Upgrade DBs to the current schema (backfills run in resumable chunks)")
+    mg_p.add_argument("--db", nargs="+", default=["artifacts/bugs.sqlite"])
+    mg_p.add_argument("--chunk-rows", type=int, default=MIGRATION_CHUNK_ROWS, help="Rowids per backfill transaction")
+    mg_p.add_argument("--dry-run", action="store_true", help="Only list the pending steps")
 
     return parser
 
@@ -68,6 +192,8 @@ def _build_parser() -> argparse.ArgumentParser:
 def main(argv: list[str] | None = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
+    if args.cmd in ("export", "report", "sweep") or (args.cmd in ("rescore", "recluster") and args.dry_run):
+        _check_readable(parser, args.db if isinstance(args.db, list) else [args.db])
 
     if args.cmd == "run":
         run_search(
@@ -99,6 +225,23 @@ def main(argv: list[str] | None = None) -> int:
                 "min_wer": args.min_wer,
                 "min_critical": args.min_critical,
             },
+            global_dedupe_index=pathlib.Path(args.global_dedupe_index) if args.global_dedupe_index else None,
+            scoring_workers=args.scoring_workers,
+            inline_scoring=args.inline_scoring,
+            seen_store_text=args.seen_store_text,
+        )
+        return 0
+
+    if args.cmd == "export" and args.format == "shards":
+        if args.since is not None:
+            parser.error("--format shards always resumes where the shards in --out end; drop --since")
+        export_shards(
+            db_path=pathlib.Path(args.db),
+            out_dir=pathlib.Path(args.out),
+            status=args.status,
+            shard_size_mb=float(args.shard_size_mb),
+            workers=int(args.workers),
+            case_filter=_case_filter(args),
         )
         return 0
 
@@ -108,18 +251,83 @@ def main(argv: list[str] | None = None) -> int:
             out_path=pathlib.Path(args.out),
             fmt=args.format,
             status=args.status,
+            since=args.since,
+            case_filter=_case_filter(args),
         )
         return 0
 
     if args.cmd == "report":
-        write_html_report(
+        try:
+            preview = check_preview(rate=int(args.preview_rate), bits=int(args.preview_bits))
+        except (ValueError, RuntimeError) as e:
+            parser.error(str(e))
+        report_kwargs = dict(
             db_paths=[pathlib.Path(p) for p in args.db],
             out_path=pathlib.Path(args.out),
             status=args.status,
             limit=int(args.limit),
             bundle_audio=bool(args.bundle_audio),
+            preview=preview,
+            case_filter=_case_filter(args),
+        )
+        if args.layout == "sharded":
+            write_sharded_report(**report_kwargs, incremental=bool(args.incremental))
+        elif args.incremental:
+            parser.error("--incremental requires --layout sharded")
+        else:
+            write_html_report(**report_kwargs)
+        return 0
+
+    if args.cmd == "recluster":
+        if args.sig_threshold < MIN_SIG_THRESHOLD:
+            parser.error(f"--sig-threshold must be at least {MIN_SIG_THRESHOLD}")
+        recluster(
+            db_paths=[pathlib.Path(p) for p in args.db],
+            statuses=parse_statuses(args.status),
+            workers=int(args.workers),
+            text_threshold=float(args.text_threshold),
+            sig_threshold=float(args.sig_threshold),
+            batch_size=max(1, int(args.batch_size)),
+            dry_run=bool(args.dry_run),
+        )
+        return 0
+
+    if args.cmd == "rescore":
+        rescore(
+            db_path=pathlib.Path(args.db),
+            statuses=parse_statuses(args.status),
+            thresholds={
+                "min_plausibility": args.min_plausibility,
+                "min_cer": args.min_cer,
+                "min_wer": args.min_wer,
+                "min_critical": args.min_critical,
+            },
+            t2s=args.t2s,
+            workers=int(args.workers),
+            batch_size=max(1, int(args.batch_size)),
+            dry_run=bool(args.dry_run),
         )
         return 0
 
+    if args.cmd == "sweep":
+        sweep(
+            db_paths=[pathlib.Path(p) for p in args.db],
+            grids={
+                "min_plausibility": parse_grid(args.min_plausibility),
+                "min_cer": parse_grid(args.min_cer),
+                "min_wer": parse_grid(args.min_wer),
+                "min_critical": parse_grid(args.min_critical),
+            },
+        )
+        return 0
+
+    if args.cmd == "migrate":
+        for p in args.db:
+            try:
+                migrate_db(db_path=pathlib.Path(p), chunk_rows=int(args.chunk_rows), dry_run=bool(args.dry_run))
+            except FileNotFoundError as e:
+                parser.error(str(e))
+        return 0
+
     parser.error(f"Unknown command: {args.cmd}")
     return 2
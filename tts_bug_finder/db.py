@@ -1,29 +1,501 @@
 from __future__ import annotations
 
+import array
+import bisect
 import contextlib
+import datetime as dt
+import functools
+import hashlib
 import json
 import pathlib
+import queue
 import sqlite3
-from typing import Any, Iterator
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+BUSY_TIMEOUT_SEC = 30.0
+ANALYSIS_LIMIT = 1000
+
+
+def parse_statuses(status: str) -> list[str] | None:
+    """Parse a comma-separated `--status` value; empty or `all` means no filter."""
+    s = (status or "").strip()
+    if not s or s.lower() == "all":
+        return None
+    return [p.strip() for p in s.split(",") if p.strip()]
+
+
+def _split_csv(value: str | None) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(p.strip() for p in (value or "").split(",") if p.strip()))
+
+
+@dataclass(frozen=True, slots=True)
+class CaseFilter:
+    """Tag / cluster / creation-time conditions on `cases`, shared by `report` and `export`.
+
+    Empty fields match everything.  Several tags (or clusters) match a case with any of
+    them.  Times compare against `created_at` as ISO-8601 text, so a bare date works:
+    `created_after` is inclusive, `created_before` exclusive.
+    """
+
+    tags: tuple[str, ...] = ()
+    clusters: tuple[str, ...] = ()
+    created_after: str | None = None
+    created_before: str | None = None
+
+    @classmethod
+    def parse(
+        cls,
+        *,
+        tag: str | None = None,
+        cluster: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+    ) -> "CaseFilter":
+        """Build a filter from comma-separated `--tag`/`--cluster` values and the time bounds."""
+        return cls(
+            tags=_split_csv(tag),
+            clusters=_split_csv(cluster),
+            created_after=created_after or None,
+            created_before=created_before or None,
+        )
+
+    def conditions(self) -> tuple[list[str], tuple[Any, ...]]:
+        """SQL conditions (to be AND-ed) and their parameters.
+
+        Tags are looked up in `case_tags`, so a rare tag costs an index probe rather than
+        a scan of `cases` decoding every `tags` JSON.
+        """
+        conds: list[str] = []
+        params: list[Any] = []
+        if self.tags:
+            conds.append(f"id IN (SELECT case_id FROM case_tags WHERE tag IN ({', '.join('?' for _ in self.tags)}))")
+            params.extend(self.tags)
+        if self.clusters:
+            conds.append(f"cluster_id IN ({', '.join('?' for _ in self.clusters)})")
+            params.extend(self.clusters)
+        if self.created_after is not None:
+            conds.append("created_at >= ?")
+            params.append(self.created_after)
+        if self.created_before is not None:
+            conds.append("created_at < ?")
+            params.append(self.created_before)
+        return conds, tuple(params)
+
+    def describe(self) -> str:
+        """Short human-readable form ('' when nothing is filtered); also stored in resume state."""
+        parts = []
+        if self.tags:
+            parts.append("tag=" + ",".join(self.tags))
+        if self.clusters:
+            parts.append("cluster=" + ",".join(self.clusters))
+        if self.created_after is not None:
+            parts.append(f"created>={self.created_after}")
+        if self.created_before is not None:
+            parts.append(f"created<{self.created_before}")
+        return " ".join(parts)
+
+
+NO_FILTER = CaseFilter()
+
+
+# Scoring inputs persisted per case (besides cer/wer/critical_error_score), NULL for older rows.
+METRIC_COLUMNS = (
+    "plausibility",
+    "crit_numbers",
+    "crit_negation",
+    "crit_truncation",
+    "crit_repetition",
+    "novelty",
+)
+
+
+def connect(path: pathlib.Path, *, readonly: bool = False) -> sqlite3.Connection:
+    """Open `path` in WAL mode: readers (e.g. `report` during a run) never block the writer,
+    and every commit survives a crash of the writing process.
+
+    With `readonly`, the file is opened `mode=ro`: nothing (schema, stats, journal mode)
+    can be written through the connection.
+    """
+    if readonly:
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SEC)
+        conn.row_factory = sqlite3.Row
+        return conn
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SEC)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode NORMAL only syncs at checkpoints; committed data is still crash-safe.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # ANALYZE (and PRAGMA optimize) samples at most this many index rows: a few ms at 1M cases.
+    conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+    return conn
+
+
+@functools.lru_cache(maxsize=64)
+def _upsert_sql(cols: tuple[str, ...]) -> str:
+    placeholders = ", ".join("?" for _ in cols)
+    assignments = ", ".join(f"{c}=excluded.{c}" for c in cols if c != "id")
+    return f"INSERT INTO cases ({', '.join(cols)}) VALUES ({placeholders}) ON CONFLICT(id) DO UPDATE SET {assignments}"
+
+
+_SEEN_SQL = "INSERT OR IGNORE INTO seen_keys(key, first_seen_at, text_norm) VALUES (?,?,?)"
+
+# Prefix of the SHA1 of a normalized text used as its seen key (collisions are
+# negligible: ~n/2**64 per lookup).
+SEEN_KEY_BYTES = 8
+
+
+def seen_key(text_norm: str) -> bytes:
+    return hashlib.sha1(text_norm.encode("utf-8", errors="ignore")).digest()[:SEEN_KEY_BYTES]
+
+
+def _tags_json_each(expr: str) -> str:
+    # Malformed or missing `tags` yield no rows instead of failing the write.
+    return f"json_each(CASE WHEN json_valid({expr}) THEN {expr} ELSE '[]' END)"
+
+
+_CASE_TAGS_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_case_tags_insert AFTER INSERT ON cases BEGIN
+      INSERT OR IGNORE INTO case_tags(case_id, tag)
+      SELECT NEW.id, t.value FROM {_tags_json_each("NEW.tags")} AS t WHERE t.type = 'text';
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_case_tags_update AFTER UPDATE OF id, tags ON cases
+    WHEN OLD.id IS NOT NEW.id OR OLD.tags IS NOT NEW.tags BEGIN
+      DELETE FROM case_tags WHERE case_id = OLD.id;
+      INSERT OR IGNORE INTO case_tags(case_id, tag)
+      SELECT NEW.id, t.value FROM {_tags_json_each("NEW.tags")} AS t WHERE t.type = 'text';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_case_tags_delete AFTER DELETE ON cases BEGIN
+      DELETE FROM case_tags WHERE case_id = OLD.id;
+    END
+    """,
+)
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _schema_cases(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cases (
+          id TEXT PRIMARY KEY,
+          created_at TEXT NOT NULL,
+          seed_id TEXT,
+          mutation_trace TEXT,
+          ref_text TEXT NOT NULL,
+          hyp_text TEXT NOT NULL,
+          audio_path_wav TEXT,
+          audio_path_mp3 TEXT,
+          duration_sec REAL,
+          lang_guess TEXT,
+          cer REAL,
+          wer REAL,
+          len_ratio REAL,
+          critical_error_score REAL,
+          score_total REAL,
+          tags TEXT,
+          signature TEXT,
+          cluster_id TEXT,
+          llm_summary TEXT,
+          status TEXT NOT NULL,
+          is_representative INTEGER
+        )
+        """
+    )
+
+
+def _schema_metric_columns(conn: sqlite3.Connection) -> None:
+    _ensure_column(conn, "cases", "is_representative", "INTEGER")
+    for column in METRIC_COLUMNS:
+        _ensure_column(conn, "cases", column, "REAL")
+
+
+def _schema_is_duplicate(conn: sqlite3.Connection) -> None:
+    # The runner's dedupe decision (1/0); NULL for rows it never deduped (tier-1 rejects)
+    # and for rows stored before the column existed.
+    _ensure_column(conn, "cases", "is_duplicate", "INTEGER")
+
+
+def _index(name: str, on: str) -> Callable[[sqlite3.Connection], None]:
+    # One index per step: building one holds the write lock (~1-2s per 1M cases), so they commit separately.
+    return lambda conn: conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {on}")
+
+
+def _schema_seen_keys(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS seen_keys (
+          key BLOB PRIMARY KEY,
+          first_seen_at INTEGER NOT NULL,
+          text_norm TEXT
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _backfill_seen_keys(conn: sqlite3.Connection, lo: int, hi: int) -> None:
+    """Copy `seen_texts` rows (hex SHA1 TEXT keys, ISO timestamps) into `seen_keys`."""
+    rows = []
+    for text_key, text_norm, first_seen_at in conn.execute(
+        "SELECT text_key, text_norm, first_seen_at FROM seen_texts WHERE rowid > ? AND rowid <= ?", (lo, hi)
+    ):
+        try:
+            key = bytes.fromhex(text_key)[:SEEN_KEY_BYTES]
+        except (TypeError, ValueError):
+            continue
+        try:
+            ts = int(dt.datetime.fromisoformat(first_seen_at).timestamp())
+        except (TypeError, ValueError):
+            ts = 0
+        rows.append((key, ts, text_norm))
+    conn.executemany(_SEEN_SQL, rows)
+
+
+def _drop_seen_texts(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP TABLE IF EXISTS seen_texts")
+
+
+def _schema_case_tags(conn: sqlite3.Connection) -> None:
+    """`case_tags`: one row per (case, tag) of `cases.tags`, kept in sync by triggers.
+
+    The triggers cover every writer (`upsert_case`, `BatchWriter`, `rescore`, ...)
+    without them knowing about the table; rows that predate it are backfilled.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS case_tags (
+          case_id TEXT NOT NULL,
+          tag TEXT NOT NULL,
+          PRIMARY KEY (case_id, tag)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_case_tags_tag ON case_tags(tag)")
+    for trigger in _CASE_TAGS_TRIGGERS:
+        conn.execute(trigger)
+
+
+def _backfill_case_tags(conn: sqlite3.Connection, lo: int, hi: int) -> None:
+    conn.execute(
+        "INSERT OR IGNORE INTO case_tags(case_id, tag) "
+        f"SELECT cases.id, t.value FROM cases, {_tags_json_each('cases.tags')} AS t "
+        "WHERE cases.rowid > ? AND cases.rowid <= ? AND t.type = 'text'",
+        (lo, hi),
+    )
+
+
+def _backfill_crit_negation(conn: sqlite3.Connection, lo: int, hi: int) -> None:
+    # The runner stores crit_negation = signature.negation_flip; older rows only have the signature.
+    flip = "(CASE WHEN json_valid(signature) THEN json_type(signature, '$.negation_flip') END)"
+    conn.execute(
+        f"UPDATE cases SET crit_negation = CASE {flip} WHEN 'true' THEN 1.0 ELSE 0.0 END "
+        f"WHERE rowid > ? AND rowid <= ? AND crit_negation IS NULL AND {flip} IN ('true', 'false')",
+        (lo, hi),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """One schema step.
+
+    `schema` is idempotent DDL (it also runs on DBs that predate `schema_version`) and is
+    applied in one transaction.  `backfill(conn, lo, hi)` then processes the rows of
+    `table` with `lo < rowid <= hi`; it runs in chunks of rowids, one short transaction
+    each, with its progress committed alongside, so a large DB stays writable and an
+    interrupted backfill resumes where it stopped.  `finish` runs in the transaction
+    that marks the step applied.
+    """
+
+    version: int
+    name: str
+    schema: Callable[[sqlite3.Connection], None] | None = None
+    backfill: Callable[[sqlite3.Connection, int, int], None] | None = None
+    table: str = "cases"
+    finish: Callable[[sqlite3.Connection], None] | None = None
+
+
+# Append only: a DB records the versions it has applied.
+MIGRATIONS = (
+    Migration(1, "cases table", _schema_cases),
+    Migration(2, "is_representative and metric columns", _schema_metric_columns),
+    Migration(3, "idx_cases_status", _index("idx_cases_status", "cases(status)")),
+    Migration(4, "idx_cases_score", _index("idx_cases_score", "cases(score_total)")),
+    # Lets `report` read each status best-first and stop after --limit rows.
+    Migration(5, "idx_cases_status_score", _index("idx_cases_status_score", "cases(status, score_total)")),
+    # Covering index for `sweep`: a scan of it reads only the threshold inputs.
+    Migration(
+        6,
+        "idx_cases_thresholds",
+        _index("idx_cases_thresholds", "cases(plausibility, critical_error_score, cer, wer, lang_guess, cluster_id)"),
+    ),
+    Migration(7, "seen_keys (from seen_texts)", _schema_seen_keys, _backfill_seen_keys, "seen_texts", _drop_seen_texts),
+    Migration(8, "case_tags table and triggers", _schema_case_tags, _backfill_case_tags),
+    Migration(9, "idx_cases_cluster", _index("idx_cases_cluster", "cases(cluster_id)")),
+    Migration(10, "idx_cases_seed", _index("idx_cases_seed", "cases(seed_id)")),
+    Migration(11, "idx_cases_created", _index("idx_cases_created", "cases(created_at)")),
+    Migration(12, "crit_negation from stored signatures", backfill=_backfill_crit_negation),
+    Migration(13, "is_duplicate column", _schema_is_duplicate),
+)
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+# Rowids per backfill transaction: well under a second each on a 1M-case DB.
+MIGRATION_CHUNK_ROWS = 20000
+
+
+@contextlib.contextmanager
+def _immediate(conn: sqlite3.Connection) -> Iterator[None]:
+    """A write transaction taken up front, so concurrent migrators queue on the busy timeout
+    instead of failing when a read transaction tries to upgrade to a write."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _ensure_version_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+          version INTEGER PRIMARY KEY,
+          name TEXT NOT NULL,
+          applied_at TEXT,
+          backfill_rowid INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+def schema_state(conn: sqlite3.Connection) -> dict[int, tuple[str | None, int]]:
+    """`{version: (applied_at, backfill_rowid)}` of the recorded steps; applied_at is None while backfilling."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'").fetchone() is None:
+        return {}
+    return {int(v): (a, int(r)) for v, a, r in conn.execute("SELECT version, applied_at, backfill_rowid FROM schema_version")}
+
+
+def pending_migrations(conn: sqlite3.Connection) -> list[Migration]:
+    """`MIGRATIONS` not fully applied to `conn`'s DB yet (including interrupted backfills)."""
+    state = schema_state(conn)
+    newest = max(state, default=0)
+    if newest > SCHEMA_VERSION:
+        raise RuntimeError(f"DB schema version {newest} is newer than this tts_bug_finder supports ({SCHEMA_VERSION})")
+    return [m for m in MIGRATIONS if state.get(m.version, (None, 0))[0] is None]
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    *,
+    chunk_rows: int = MIGRATION_CHUNK_ROWS,
+    progress: Callable[[Migration, int, int], None] | None = None,
+) -> int:
+    """Apply the pending `MIGRATIONS` in order and return the resulting schema version.
+
+    Safe to run from several processes at once (each step and chunk re-checks the
+    recorded state inside its transaction) and to interrupt at any point.  `progress`
+    is called after each backfill chunk with (step, rowid reached, last rowid).
+    """
+    _ensure_version_table(conn)
+    state = schema_state(conn)
+    newest = max(state, default=0)
+    if newest > SCHEMA_VERSION:
+        raise RuntimeError(f"DB schema version {newest} is newer than this tts_bug_finder supports ({SCHEMA_VERSION})")
+    chunk_rows = max(1, chunk_rows)
+    for m in MIGRATIONS:
+        if m.version in state and state[m.version][0] is not None:
+            continue
+        if m.version not in state:
+            with _immediate(conn):
+                if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (m.version,)).fetchone() is None:
+                    if m.schema is not None:
+                        m.schema(conn)
+                    conn.execute(
+                        "INSERT INTO schema_version(version, name, applied_at) VALUES (?, ?, ?)",
+                        (m.version, m.name, None if m.backfill else _now_iso()),
+                    )
+        if m.backfill is None:
+            continue
+        # Rows added after the schema step are written complete (triggers, current writers).
+        end = 0
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (m.table,)).fetchone():
+            end = int(conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {m.table}").fetchone()[0])
+        while True:
+            with _immediate(conn):
+                applied_at, lo = conn.execute(
+                    "SELECT applied_at, backfill_rowid FROM schema_version WHERE version = ?", (m.version,)
+                ).fetchone()
+                if applied_at is not None:
+                    break
+                if lo >= end:
+                    if m.finish is not None:
+                        m.finish(conn)
+                    conn.execute("UPDATE schema_version SET applied_at = ? WHERE version = ?", (_now_iso(), m.version))
+                    break
+                hi = min(end, lo + chunk_rows)
+                m.backfill(conn, lo, hi)
+                conn.execute("UPDATE schema_version SET backfill_rowid = ? WHERE version = ?", (hi, m.version))
+            if progress is not None:
+                progress(m, hi, end)
+    return SCHEMA_VERSION
+
+
+def _now_iso() -> str:
+    return dt.datetime.now(dt.timezone.utc).isoformat()
 
 
 class BugDB(contextlib.AbstractContextManager["BugDB"]):
-    def __init__(self, path: pathlib.Path) -> None:
+    """The cases DB.
+
+    Commands that write (`run`, `rescore`, `recluster`) open it normally, which applies
+    pending migrations.  Read-only ones (`report`, `export`, `sweep`, dry runs) pass
+    `readonly`: the file is opened `mode=ro`, nothing is migrated or analyzed, and a DB
+    with pending steps is refused with a pointer to the `migrate` command.
+    """
+
+    def __init__(self, path: pathlib.Path, *, readonly: bool = False) -> None:
         self._path = path
+        self._readonly = readonly
         self._conn: sqlite3.Connection | None = None
 
     def __enter__(self) -> "BugDB":
+        if self._readonly:
+            if not self._path.exists():
+                raise FileNotFoundError(f"No such DB: {self._path}")
+            self._conn = connect(self._path, readonly=True)
+            try:
+                self._check_schema()
+            except BaseException:
+                self.close()
+                raise
+            return self
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(self._path)
-        self._conn.row_factory = sqlite3.Row
+        self._conn = connect(self._path)
         self._init()
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
-        if self._conn is not None:
+        if self._readonly:
+            self.close()
+        elif self._conn is not None:
             self._conn.commit()
-            self._conn.close()
-            self._conn = None
+            # Readers never analyze: leave statistics behind for a `case_tags` this run filled.
+            self._ensure_stats()
+            # Refreshes planner statistics of the tables this connection queried if they grew a lot.
+            self._conn.execute("PRAGMA optimize")
+            self.close()
 
     @property
     def conn(self) -> sqlite3.Connection:
@@ -31,53 +503,42 @@ class BugDB(contextlib.AbstractContextManager["BugDB"]):
             raise RuntimeError("DB not opened")
         return self._conn
 
-    def _init(self) -> None:
-        self.conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS cases (
-              id TEXT PRIMARY KEY,
-              created_at TEXT NOT NULL,
-              seed_id TEXT,
-              mutation_trace TEXT,
-              ref_text TEXT NOT NULL,
-              hyp_text TEXT NOT NULL,
-              audio_path_wav TEXT,
-              audio_path_mp3 TEXT,
-              duration_sec REAL,
-              lang_guess TEXT,
-              cer REAL,
-              wer REAL,
-              len_ratio REAL,
-              critical_error_score REAL,
-              score_total REAL,
-              tags TEXT,
-              signature TEXT,
-              cluster_id TEXT,
-              llm_summary TEXT,
-              status TEXT NOT NULL
-            )
-            """
-        )
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_status ON cases(status)")
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_score ON cases(score_total)")
-        self.conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS seen_texts (
-              text_key TEXT PRIMARY KEY,
-              text_norm TEXT,
-              first_seen_at TEXT NOT NULL
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _check_schema(self) -> None:
+        pending = pending_migrations(self.conn)
+        if pending:
+            raise RuntimeError(
+                f"{self._path} needs {len(pending)} schema migration step(s) (v{pending[0].version}..v{pending[-1].version}); "
+                f"run `python -m tts_bug_finder migrate --db {self._path}` first"
             )
-            """
-        )
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_first_seen ON seen_texts(first_seen_at)")
+
+    def _init(self) -> None:
+        # Pending steps (a new DB, or one written by an older version) are applied on open;
+        # `migrate` runs them ahead of time with progress.
+        migrate(self.conn)
+        self._ensure_stats()
+
+    def _ensure_stats(self) -> None:
+        """Collect planner statistics once `case_tags` has rows (PRAGMA optimize skips tables never analyzed).
+
+        Without them SQLite answers a tag filter by walking the status/score index and
+        probing every case, instead of starting from the tag's few rows in `case_tags`.
+        """
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'").fetchone():
+            if self.conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl='case_tags'").fetchone():
+                return
+        if self.conn.execute("SELECT 1 FROM case_tags LIMIT 1").fetchone() is None:
+            return
+        with self.conn:
+            self.conn.execute("ANALYZE")
 
     def upsert_case(self, row: dict[str, Any]) -> None:
-        cols = list(row.keys())
-        placeholders = ", ".join("?" for _ in cols)
-        assignments = ", ".join(f"{c}=excluded.{c}" for c in cols if c != "id")
-        sql = f"INSERT INTO cases ({', '.join(cols)}) VALUES ({placeholders}) ON CONFLICT(id) DO UPDATE SET {assignments}"
-        values = [row[c] for c in cols]
-        self.conn.execute(sql, values)
+        cols = tuple(row.keys())
+        self.conn.execute(_upsert_sql(cols), [row[c] for c in cols])
 
     def iter_cases(self, *, status: str | None = None) -> Iterator[dict[str, Any]]:
         if status is None:
@@ -108,13 +569,164 @@ class BugDB(contextlib.AbstractContextManager["BugDB"]):
             rows.append(d)
         return rows
 
+    def update_clusters(self, rows: list[tuple[str, int, int]]) -> None:
+        """Write `(cluster_id, is_representative, rowid)` assignments in one transaction."""
+        with self.conn:
+            self.conn.executemany("UPDATE cases SET cluster_id=?, is_representative=? WHERE rowid=?", rows)
+
     def count_by_status(self) -> dict[str, int]:
         cur = self.conn.execute("SELECT status, COUNT(*) AS c FROM cases GROUP BY status")
         return {r["status"]: int(r["c"]) for r in cur}
 
-    def mark_text_seen(self, *, text_key: str, text_norm: str, first_seen_at: str) -> bool:
-        cur = self.conn.execute(
-            "INSERT OR IGNORE INTO seen_texts(text_key, text_norm, first_seen_at) VALUES (?,?,?)",
-            (text_key, text_norm, first_seen_at),
-        )
+    def mark_text_seen(self, *, key: bytes, first_seen_at: int, text_norm: str | None = None) -> bool:
+        cur = self.conn.execute(_SEEN_SQL, (key, first_seen_at, text_norm))
         return cur.rowcount == 1
+
+    def load_seen(self) -> "SeenSet":
+        # `SeenSet` bisects, so keys must be sorted: memcmp order of the big-endian blobs.
+        # The ORDER BY is free (a walk of the WITHOUT ROWID primary key).
+        cur = self.conn.execute("SELECT key FROM seen_keys ORDER BY key")
+        cur.row_factory = None
+        keys = array.array("Q")
+        while True:
+            chunk = cur.fetchmany(100000)
+            if not chunk:
+                break
+            keys.frombytes(b"".join(k for (k,) in chunk if len(k) == SEEN_KEY_BYTES))
+        if sys.byteorder == "little":
+            keys.byteswap()
+        return SeenSet(keys)
+
+
+class SeenSet:
+    """Seen-text keys: a sorted `array('Q')` loaded from disk plus a set for this session.
+
+    8 bytes per stored key instead of a Python `str` object each, and lookups never
+    touch SQLite.
+    """
+
+    __slots__ = ("_stored", "_new")
+
+    def __init__(self, stored: array.array | None = None) -> None:
+        self._stored = stored if stored is not None else array.array("Q")
+        self._new: set[bytes] = set()
+
+    def __len__(self) -> int:
+        return len(self._stored) + len(self._new)
+
+    def __contains__(self, key: bytes) -> bool:  # type: ignore[override]
+        if key in self._new:
+            return True
+        stored = self._stored
+        k = int.from_bytes(key, "big")
+        i = bisect.bisect_left(stored, k)
+        return i < len(stored) and stored[i] == k
+
+    def add(self, key: bytes) -> None:
+        if key not in self:
+            self._new.add(key)
+
+
+class BatchWriter(contextlib.AbstractContextManager["BatchWriter"]):
+    """Write-behind for a `BugDB` file: a thread with its own connection drains a queue.
+
+    Writes are committed every `batch_rows` rows or `flush_ms` after the first pending
+    one, whichever comes first; consecutive rows with the same statement go through one
+    `executemany`.  Callers never wait on SQLite.  An error in the thread is re-raised
+    on the next call (or on exit).
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: pathlib.Path, *, batch_rows: int = 256, flush_ms: float = 200.0) -> None:
+        self._path = path
+        self._batch_rows = max(1, batch_rows)
+        self._flush_sec = max(0.0, flush_ms) / 1000.0
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+        self.rows_written = 0
+
+    def __enter__(self) -> "BatchWriter":
+        self._thread = threading.Thread(target=self._run, name="bugdb-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None and exc is None:
+            raise self._error
+
+    def _put(self, item: Any) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(item)
+
+    def upsert_case(self, row: dict[str, Any]) -> None:
+        cols = tuple(row.keys())
+        self._put((_upsert_sql(cols), tuple(row[c] for c in cols)))
+
+    def mark_text_seen(self, *, key: bytes, first_seen_at: int, text_norm: str | None = None) -> None:
+        self._put((_SEEN_SQL, (key, first_seen_at, text_norm)))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is committed."""
+        done = threading.Event()
+        self._put(done)
+        done.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _commit(self, conn: sqlite3.Connection, pending: list[tuple[str, tuple[Any, ...]]]) -> None:
+        if not pending or self._error is not None:
+            pending.clear()
+            return
+        try:
+            with conn:
+                i = 0
+                while i < len(pending):
+                    sql = pending[i][0]
+                    j = i
+                    while j < len(pending) and pending[j][0] == sql:
+                        j += 1
+                    conn.executemany(sql, [p[1] for p in pending[i:j]])
+                    i = j
+            self.rows_written += len(pending)
+        except BaseException as e:  # surfaced to the producer on its next call
+            self._error = e
+        pending.clear()
+
+    def _run(self) -> None:
+        try:
+            conn = connect(self._path)
+        except BaseException as e:
+            self._error = e
+            conn = None
+        pending: list[tuple[str, tuple[Any, ...]]] = []
+        deadline = 0.0
+        try:
+            while True:
+                timeout = max(0.0, deadline - time.monotonic()) if pending else None
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    self._commit(conn, pending)
+                    continue
+                if item is self._STOP:
+                    break
+                if isinstance(item, threading.Event):
+                    self._commit(conn, pending)
+                    item.set()
+                    continue
+                if not pending:
+                    deadline = time.monotonic() + self._flush_sec
+                pending.append(item)
+                if len(pending) >= self._batch_rows:
+                    self._commit(conn, pending)
+            self._commit(conn, pending)
+        finally:
+            if conn is not None:
+                conn.close()
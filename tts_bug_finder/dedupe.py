@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import difflib
 import json
 from typing import Any
 
 from .text_utils import fallback_similarity, normalize_for_similarity, normalize_for_similarity_no_punct
 
 
-def _rapidfuzz_ratio(a: str, b: str) -> float | None:
+_FUZZ = None
+
+
+def _get_rapidfuzz():
+    global _FUZZ
+    if _FUZZ is not None:
+        return _FUZZ
     try:
         from rapidfuzz import fuzz  # type: ignore
     except Exception:
+        _FUZZ = False
+        return _FUZZ
+    _FUZZ = fuzz
+    return _FUZZ
+
+
+def _rapidfuzz_ratio(a: str, b: str) -> float | None:
+    fuzz = _get_rapidfuzz()
+    if not fuzz:
         return None
     return fuzz.ratio(a, b) / 100.0
 
@@ -24,14 +40,31 @@ def text_similarity(a: str, b: str) -> float:
 
 
 def text_similarity_no_punct(a: str, b: str) -> float:
-    a_n = normalize_for_similarity_no_punct(a)
-    b_n = normalize_for_similarity_no_punct(b)
+    return normalized_text_similarity(normalize_for_similarity_no_punct(a), normalize_for_similarity_no_punct(b))
+
+
+def normalized_text_similarity(a_n: str, b_n: str) -> float:
+    """Similarity of two already-normalized strings (see `normalize_for_similarity_no_punct`)."""
     rf = _rapidfuzz_ratio(a_n, b_n)
     if rf is not None:
         return rf
     return fallback_similarity(a_n, b_n)
 
 
+def normalized_text_similarity_above(a_n: str, b_n: str, threshold: float) -> bool:
+    """`normalized_text_similarity(a_n, b_n) > threshold`, rejecting hopeless pairs via cheap upper bounds."""
+    total = len(a_n) + len(b_n)
+    if total == 0 or 2.0 * min(len(a_n), len(b_n)) / total <= threshold:
+        return False
+    fuzz = _get_rapidfuzz()
+    if fuzz:
+        return fuzz.ratio(a_n, b_n) / 100.0 > threshold
+    sm = difflib.SequenceMatcher(a=a_n, b=b_n)
+    if sm.quick_ratio() <= threshold:
+        return False
+    return sm.ratio() > threshold
+
+
 def signature_similarity(sig_a: dict[str, Any], sig_b: dict[str, Any]) -> float:
     subs_a = {tuple(x) for x in sig_a.get("top_subs", []) if isinstance(x, list) and len(x) == 2}
     subs_b = {tuple(x) for x in sig_b.get("top_subs", []) if isinstance(x, list) and len(x) == 2}
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import pathlib
+from typing import Any, Iterable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextlib.contextmanager
+def _locked(f: Any, *, exclusive: bool) -> Any:
+    if fcntl is None:
+        yield f
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield f
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class GlobalDedupeIndex(contextlib.AbstractContextManager["GlobalDedupeIndex"]):
+    """Append-only JSONL index of accepted cases shared by several runs.
+
+    Every line is one accepted case (`id`, `ref_text`, `hyp_text`, `signature`, `source`).
+    Writers append under an exclusive `flock`; readers take a shared lock and only read
+    the bytes appended since their last `refresh()`, so many runner processes can share
+    one file cheaply.
+    """
+
+    def __init__(self, path: pathlib.Path, *, source: str = "") -> None:
+        self._path = path
+        self._source = source
+        self._offset = 0
+        self._ids: set[str] = set()
+        self.entries: list[dict[str, Any]] = []
+
+    def __enter__(self) -> "GlobalDedupeIndex":
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.touch(exist_ok=True)
+        self.refresh()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
+        return None
+
+    def __contains__(self, case_id: object) -> bool:
+        return case_id in self._ids
+
+    def refresh(self) -> int:
+        """Read entries appended by any process since the last call. Returns the number of new entries."""
+        try:
+            size = os.path.getsize(self._path)
+        except OSError:
+            return 0
+        if size <= self._offset:
+            return 0
+        with self._path.open("rb") as f, _locked(f, exclusive=False):
+            f.seek(self._offset)
+            chunk = f.read()
+        # Only consume complete lines; a torn tail is picked up on the next refresh.
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return 0
+        self._offset += end + 1
+        added = 0
+        for raw in chunk[:end].splitlines():
+            if not raw.strip():
+                continue
+            try:
+                entry = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            if not isinstance(entry, dict):
+                continue
+            case_id = str(entry.get("id") or "")
+            if not case_id or case_id in self._ids:
+                continue
+            self._ids.add(case_id)
+            self.entries.append(entry)
+            added += 1
+        return added
+
+    def append(self, cases: Iterable[dict[str, Any]]) -> int:
+        """Append cases (skipping ids already in the index). Returns the number written."""
+        lines: list[str] = []
+        batch_ids: set[str] = set()
+        for c in cases:
+            case_id = str(c.get("id") or "")
+            if not case_id or case_id in self._ids or case_id in batch_ids:
+                continue
+            batch_ids.add(case_id)
+            entry = {
+                "id": case_id,
+                "ref_text": str(c.get("ref_text") or ""),
+                "hyp_text": str(c.get("hyp_text") or ""),
+                "signature": c.get("signature") or {},
+                "source": self._source,
+            }
+            lines.append(json.dumps(entry, ensure_ascii=False, sort_keys=True) + "\n")
+        if not lines:
+            return 0
+        payload = "".join(lines).encode("utf-8")
+        with self._path.open("ab") as f, _locked(f, exclusive=True):
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        # Our own lines are read back (together with anything other writers appended) on refresh.
+        self.refresh()
+        return len(lines)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures as cf
+import hashlib
+import io
+import json
+import os
+import pathlib
+import re
+import tarfile
+from typing import IO, Any, Iterator
+
+from .db import NO_FILTER, BugDB, CaseFilter, parse_statuses
+from .report_html import _resolve_audio_path
+
+SHARD_PATTERN = "shard-{:06d}"
+# Files a shard writes: its tar and manifest, and their temporaries.  Other `shard-*`
+# names in the output directory (backups, renamed copies) are left alone.
+_SHARD_FILE_RE = re.compile(r"shard-(\d{6})\.(?:tar|json)(\.tmp)?")
+
+# Cases read from SQLite per query, and samples read ahead per worker thread.
+_FETCH_ROWS = 500
+_READAHEAD_PER_WORKER = 4
+
+
+class _HashingWriter(io.RawIOBase):
+    """Write-through file wrapper that hashes and counts what tarfile writes."""
+
+    def __init__(self, f: IO[bytes]) -> None:
+        self._f = f
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.bytes
+
+    def write(self, b: Any) -> int:
+        self._f.write(b)
+        self.sha256.update(b)
+        self.bytes += len(b)
+        return len(b)
+
+
+def _load_sample(row: dict[str, Any], db_path: pathlib.Path) -> dict[str, Any] | None:
+    """Members of one sample (runs on a worker thread), or None when its audio is missing."""
+    wav = _resolve_audio_path(row.get("audio_path_wav"), db_path=db_path)
+    if wav is None:
+        return None
+    meta = dict(row)
+    for k in ("tags", "signature"):
+        if meta.get(k):
+            meta[k] = json.loads(meta[k])
+    members = {
+        "wav": wav.read_bytes(),
+        "ref.txt": str(row["ref_text"]).encode("utf-8"),
+        "hyp.txt": str(row["hyp_text"]).encode("utf-8"),
+        "json": json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+    }
+    return {
+        "key": str(row["id"]),
+        "rowid": int(row["rowid"]),
+        "members": members,
+        "checksums": {ext: {"sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)} for ext, data in members.items()},
+    }
+
+
+def _tar_size(sample: dict[str, Any]) -> int:
+    # 512-byte header per member plus data padded to 512 bytes.
+    return sum(512 + (len(data) + 511) // 512 * 512 for data in sample["members"].values())
+
+
+class _ShardWriter:
+    def __init__(self, out_dir: pathlib.Path, index: int, settings: dict[str, Any]) -> None:
+        self.name = SHARD_PATTERN.format(index)
+        self._out_dir = out_dir
+        self._settings = settings
+        self._tmp = out_dir / f"{self.name}.tar.tmp"
+        self._file = self._tmp.open("wb")
+        self._hashing = _HashingWriter(self._file)
+        self._tar = tarfile.open(fileobj=self._hashing, mode="w", format=tarfile.PAX_FORMAT)  # type: ignore[arg-type]
+        self.samples: list[dict[str, Any]] = []
+        self.size = 0
+
+    def add(self, sample: dict[str, Any]) -> None:
+        for ext, data in sample["members"].items():
+            info = tarfile.TarInfo(f"{sample['key']}.{ext}")
+            info.size = len(data)
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+        self.size += _tar_size(sample)
+        self.samples.append({"key": sample["key"], "rowid": sample["rowid"], "members": sample["checksums"]})
+
+    def close(self) -> dict[str, Any]:
+        """Finish the tar, move it into place and write its manifest (the commit point for resume)."""
+        self._tar.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self._out_dir / f"{self.name}.tar")
+        manifest = {
+            **self._settings,
+            "shard": f"{self.name}.tar",
+            "sha256": self._hashing.sha256.hexdigest(),
+            "bytes": self._hashing.bytes,
+            "first_rowid": self.samples[0]["rowid"],
+            "last_rowid": self.samples[-1]["rowid"],
+            "samples": self.samples,
+        }
+        tmp = self._out_dir / f"{self.name}.json.tmp"
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self._out_dir / f"{self.name}.json")
+        return manifest
+
+
+def _resume_point(out_dir: pathlib.Path, settings: dict[str, Any]) -> tuple[int, int]:
+    """(next shard index, last exported rowid) from the completed shards in `out_dir`.
+
+    A shard is complete once its manifest exists; leftovers of an interrupted shard are
+    removed and that shard is written again.  Entries that only look like shard files
+    (other names, directories) are reported and kept.
+    """
+    next_index, last_rowid = 0, 0
+    while (out_dir / f"{SHARD_PATTERN.format(next_index)}.json").exists():
+        manifest = json.loads((out_dir / f"{SHARD_PATTERN.format(next_index)}.json").read_text(encoding="utf-8"))
+        if {k: manifest.get(k) for k in settings} != settings:
+            raise ValueError(f"{out_dir} holds shards of another export ({manifest.get('db')}, status={manifest.get('status')})")
+        last_rowid = int(manifest["last_rowid"])
+        next_index += 1
+    ignored = []
+    for stale in sorted(out_dir.glob("shard-*")):
+        m = _SHARD_FILE_RE.fullmatch(stale.name)
+        if m is None or not stale.is_file():
+            ignored.append(stale.name)
+        elif m.group(2) or int(m.group(1)) >= next_index:
+            stale.unlink()
+    if ignored:
+        print(f"note: kept {len(ignored)} entries in {out_dir} that are not shard files: {', '.join(ignored)}")
+    return next_index, last_rowid
+
+
+def _iter_rows(
+    db_path: pathlib.Path, *, statuses: list[str] | None, after_rowid: int, case_filter: CaseFilter = NO_FILTER
+) -> Iterator[dict[str, Any]]:
+    """Cases in rowid order after `after_rowid`, paged so no cursor stays open across writes."""
+    conds, params = case_filter.conditions()
+    if statuses is not None:
+        conds = [f"status IN ({', '.join('?' for _ in statuses)})", *conds]
+        params = (*statuses, *params)
+    where = "".join(f" AND {c}" for c in conds)
+    last = after_rowid
+    with BugDB(db_path, readonly=True) as db:
+        while True:
+            page = db.conn.execute(
+                f"SELECT rowid, * FROM cases WHERE rowid > ?{where} ORDER BY rowid LIMIT ?",
+                (last, *params, _FETCH_ROWS),
+            ).fetchall()
+            if not page:
+                return
+            for r in page:
+                yield dict(r)
+            last = int(page[-1]["rowid"])
+
+
+def export_shards(
+    *,
+    db_path: pathlib.Path,
+    out_dir: pathlib.Path,
+    status: str,
+    shard_size_mb: float = 256.0,
+    workers: int = 8,
+    case_filter: CaseFilter = NO_FILTER,
+) -> dict[str, int]:
+    """Write cases as WebDataset-style tar shards for ASR/TTS training.
+
+    Each sample is `<id>.wav`, `<id>.ref.txt`, `<id>.hyp.txt` and `<id>.json` (the case
+    row); cases without audio are skipped.  Cases go out in rowid order, their files are
+    read and hashed by a thread pool a bounded window ahead of the writer, and a shard is
+    closed once it would exceed `shard_size_mb`.  Every shard gets `shard-NNNNNN.json`
+    with the sha256 of the tar and of each member.
+
+    `case_filter` narrows the cases by tag, cluster or creation time.  Re-running with
+    the same DB, status and filter resumes after the last completed shard, which
+    also appends cases added since.
+    """
+    statuses = parse_statuses(status)
+    settings = {"db": str(db_path), "status": status or "all", "filter": case_filter.describe()}
+    limit = max(1, int(shard_size_mb * 1024 * 1024))
+    workers = max(1, workers)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index, last_rowid = _resume_point(out_dir, settings)
+    resumed_from = index
+
+    written = skipped = 0
+    shard: _ShardWriter | None = None
+    with cf.ThreadPoolExecutor(max_workers=workers) as pool:
+        window: collections.deque[cf.Future] = collections.deque()
+        rows = _iter_rows(db_path, statuses=statuses, after_rowid=last_rowid, case_filter=case_filter)
+        window_size = workers * _READAHEAD_PER_WORKER
+
+        def fill() -> None:
+            while len(window) < window_size:
+                row = next(rows, None)
+                if row is None:
+                    return
+                window.append(pool.submit(_load_sample, row, db_path))
+
+        fill()
+        while window:
+            sample = window.popleft().result()
+            fill()
+            if sample is None:
+                skipped += 1
+                continue
+            if shard is not None and shard.size + _tar_size(sample) > limit:
+                shard.close()
+                shard = None
+                index += 1
+            if shard is None:
+                shard = _ShardWriter(out_dir, index, settings)
+            shard.add(sample)
+            written += 1
+    if shard is not None:
+        shard.close()
+        index += 1
+
+    print(
+        f"Wrote {index - resumed_from} shards to {out_dir} ({written} samples, {skipped} without audio skipped"
+        f"{f'; resumed after shard {resumed_from - 1}' if resumed_from else ''})"
+    )
+    return {"shards": index - resumed_from, "samples": written, "skipped": skipped}
@@ -1,22 +1,157 @@
 from __future__ import annotations
 
+import contextlib
+import csv
+import datetime as dt
+import gzip
 import json
+import os
 import pathlib
+import sqlite3
+from typing import IO, Any, Iterator
 
-from .db import BugDB
+from .db import NO_FILTER, BugDB, CaseFilter, parse_statuses
 
+EXPORT_FORMATS = ("jsonl", "jsonl.gz", "csv", "csv.gz")
 
-def export_cases(*, db_path: pathlib.Path, out_path: pathlib.Path, fmt: str, status: str) -> None:
-    if fmt != "jsonl":
+# Stored as JSON text; JSONL exports pass it through verbatim instead of decoding and re-encoding.
+_JSON_COLUMNS = ("tags", "signature")
+
+_FETCH_ROWS = 2000
+# zlib level for .gz exports: about twice as fast as the default 6 for ~15% larger output.
+GZIP_LEVEL = 3
+
+
+def hwm_path(out_path: pathlib.Path) -> pathlib.Path:
+    """Where the high-water mark of incremental exports to `out_path` is kept."""
+    return out_path.with_name(out_path.name + ".hwm.json")
+
+
+def _load_hwm(out_path: pathlib.Path, db_path: pathlib.Path) -> int | None:
+    try:
+        state = json.loads(hwm_path(out_path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if state.get("db") != str(db_path):
+        raise ValueError(f"{out_path} was exported from {state.get('db')}, not {db_path}; pick another --out")
+    return int(state["rowid"])
+
+
+def _save_hwm(out_path: pathlib.Path, db_path: pathlib.Path, rowid: int) -> None:
+    path = hwm_path(out_path)
+    tmp = path.with_name(path.name + ".tmp")
+    state = {"db": str(db_path), "rowid": rowid, "exported_at": dt.datetime.now(dt.timezone.utc).isoformat()}
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _since_filter(since: str | None, *, out_path: pathlib.Path, db_path: pathlib.Path) -> tuple[str, tuple[Any, ...]]:
+    """SQL condition for `--since`: `last` (this output's high-water mark), a rowid, or a created_at timestamp."""
+    if since is None:
+        return "", ()
+    if since == "last":
+        rowid = _load_hwm(out_path, db_path)
+        return ("", ()) if rowid is None else (" AND rowid > ?", (rowid,))
+    if since.isdigit():
+        return " AND rowid > ?", (int(since),)
+    return " AND created_at > ?", (since,)
+
+
+def _batches(cur: Any) -> Iterator[list[tuple[Any, ...]]]:
+    while True:
+        rows = cur.fetchmany(_FETCH_ROWS)
+        if not rows:
+            return
+        yield rows
+
+
+def _jsonl_query(conn: sqlite3.Connection) -> tuple[str, str]:
+    """(select list, line template) that render a `cases` row as one JSON line.
+
+    SQLite quotes the text columns (`json_quote`) and passes the stored JSON columns
+    through verbatim (no decode/re-encode); Python only fills numbers into the template
+    (`%s` of a float is its shortest exact repr, as in `json.dumps`).  Keys follow the
+    table's column order, like `SELECT *`.
+    """
+    select, template = [], []
+    for _, name, decl, *_ in conn.execute("PRAGMA table_info(cases)"):
+        if name in _JSON_COLUMNS:
+            select.append(f"CASE WHEN {name} IS NULL OR {name} = '' THEN json_quote({name}) ELSE {name} END")
+        elif str(decl).upper() in ("REAL", "INTEGER"):
+            select.append(f"CASE WHEN typeof({name}) IN ('real', 'integer') THEN {name} ELSE json_quote({name}) END")
+        else:
+            select.append(f"json_quote({name})")
+        template.append(json.dumps(name, ensure_ascii=False).replace("%", "%%") + ": %s")
+    return ", ".join(select), "{" + ", ".join(template) + "}\n"
+
+
+def _open_out(out_path: pathlib.Path, fmt: str, *, append: bool) -> IO[str]:
+    mode = "a" if append else "w"
+    newline = "" if fmt.startswith("csv") else None
+    if fmt.endswith(".gz"):
+        # Appending adds a gzip member; readers (gzip, zcat) see one continuous stream.
+        return gzip.open(out_path, mode + "t", encoding="utf-8", newline=newline, compresslevel=GZIP_LEVEL)  # type: ignore[return-value]
+    return out_path.open(mode, encoding="utf-8", newline=newline)
+
+
+def export_cases(
+    *,
+    db_path: pathlib.Path,
+    out_path: pathlib.Path,
+    fmt: str,
+    status: str,
+    since: str | None = None,
+    case_filter: CaseFilter = NO_FILTER,
+) -> int:
+    """Stream cases to JSONL or CSV (optionally gzip-compressed) with constant memory.
+
+    Without `since` the file is rewritten with every matching case, best score first.
+    With `since` (`last`, a rowid, or a created_at timestamp) only cases added after it
+    are appended, in insertion order.  Either way the newest rowid covered is stored
+    next to the output, so `--since last` picks up where the previous export stopped.
+    `case_filter` narrows the cases by tag, cluster or creation time.  Returns the number of cases written.
+    """
+    if fmt not in EXPORT_FORMATS:
         raise ValueError(f"Unsupported export format: {fmt}")
 
+    statuses = parse_statuses(status)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with BugDB(db_path) as db:
-        rows = db.iter_cases(status=status)
-
-        with out_path.open("w", encoding="utf-8") as f:
-            for row in rows:
-                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    n = 0
+    with BugDB(db_path, readonly=True) as db:
+        since_sql, since_params = _since_filter(since, out_path=out_path, db_path=db_path)
+        # Upper bound fixed up front: rows inserted while exporting are left for the next run.
+        # (`+rowid` keeps it a plain filter, so the planner still walks the status/score index.)
+        hwm = int(db.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM cases").fetchone()[0])
+        select, line = ("*", "") if fmt.startswith("csv") else _jsonl_query(db.conn)
+        sql = f"SELECT {select} FROM cases WHERE +rowid <= ?" + since_sql
+        params: tuple[Any, ...] = (hwm, *since_params)
+        if statuses is not None:
+            sql += f" AND status IN ({', '.join('?' for _ in statuses)})"
+            params += tuple(statuses)
+        conds, filter_params = case_filter.conditions()
+        sql += "".join(f" AND {c}" for c in conds)
+        params += filter_params
+        sql += " ORDER BY rowid" if since is not None else " ORDER BY score_total DESC"
+        cur = db.conn.cursor()
+        cur.row_factory = None  # plain tuples
+        cur.execute(sql, params)
+        columns = [c[0] for c in cur.description]
 
-    print(f"Wrote {out_path}")
+        append = since is not None and out_path.exists()
+        header = not append or out_path.stat().st_size == 0
+        with contextlib.closing(_open_out(out_path, fmt, append=append)) as f:
+            if fmt.startswith("csv"):
+                w = csv.writer(f)
+                if header:
+                    w.writerow(columns)
+                for rows in _batches(cur):
+                    w.writerows(rows)
+                    n += len(rows)
+            else:
+                for rows in _batches(cur):
+                    f.write("".join([line % r for r in rows]))
+                    n += len(rows)
+    _save_hwm(out_path, db_path, hwm)
 
+    print(f"Wrote {out_path} ({n} cases{'' if since is None else f', since {since}'})")
+    return n
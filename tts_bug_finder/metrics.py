@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import itertools
+import math
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Any, Sequence
 
 
 @dataclass(frozen=True, slots=True)
@@ -26,54 +28,407 @@ class Alignment:
         return c
 
 
-def align_tokens(a: Sequence[str], b: Sequence[str]) -> Alignment:
+def _intern(a: Sequence[str], b: Sequence[str]) -> tuple[list[int], list[int], int]:
+    vocab: dict[str, int] = {}
+    a_ids = [vocab.setdefault(t, len(vocab)) for t in a]
+    n_a = len(vocab)
+    # Tokens only present in `b` never match anything in `a`; they all share id -1.
+    b_ids = [vocab.get(t, -1) for t in b]
+    return a_ids, b_ids, n_a
+
+
+def _peq(a_ids: list[int], n_vocab: int) -> list[int]:
+    peq = [0] * n_vocab
+    for i, t in enumerate(a_ids):
+        peq[t] |= 1 << i
+    return peq
+
+
+def _advance(
+    peq: list[int],
+    mask: int,
+    b_ids: Sequence[int],
+    vp: int,
+    vn: int,
+    out: list[tuple[int, int]] | None = None,
+) -> tuple[int, int]:
+    """Myers/Hyyrö bit-parallel DP over the columns `b_ids`, starting from column (vp, vn).
+
+    Bit `i-1` of VP/VN encodes `dp[i][j] - dp[i-1][j]` = +1/-1 for the current column.
+    Returns the last column; every computed column is appended to `out` if given.
+    """
+    for t in b_ids:
+        eq = peq[t] if t >= 0 else 0
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        ph = vn | (mask & ~(xh | vp))
+        mh = vp & xh
+        # Global alignment: the top row grows by one per column, so shift in a +1.
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        vp = mh | (mask & ~(xv | ph))
+        vn = ph & xv
+        if out is not None:
+            out.append((vp, vn))
+    return vp, vn
+
+
+class _Columns:
+    """DP columns as VP/VN bit vectors, for the backtrace.
+
+    With `segment=None` every column is kept (n bits each).  Otherwise only every
+    `segment`-th column is kept as a checkpoint and the columns in between are
+    recomputed one segment at a time as the backtrace walks leftwards, so memory is
+    O(n * (m / segment + segment)) bits and the DP is computed at most twice.
+    """
+
+    __slots__ = ("_peq", "_mask", "_b_ids", "_segment", "_checkpoints", "_cache_start", "_cache")
+
+    def __init__(self, peq: list[int], mask: int, b_ids: list[int], segment: int | None) -> None:
+        self._peq = peq
+        self._mask = mask
+        self._b_ids = b_ids
+        self._segment = segment
+        self._checkpoints: dict[int, tuple[int, int]] = {}
+        self._cache_start = 0
+        self._cache: list[tuple[int, int]] = [(mask, 0)]
+        if segment is None:
+            _advance(peq, mask, b_ids, mask, 0, self._cache)
+            return
+        col = (mask, 0)
+        self._checkpoints[0] = col
+        for start in range(0, len(b_ids), segment):
+            stop = min(len(b_ids), start + segment)
+            col = _advance(peq, mask, b_ids[start:stop], col[0], col[1])
+            self._checkpoints[stop] = col
+
+    def last(self) -> tuple[int, int]:
+        return self.get(len(self._b_ids))
+
+    def get(self, j: int) -> tuple[int, int]:
+        if self._segment is None:
+            return self._cache[j]
+        col = self._checkpoints.get(j)
+        if col is not None:
+            return col
+        start = (j // self._segment) * self._segment
+        if start != self._cache_start or len(self._cache) == 1:
+            vp, vn = self._checkpoints[start]
+            self._cache = [(vp, vn)]
+            self._cache_start = start
+            stop = min(len(self._b_ids), start + self._segment)
+            _advance(self._peq, self._mask, self._b_ids[start:stop], vp, vn, self._cache)
+        return self._cache[j - start]
+
+
+def edit_distance(a: Sequence[str], b: Sequence[str]) -> int:
+    """Levenshtein distance of two token sequences (bit-parallel, no opcodes)."""
+    if not a or not b:
+        return max(len(a), len(b))
+    a_ids, b_ids, n_vocab = _intern(a, b)
+    mask = (1 << len(a)) - 1
+    vp, vn = _advance(_peq(a_ids, n_vocab), mask, b_ids, mask, 0)
+    return len(b) + vp.bit_count() - vn.bit_count()
+
+
+def bounded_edit_distance(a: Sequence[str], b: Sequence[str], k: int) -> int:
+    """Levenshtein distance if it is below `k`, otherwise some value `>= k`.
+
+    Decides "distance >= k?" without always finishing the DP: the last row changes by
+    at most one per column, so once it minus the columns left reaches `k` the final
+    distance cannot drop below `k` any more.
+    """
+    lower = abs(len(a) - len(b))
+    if lower >= k or not a or not b:
+        return lower
+    a_ids, b_ids, n_vocab = _intern(a, b)
+    peq = _peq(a_ids, n_vocab)
+    mask = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+    vp = mask
+    vn = 0
+    score = len(a)
+    remaining = len(b)
+    # Same recurrence as `_advance`, inlined to track the last row as it goes.
+    for t in b_ids:
+        eq = peq[t] if t >= 0 else 0
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        ph = vn | (mask & ~(xh | vp))
+        mh = vp & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        remaining -= 1
+        if score - remaining >= k:
+            return score - remaining
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        vp = mh | (mask & ~(xv | ph))
+        vn = ph & xv
+    return score
+
+
+def _merge_steps(steps: list[tuple[str, int, int, int, int]]) -> list[tuple[str, int, int, int, int]]:
+    opcodes: list[tuple[str, int, int, int, int]] = []
+    for tag, a0, a1, b0, b1 in steps:
+        if opcodes and opcodes[-1][0] == tag and opcodes[-1][2] == a0 and opcodes[-1][4] == b0:
+            prev = opcodes[-1]
+            opcodes[-1] = (tag, prev[1], a1, prev[3], b1)
+        else:
+            opcodes.append((tag, a0, a1, b0, b1))
+    return opcodes
+
+
+_NUMPY = None
+
+
+def _get_numpy():
+    global _NUMPY
+    if _NUMPY is not None:
+        return _NUMPY
+    try:
+        import numpy  # type: ignore
+    except Exception:
+        _NUMPY = False
+        return _NUMPY
+    _NUMPY = numpy
+    return _NUMPY
+
+
+# Below this many pairs per bucket the per-call NumPy overhead outweighs vectorization.
+BATCH_MIN_PAIRS = 48
+# Upper bound on peq table cells (pairs * alphabet * 64-bit words) per vectorized bucket.
+_BATCH_PEQ_CELLS = 1 << 22
+
+
+def _popcount64(np: Any, x: Any) -> Any:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x).astype(np.int64)
+    return np.unpackbits(x.view(np.uint8), axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def _batch_bucket_numpy(np: Any, a_seqs: list[Sequence[int]], b_seqs: list[Sequence[int]]) -> list[int]:
+    """Myers/Hyyrö bit-parallel DP vectorized across a bucket of pairs.
+
+    Each row of the (pairs, words) uint64 arrays is one pair's VP/VN column; one
+    NumPy step advances every pair by one token of `b`.  Bits above `len(a)` only
+    ever carry upwards, so they are masked out once at the end instead of per step.
+    """
+    count = len(a_seqs)
+    n = np.array([len(a) for a in a_seqs], dtype=np.int64)
+    m = np.array([len(b) for b in b_seqs], dtype=np.int64)
+    n_max = int(n.max())
+    m_max = int(m.max())
+    words = (n_max + 63) // 64
+    rows = np.arange(count)
+
+    # Dense per-pair alphabet: (pair, token) -> local id, with `n_max` as the "no match" id.
+    a_pair = np.repeat(rows, n)
+    a_tok = np.fromiter(itertools.chain.from_iterable(a_seqs), dtype=np.int64, count=int(n.sum()))
+    a_pos = np.arange(len(a_tok)) - np.repeat(np.cumsum(n) - n, n)
+    a_key = (a_pair << 32) | (a_tok & 0xFFFFFFFF)
+    uniq, inv = np.unique(a_key, return_inverse=True)
+    first = np.searchsorted(uniq, rows << 32)
+    local = inv - first[a_pair]
+    peq = np.zeros((count, n_max + 1, words), dtype=np.uint64)
+    np.bitwise_or.at(peq, (a_pair, local, a_pos // 64), np.left_shift(np.uint64(1), (a_pos % 64).astype(np.uint64)))
+
+    b_tok = np.full((count, m_max), -1, dtype=np.int64)
+    b_flat = np.fromiter(itertools.chain.from_iterable(b_seqs), dtype=np.int64, count=int(m.sum()))
+    b_tok[np.repeat(rows, m), np.arange(len(b_flat)) - np.repeat(np.cumsum(m) - m, m)] = b_flat
+    b_key = (rows[:, None] << 32) | (b_tok & 0xFFFFFFFF)
+    idx = np.searchsorted(uniq, b_key).clip(0, max(0, len(uniq) - 1))
+    found = (uniq[idx] == b_key) & (b_tok >= 0) if len(uniq) else np.zeros_like(b_tok, dtype=bool)
+    b_local = np.where(found, idx - first[:, None], n_max)
+
+    ones = ~np.zeros((count, words), dtype=np.uint64)
+    vp = ones.copy()
+    vn = np.zeros((count, words), dtype=np.uint64)
+    one = np.uint64(1)
+    shift = np.uint64(63)
+    final_vp = np.zeros((count, words), dtype=np.uint64)
+    final_vn = np.zeros((count, words), dtype=np.uint64)
+    done0 = m == 0
+    final_vp[done0] = vp[done0]
+
+    def shl1(x: Any, carry_in: int) -> Any:
+        out = x << one
+        if words > 1:
+            out[:, 1:] |= x[:, :-1] >> shift
+        if carry_in:
+            out[:, 0] |= one
+        return out
+
+    for j in range(m_max):
+        eq = peq[rows, b_local[:, j]]
+        xv = eq | vn
+        x = eq & vp
+        if words == 1:
+            total = x + vp
+        else:
+            total = np.empty_like(x)
+            carry = np.zeros(count, dtype=np.uint64)
+            for w in range(words):
+                sw = x[:, w] + vp[:, w]
+                c1 = sw < x[:, w]
+                sw2 = sw + carry
+                c2 = sw2 < sw
+                total[:, w] = sw2
+                carry = (c1 | c2).astype(np.uint64)
+        xh = (total ^ vp) | eq
+        ph = vn | ~(xh | vp)
+        mh = vp & xh
+        ph = shl1(ph, 1)
+        mh = shl1(mh, 0)
+        vp = mh | ~(xv | ph)
+        vn = ph & xv
+        sel = m == j + 1
+        if sel.any():
+            final_vp[sel] = vp[sel]
+            final_vn[sel] = vn[sel]
+
+    bit = np.arange(words * 64, dtype=np.int64).reshape(words, 64)
+    mask_bits = bit[None, :, :] < n[:, None, None]
+    weights = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+    mask = (mask_bits * weights[None, None, :]).sum(axis=-1, dtype=np.uint64)
+    pos = _popcount64(np, final_vp & mask).sum(axis=-1)
+    neg = _popcount64(np, final_vn & mask).sum(axis=-1)
+    return [int(v) for v in (m + pos - neg)]
+
+
+def batch_edit_distance(a_seqs: Sequence[Sequence[int]], b_seqs: Sequence[Sequence[int]]) -> list[int]:
+    """Edit distances of many token-id sequence pairs at once.
+
+    Pairs are bucketed by `len(a)` (64-bit words per column) and `len(b)` so padding
+    stays small; buckets of at least `BATCH_MIN_PAIRS` pairs run through the NumPy
+    kernel, everything else (or everything, without NumPy) uses `edit_distance`.
+    """
+    if len(a_seqs) != len(b_seqs):
+        raise ValueError("a_seqs and b_seqs must have the same length")
+    out = [0] * len(a_seqs)
+    np = _get_numpy()
+    todo: list[int] = []
+    for k, (a, b) in enumerate(zip(a_seqs, b_seqs)):
+        if not a or not b:
+            out[k] = max(len(a), len(b))
+        else:
+            todo.append(k)
+    if not np or len(todo) < BATCH_MIN_PAIRS:
+        for k in todo:
+            out[k] = edit_distance(a_seqs[k], b_seqs[k])
+        return out
+
+    todo.sort(key=lambda k: ((len(a_seqs[k]) + 63) // 64, len(b_seqs[k])))
+    start = 0
+    while start < len(todo):
+        words = (len(a_seqs[todo[start]]) + 63) // 64
+        stop = start
+        while stop < len(todo) and (len(a_seqs[todo[stop]]) + 63) // 64 == words:
+            stop += 1
+        cap = max(1, _BATCH_PEQ_CELLS // (64 * words * words + 1))
+        for lo in range(start, stop, cap):
+            bucket = todo[lo : min(stop, lo + cap)]
+            if len(bucket) < BATCH_MIN_PAIRS:
+                for k in bucket:
+                    out[k] = edit_distance(a_seqs[k], b_seqs[k])
+                continue
+            dists = _batch_bucket_numpy(np, [a_seqs[k] for k in bucket], [b_seqs[k] for k in bucket])
+            for k, d in zip(bucket, dists):
+                out[k] = d
+        start = stop
+    return out
+
+
+def intern_pairs(pairs: Sequence[tuple[Sequence[str], Sequence[str]]]) -> tuple[list[list[int]], list[list[int]]]:
+    """Map the tokens of many pairs to ints with one shared vocabulary."""
+    vocab: dict[str, int] = {}
+    a_ids = [[vocab.setdefault(t, len(vocab)) for t in a] for a, _ in pairs]
+    b_ids = [[vocab.setdefault(t, len(vocab)) for t in b] for _, b in pairs]
+    return a_ids, b_ids
+
+
+def align_batch(pairs: Sequence[tuple[Sequence[str], Sequence[str]]], *, with_opcodes: bool = False) -> list[Alignment]:
+    """Align many token sequence pairs; distances are computed batched.
+
+    Without `with_opcodes` the returned alignments carry empty opcode lists.
+    """
+    if with_opcodes:
+        return [align_tokens(a, b) for a, b in pairs]
+    a_ids, b_ids = intern_pairs(pairs)
+    return [Alignment(distance=d, opcodes=[]) for d in batch_edit_distance(a_ids, b_ids)]
+
+
+# Above this many DP cells `align_tokens` switches to checkpointed columns (long-form texts).
+LONG_FORM_CELLS = 4_000_000
+
+
+def align_tokens(a: Sequence[str], b: Sequence[str], *, segment: int | None = None) -> Alignment:
+    """Levenshtein alignment, bit-parallel; same result as the full-matrix DP.
+
+    Columns are kept as VP/VN bit vectors (n bits each instead of n Python ints) and the
+    backtrace recovers the few DP cells it needs from them, applying the same
+    diagonal > delete > insert preference as the full-matrix version.
+
+    `segment` is the column stride between kept checkpoints (0 keeps every column).
+    By default every column is kept unless `len(a) * len(b) > LONG_FORM_CELLS`, in which
+    case `segment ~ sqrt(len(b))` bounds memory for long paragraphs and looping
+    hypotheses while returning the same distance and opcodes.
+    """
     n = len(a)
     m = len(b)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-    for i in range(n + 1):
-        dp[i][0] = i
-    for j in range(m + 1):
-        dp[0][j] = j
-    for i in range(1, n + 1):
-        ai = a[i - 1]
-        for j in range(1, m + 1):
-            cost = 0 if ai == b[j - 1] else 1
-            dp[i][j] = min(
-                dp[i - 1][j] + 1,  # delete
-                dp[i][j - 1] + 1,  # insert
-                dp[i - 1][j - 1] + cost,  # replace/equal
-            )
+    if n == 0 or m == 0:
+        if n == m:
+            return Alignment(distance=0, opcodes=[])
+        return Alignment(distance=n + m, opcodes=[("insert" if n == 0 else "delete", 0, n, 0, m)])
+    if segment is None and n * m > LONG_FORM_CELLS:
+        segment = math.isqrt(m) + 1
+    a_ids, b_ids, n_vocab = _intern(a, b)
+    cols = _Columns(_peq(a_ids, n_vocab), (1 << n) - 1, b_ids, segment or None)
+    vp_m, vn_m = cols.last()
+    distance = m + vp_m.bit_count() - vn_m.bit_count()
 
     i, j = n, m
+    d = distance  # dp[i][j]
     steps: list[tuple[str, int, int, int, int]] = []
-    while i > 0 or j > 0:
-        if i > 0 and j > 0:
-            cost = 0 if a[i - 1] == b[j - 1] else 1
-            if dp[i][j] == dp[i - 1][j - 1] + cost:
-                tag = "equal" if cost == 0 else "replace"
-                steps.append((tag, i - 1, i, j - 1, j))
-                i -= 1
-                j -= 1
-                continue
-        if i > 0 and dp[i][j] == dp[i - 1][j] + 1:
+    while i > 0 and j > 0:
+        if a_ids[i - 1] == b_ids[j - 1]:
+            # On a match dp[i][j] == dp[i-1][j-1] always holds.
+            steps.append(("equal", i - 1, i, j - 1, j))
+            i -= 1
+            j -= 1
+            continue
+        low = (1 << i) - 1
+        vp_l, vn_l = cols.get(j - 1)
+        left = (j - 1) + (vp_l & low).bit_count() - (vn_l & low).bit_count()  # dp[i][j-1]
+        bit = 1 << (i - 1)
+        diag = left - (1 if vp_l & bit else 0) + (1 if vn_l & bit else 0)  # dp[i-1][j-1]
+        if d == diag + 1:
+            steps.append(("replace", i - 1, i, j - 1, j))
+            d = diag
+            i -= 1
+            j -= 1
+            continue
+        vp_j, vn_j = cols.get(j)
+        up = d - (1 if vp_j & bit else 0) + (1 if vn_j & bit else 0)  # dp[i-1][j]
+        if d == up + 1:
             steps.append(("delete", i - 1, i, j, j))
+            d = up
             i -= 1
             continue
-        if j > 0 and dp[i][j] == dp[i][j - 1] + 1:
+        if d == left + 1:
             steps.append(("insert", i, i, j - 1, j))
+            d = left
             j -= 1
             continue
         raise RuntimeError("Backtrace failed")
+    while i > 0:
+        steps.append(("delete", i - 1, i, j, j))
+        i -= 1
+    while j > 0:
+        steps.append(("insert", i, i, j - 1, j))
+        j -= 1
 
     steps.reverse()
-
-    opcodes: list[tuple[str, int, int, int, int]] = []
-    for tag, a0, a1, b0, b1 in steps:
-        if opcodes and opcodes[-1][0] == tag and opcodes[-1][2] == a0 and opcodes[-1][4] == b0:
-            prev = opcodes[-1]
-            opcodes[-1] = (tag, prev[1], a1, prev[3], b1)
-        else:
-            opcodes.append((tag, a0, a1, b0, b1))
-
-    return Alignment(distance=dp[n][m], opcodes=opcodes)
-
+    return Alignment(distance=distance, opcodes=_merge_steps(steps))
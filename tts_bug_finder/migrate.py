@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pathlib
+import time
+
+from .db import MIGRATION_CHUNK_ROWS, SCHEMA_VERSION, Migration, connect, migrate, pending_migrations, schema_state
+
+# Seconds between backfill progress lines.
+_PROGRESS_EVERY_SEC = 2.0
+
+
+def migrate_db(*, db_path: pathlib.Path, chunk_rows: int = MIGRATION_CHUNK_ROWS, dry_run: bool = False) -> int:
+    """Bring `db_path` to the current schema (`db.MIGRATIONS`), printing what it does.
+
+    Writing commands apply pending steps when they open the DB as well (read-only ones
+    refuse a DB with pending steps); this runs them ahead of time on a large DB, with
+    progress.  Backfills commit every `chunk_rows` rowids, so a running search
+    or report keeps using the DB meanwhile, and an interrupted run resumes where it
+    stopped.  Returns the number of steps applied (pending, with `dry_run`, which opens
+    the DB read-only).
+    """
+    if not db_path.exists():
+        raise FileNotFoundError(f"No such DB: {db_path}")
+    # A dry run only reads: no WAL switch or other pragma is written to the file.
+    conn = connect(db_path, readonly=dry_run)
+    try:
+        state = schema_state(conn)
+        pending = pending_migrations(conn)
+        current = max((v for v, (applied_at, _) in state.items() if applied_at is not None), default=0)
+        print(f"{db_path}: schema version {current}, current is {SCHEMA_VERSION}; {len(pending)} pending")
+        for m in pending:
+            resumed = f" (backfill resumes after rowid {state[m.version][1]})" if m.version in state else ""
+            print(f"  v{m.version} {m.name}{resumed}")
+        if dry_run or not pending:
+            return len(pending)
+
+        t0 = last = time.monotonic()
+
+        def progress(m: Migration, rowid: int, end: int) -> None:
+            nonlocal last
+            now = time.monotonic()
+            if now - last >= _PROGRESS_EVERY_SEC or rowid >= end:
+                print(f"  v{m.version} backfill: rowid {rowid}/{end}")
+                last = now
+
+        migrate(conn, chunk_rows=chunk_rows, progress=progress)
+    finally:
+        conn.close()
+    print(f"Migrated {db_path} to schema version {SCHEMA_VERSION} in {time.monotonic() - t0:.1f}s")
+    return len(pending)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import concurrent.futures as cf
+import hashlib
+import json
+import os
+import pathlib
+import zlib
+from typing import Any, Iterator
+
+from .db import BugDB
+from .dedupe import normalized_text_similarity_above, signature_similarity
+from .text_utils import normalize_for_similarity_no_punct
+
+_SHINGLE = 3
+_SKETCH_K = 3
+
+# Highest `signature_similarity` of two signatures without a common `top_subs` pair
+# (tags, negation flip and has_numbers all equal).  Signature blocking is exact only for
+# thresholds at or above it.
+MIN_SIG_THRESHOLD = 0.45
+
+# Populated in each worker by `_init_compare_worker`.
+_WORKER_REFS: list[str] = []
+_WORKER_SIGS: list[dict[str, Any]] = []
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra = self.find(a)
+        rb = self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+
+def _blocking_keys(norm_ref: str, sig: dict[str, Any]) -> list[Any]:
+    """Keys under which two cases may be duplicates.
+
+    `signature_similarity > MIN_SIG_THRESHOLD` is only reachable when both signatures
+    share a `top_subs` pair, so one key per pair is exact for the signature rule.  Text
+    similarity uses a bottom-k sketch of character shingles (near-identical refs
+    share their smallest shingle hashes with high probability).
+    """
+    keys: list[Any] = [("r", norm_ref)]
+    for p in sig.get("top_subs") or []:
+        if isinstance(p, list) and len(p) == 2:
+            keys.append(("s", p[0], p[1]))
+    if len(norm_ref) >= _SHINGLE:
+        hashes = {zlib.crc32(norm_ref[i : i + _SHINGLE].encode("utf-8")) for i in range(len(norm_ref) - _SHINGLE + 1)}
+        keys.extend(("h", h) for h in sorted(hashes)[:_SKETCH_K])
+    return keys
+
+
+def _prepare_chunk(chunk: list[tuple[str, str | None]]) -> list[tuple[str, dict[str, Any], list[Any]]]:
+    out: list[tuple[str, dict[str, Any], list[Any]]] = []
+    for ref_text, sig_json in chunk:
+        norm_ref = normalize_for_similarity_no_punct(ref_text)
+        try:
+            sig = json.loads(sig_json) if sig_json else {}
+        except json.JSONDecodeError:
+            sig = {}
+        if not isinstance(sig, dict):
+            sig = {}
+        out.append((norm_ref, sig, _blocking_keys(norm_ref, sig)))
+    return out
+
+
+def _init_compare_worker(refs: list[str], sigs: list[dict[str, Any]]) -> None:
+    global _WORKER_REFS, _WORKER_SIGS
+    _WORKER_REFS = refs
+    _WORKER_SIGS = sigs
+
+
+def _is_duplicate(a: str, b: str, sig_a: dict[str, Any], sig_b: dict[str, Any], text_threshold: float, sig_threshold: float) -> bool:
+    if sig_a and sig_b and signature_similarity(sig_a, sig_b) > sig_threshold:
+        return True
+    return normalized_text_similarity_above(a, b, text_threshold)
+
+
+def _compare_pairs(pairs: list[tuple[int, int]], text_threshold: float, sig_threshold: float) -> list[tuple[int, int]]:
+    refs = _WORKER_REFS
+    sigs = _WORKER_SIGS
+    # Pairs arrive grouped by block, nearest neighbours first; a batch-local union-find
+    # skips pairs already transitively merged, which is most of them in dense blocks.
+    parent: dict[int, int] = {}
+
+    def find(x: int) -> int:
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    merged: list[tuple[int, int]] = []
+    for i, j in pairs:
+        ri = find(i)
+        rj = find(j)
+        if ri == rj:
+            continue
+        if _is_duplicate(refs[i], refs[j], sigs[i], sigs[j], text_threshold, sig_threshold):
+            parent[rj] = ri
+            merged.append((i, j))
+    return merged
+
+
+def _load_cases(
+    db_paths: list[pathlib.Path], statuses: list[str] | None, *, readonly: bool
+) -> tuple[list[tuple[int, int, str, float]], list[tuple[str, str | None]]]:
+    meta: list[tuple[int, int, str, float]] = []  # (db index, rowid, case id, score_total)
+    payload: list[tuple[str, str | None]] = []
+    for db_idx, db_path in enumerate(db_paths):
+        with BugDB(db_path, readonly=readonly) as db:
+            sql = "SELECT rowid, id, ref_text, signature, score_total FROM cases"
+            params: tuple[Any, ...] = ()
+            if statuses is not None:
+                sql += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+                params = tuple(statuses)
+            for r in db.conn.execute(sql, params):
+                meta.append((db_idx, int(r["rowid"]), str(r["id"]), float(r["score_total"] or 0.0)))
+                payload.append((str(r["ref_text"] or ""), r["signature"]))
+    return meta, payload
+
+
+def _candidate_pairs(
+    blocks: dict[Any, list[int]],
+    rank: list[int],
+    uf: _UnionFind,
+    *,
+    max_block: int,
+    window: int,
+) -> Iterator[tuple[int, int]]:
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=rank.__getitem__)
+        n = len(members)
+        # Small blocks are compared exhaustively; huge ones (very common subs/shingles)
+        # fall back to a sorted-neighbourhood window to stay near-linear.
+        span = n - 1 if n <= max_block else window
+        for d in range(1, span + 1):
+            for x in range(n - d):
+                a = members[x]
+                b = members[x + d]
+                if uf.find(a) != uf.find(b):
+                    yield a, b
+
+
+def recluster(
+    *,
+    db_paths: list[pathlib.Path],
+    statuses: list[str] | None,
+    workers: int = 0,
+    text_threshold: float = 0.85,
+    sig_threshold: float = 0.8,
+    batch_size: int = 20000,
+    max_block: int = 200,
+    window: int = 50,
+    dry_run: bool = False,
+) -> dict[str, int]:
+    """Re-cluster cases of one or more DBs by pairwise similarity (union-find over duplicate pairs).
+
+    Uses the same duplicate rule as the runner (ref text similarity or signature similarity above
+    threshold), so clusters no longer depend on the order cases were found in.  Writes a new
+    `cluster_id` and `is_representative` (highest `score_total` per cluster) back to every DB.
+    `sig_threshold` must be at least `MIN_SIG_THRESHOLD` (below it, signature matches
+    would be missed by the blocking).
+    """
+    if sig_threshold < MIN_SIG_THRESHOLD:
+        raise ValueError(f"sig_threshold must be >= {MIN_SIG_THRESHOLD} (signature blocking misses pairs below it), got {sig_threshold}")
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    meta, payload = _load_cases(db_paths, statuses, readonly=dry_run)
+    n = len(meta)
+    if n == 0:
+        print("No cases to recluster.")
+        return {"cases": 0, "clusters": 0, "pairs_compared": 0}
+
+    refs: list[str] = []
+    sigs: list[dict[str, Any]] = []
+    blocks: dict[Any, list[int]] = {}
+    chunk = max(1, min(batch_size, (n + workers - 1) // workers))
+    with cf.ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = [payload[i : i + chunk] for i in range(0, n, chunk)]
+        for prepared in pool.map(_prepare_chunk, chunks):
+            for norm_ref, sig, keys in prepared:
+                idx = len(refs)
+                refs.append(norm_ref)
+                sigs.append(sig)
+                for k in keys:
+                    blocks.setdefault(k, []).append(idx)
+    del payload
+
+    order = sorted(range(n), key=refs.__getitem__)
+    rank = [0] * n
+    for pos, idx in enumerate(order):
+        rank[idx] = pos
+
+    uf = _UnionFind(n)
+    compared = 0
+    with cf.ProcessPoolExecutor(max_workers=workers, initializer=_init_compare_worker, initargs=(refs, sigs)) as pool:
+        in_flight: set[cf.Future] = set()
+
+        def drain(wait_all: bool) -> None:
+            nonlocal in_flight
+            done, in_flight = cf.wait(in_flight, return_when=cf.ALL_COMPLETED if wait_all else cf.FIRST_COMPLETED)
+            for fut in done:
+                for a, b in fut.result():
+                    uf.union(a, b)
+
+        batch: list[tuple[int, int]] = []
+        for pair in _candidate_pairs(blocks, rank, uf, max_block=max_block, window=window):
+            batch.append(pair)
+            if len(batch) >= batch_size:
+                compared += len(batch)
+                in_flight.add(pool.submit(_compare_pairs, batch, text_threshold, sig_threshold))
+                batch = []
+                if len(in_flight) >= 2 * workers:
+                    drain(False)
+        if batch:
+            compared += len(batch)
+            in_flight.add(pool.submit(_compare_pairs, batch, text_threshold, sig_threshold))
+        if in_flight:
+            drain(True)
+    del blocks
+
+    members: dict[int, list[int]] = {}
+    for idx in range(n):
+        members.setdefault(uf.find(idx), []).append(idx)
+
+    updates: list[list[tuple[str, int, int]]] = [[] for _ in db_paths]
+    for group in members.values():
+        rep = max(group, key=lambda i: (meta[i][3], -rank[i]))
+        min_id = min(meta[i][2] for i in group)
+        cluster_id = hashlib.sha1(f"recluster:{min_id}".encode("utf-8")).hexdigest()[:12]
+        for i in group:
+            db_idx, rowid, _, _ = meta[i]
+            updates[db_idx].append((cluster_id, 1 if i == rep else 0, rowid))
+
+    if not dry_run:
+        for db_path, rows in zip(db_paths, updates):
+            with BugDB(db_path) as db:
+                for i in range(0, len(rows), batch_size):
+                    db.update_clusters(rows[i : i + batch_size])
+
+    stats = {"cases": n, "clusters": len(members), "pairs_compared": compared}
+    print(
+        f"Reclustered {n} cases into {len(members)} clusters "
+        f"(pairs_compared={compared}, workers={workers}, dry_run={dry_run})"
+    )
+    return stats
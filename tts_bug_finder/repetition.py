@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Shortest span that counts as a repeat (also the n of the legacy n-gram count).
+MIN_REPEAT = 5
+
+
+@dataclass(frozen=True, slots=True)
+class RepetitionStats:
+    """Repetition in one text, over its non-whitespace characters.
+
+    `max_count` is the highest occurrence count of any `MIN_REPEAT`-gram (equivalently,
+    of any repeated span of at least that length).  `longest_repeat` is the longest
+    substring of at least `MIN_REPEAT` characters occurring more than once (occurrences
+    may overlap, so a loop of unit u repeated k times yields k-1 units), `longest_count`
+    its occurrence count, and `loop_coverage` the fraction of characters inside some
+    occurrence of a repeated span.
+    """
+
+    length: int
+    max_count: int
+    longest_repeat: str
+    longest_count: int
+    loop_coverage: float
+
+
+def analyze_repetition(text: str) -> RepetitionStats:
+    s = "".join(text.split())
+    n = len(s)
+    if n < MIN_REPEAT:
+        return RepetitionStats(length=n, max_count=0, longest_repeat="", longest_count=0, loop_coverage=0.0)
+    # Most texts repeat no n-gram at all; a set of slices settles that in C.
+    grams = n - MIN_REPEAT + 1
+    if len({s[i : i + MIN_REPEAT] for i in range(grams)}) == grams:
+        return RepetitionStats(length=n, max_count=1, longest_repeat="", longest_count=0, loop_coverage=0.0)
+    return _analyze_automaton(s)
+
+
+def _analyze_automaton(s: str) -> RepetitionStats:
+    """Suffix automaton of `s`: O(len(s)) states, each with its occurrence count."""
+    nxt: list[dict[str, int]] = [{}]
+    link = [-1]
+    length = [0]
+    cnt = [0]
+    end = [-1]  # end index of the first occurrence
+    last = 0
+    for j, ch in enumerate(s):
+        cur = len(length)
+        nxt.append({})
+        length.append(length[last] + 1)
+        link.append(0)
+        cnt.append(1)
+        end.append(j)
+        p = last
+        while p != -1 and ch not in nxt[p]:
+            nxt[p][ch] = cur
+            p = link[p]
+        if p != -1:
+            q = nxt[p][ch]
+            if length[p] + 1 == length[q]:
+                link[cur] = q
+            else:
+                clone = len(length)
+                nxt.append(dict(nxt[q]))
+                length.append(length[p] + 1)
+                link.append(link[q])
+                cnt.append(0)
+                end.append(end[q])
+                while p != -1 and nxt[p].get(ch) == q:
+                    nxt[p][ch] = clone
+                    p = link[p]
+                link[q] = clone
+                link[cur] = clone
+        last = cur
+
+    # Occurrence counts: push counts up the suffix links, longest states first.
+    n = len(s)
+    states = len(length)
+    buckets = [0] * (n + 2)
+    for ln in length:
+        buckets[ln + 1] += 1
+    for i in range(1, n + 2):
+        buckets[i] += buckets[i - 1]
+    order = [0] * states
+    for v in range(states):
+        order[buckets[length[v]]] = v
+        buckets[length[v]] += 1
+    for v in reversed(order):
+        if link[v] > 0:
+            cnt[link[v]] += cnt[v]
+
+    max_count = 1
+    best = 0
+    for v in range(1, states):
+        if length[v] >= MIN_REPEAT:
+            c = cnt[v]
+            if c > max_count:
+                max_count = c
+            if c >= 2 and length[v] > length[best]:
+                best = v
+    if best == 0:
+        return RepetitionStats(length=n, max_count=max_count, longest_repeat="", longest_count=0, loop_coverage=0.0)
+
+    # Walk `s` through its own automaton, keeping (v, cur_len) on the MIN_REPEAT-gram
+    # ending at j: each repeated one extends the covered prefix.
+    v = 0
+    cur_len = 0
+    covered = 0
+    covered_until = 0
+    for j, ch in enumerate(s):
+        v = nxt[v][ch]
+        cur_len += 1
+        while length[link[v]] >= MIN_REPEAT:
+            v = link[v]
+            cur_len = length[v]
+        if cur_len >= MIN_REPEAT and cnt[v] >= 2:
+            covered += j + 1 - max(j + 1 - MIN_REPEAT, covered_until)
+            covered_until = j + 1
+    stop = end[best] + 1
+    return RepetitionStats(
+        length=n,
+        max_count=max_count,
+        longest_repeat=s[stop - length[best] : stop],
+        longest_count=cnt[best],
+        loop_coverage=covered / n,
+    )
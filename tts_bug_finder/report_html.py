@@ -1,84 +1,50 @@
 from __future__ import annotations
 
 import base64
+import contextlib
 import datetime as dt
+import functools
+import hashlib
+import heapq
 import html
 import json
+import os
 import pathlib
-from typing import Any
+import queue
+import threading
+import wave
+from typing import IO, Any, Callable, Iterator
 
-from .db import BugDB
+from .audio_preview import preview_wav
+from .db import NO_FILTER, BugDB, CaseFilter, parse_statuses
+from .report_index import SEARCH_JS, SearchIndex
 
+# Audio is read and base64-encoded this many bytes at a time (a multiple of 3, so the
+# encoded chunks concatenate into one valid base64 string).
+AUDIO_CHUNK_BYTES = 3 * 64 * 1024
 
-def _read_audio_bytes(audio_path_wav: str | None, *, db_path: pathlib.Path) -> bytes | None:
-    if not audio_path_wav:
-        return None
-    p = pathlib.Path(audio_path_wav)
-    candidates = [p, db_path.parent / p]
-    for c in candidates:
-        try:
-            if c.exists() and c.is_file():
-                return c.read_bytes()
-        except Exception:
-            continue
-    return None
-
-
-def _parse_statuses(status: str) -> list[str] | None:
-    s = (status or "").strip()
-    if not s or s.lower() == "all":
-        return None
-    return [p.strip() for p in s.split(",") if p.strip()]
-
-
-def _fetch_cases(db_path: pathlib.Path, *, statuses: list[str] | None) -> list[dict[str, Any]]:
-    with BugDB(db_path) as db:
-        if statuses is None:
-            return list(db.iter_cases(status=None))
-        out: list[dict[str, Any]] = []
-        for st in statuses:
-            out.extend(list(db.iter_cases(status=st)))
-        return out
-
-
-def _fmt_tags(tags: Any) -> str:
-    if isinstance(tags, list):
-        return ", ".join(str(t) for t in tags)
-    return ""
-
-
-def write_html_report(
-    *,
-    db_paths: list[pathlib.Path],
-    out_path: pathlib.Path,
-    status: str,
-    limit: int,
-    bundle_audio: bool,
-) -> None:
-    statuses = _parse_statuses(status)
-    cases: list[dict[str, Any]] = []
-    for db_path in db_paths:
-        rows = _fetch_cases(db_path, statuses=statuses)
-        for r in rows:
-            r = dict(r)
-            r["_source_db"] = str(db_path)
-            cases.append(r)
-
-    cases.sort(key=lambda r: float(r.get("score_total") or 0.0), reverse=True)
-    if limit and limit > 0:
-        cases = cases[:limit]
+# What the report shows of a case (no signature/llm_summary blobs).
+REPORT_COLUMNS = (
+    "id",
+    "status",
+    "score_total",
+    "ref_text",
+    "hyp_text",
+    "tags",
+    "cer",
+    "wer",
+    "critical_error_score",
+    "seed_id",
+    "mutation_trace",
+    "audio_path_wav",
+)
 
-    generated_at = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# Rows per hand-over from a fetch thread, and hand-overs queued per thread.
+_PREFETCH_ROWS = 256
+_PREFETCH_DEPTH = 4
+_DONE = object()
 
-    parts: list[str] = []
-    parts.append("<!doctype html>")
-    parts.append('<html lang="en">')
-    parts.append("<head>")
-    parts.append('<meta charset="utf-8" />')
-    parts.append('<meta name="viewport" content="width=device-width, initial-scale=1" />')
-    parts.append("<title>TTS Bug Finder Report</title>")
-    parts.append(
-        """
+_STYLE = """
 <style>
   :root { color-scheme: light dark; }
   body { font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif; margin: 18px; }
@@ -109,138 +75,90 @@ def write_html_report(
   .kv { font-size: 12px; opacity: 0.85; display: grid; gap: 2px; }
   .pill { display: inline-block; padding: 2px 8px; border-radius: 999px; border: 1px solid rgba(0,0,0,0.20); font-size: 12px; opacity: 0.9; }
 </style>
-        """.strip()
-    )
-    parts.append("</head>")
-    parts.append("<body>")
-
-    db_list = ", ".join(html.escape(str(p)) for p in db_paths)
-    parts.append("<header>")
-    parts.append("<h1>TTS Bug Finder Report</h1>")
-    parts.append(
-        f'<div class="meta"><div><span class="pill">cases</span> <strong id="caseCount">{len(cases)}</strong></div>'
-        f"<div><span class='pill'>generated</span> {html.escape(generated_at)}</div>"
-        f"<div><span class='pill'>db</span> {db_list}</div>"
-        f"<div><span class='pill'>status</span> {html.escape(status or 'all')}</div></div>"
-    )
-    parts.append(
-        """
+""".strip()
+
+_CONTROLS = """
 <div class="controls">
   <input id="q" type="search" placeholder="Search in GT / ASR / tags..." />
+  <select id="f-status" data-facet="status"><option value="">status: all</option></select>
+  <select id="f-tag" data-facet="tag"><option value="">tag: all</option></select>
+  <select id="f-db" data-facet="db"><option value="">db: all</option></select>
+  <input id="minScore" type="number" step="1" placeholder="min score" />
+  <input id="maxScore" type="number" step="1" placeholder="max score" />
   <button id="expandAll">Expand all</button>
   <button id="collapseAll">Collapse all</button>
 </div>
-        """.strip()
-    )
-    parts.append("</header>")
-
-    parts.append('<div class="list" id="list">')
-    for i, r in enumerate(cases, start=1):
-        cid = str(r.get("id") or "")
-        ref = str(r.get("ref_text") or "")
-        hyp = str(r.get("hyp_text") or "")
-        tags = r.get("tags") or []
-        tag_str = _fmt_tags(tags)
-        score = float(r.get("score_total") or 0.0)
-        cer = float(r.get("cer") or 0.0)
-        wer = float(r.get("wer") or 0.0)
-        critical = float(r.get("critical_error_score") or 0.0)
-        seed_id = r.get("seed_id") or ""
-        mutation_trace = r.get("mutation_trace") or ""
-        source_db = r.get("_source_db") or ""
-        audio_path = r.get("audio_path_wav")
-
-        audio_src = ""
-        audio_note = ""
-        if bundle_audio:
-            audio_bytes = _read_audio_bytes(audio_path, db_path=pathlib.Path(source_db))
-            if audio_bytes:
-                b64 = base64.b64encode(audio_bytes).decode("ascii")
-                audio_src = f"data:audio/wav;base64,{b64}"
-            else:
-                audio_note = "audio missing"
-        else:
-            if audio_path:
-                audio_src = html.escape(str(audio_path))
-            else:
-                audio_note = "audio missing"
-
-        ref_preview = ref.replace("\n", " ").strip()
-        if len(ref_preview) > 140:
-            ref_preview = ref_preview[:140] + "…"
-
-        searchable = " ".join(
-            [
-                cid,
-                tag_str,
-                ref,
-                hyp,
-                str(seed_id),
-                str(mutation_trace),
-                str(source_db),
-            ]
-        )
-        searchable_attr = html.escape(searchable.replace("\n", " "))
-
-        parts.append(f'<details class="case" data-search="{searchable_attr}">')
-        parts.append("<summary>")
-        parts.append(f'<div class="score">{score:0.1f}</div>')
-        parts.append(
-            f'<div class="summary-line"><div>{html.escape(ref_preview)}</div>'
-            f'<div class="tags">{html.escape(tag_str)}</div></div>'
-        )
-        parts.append("</summary>")
-        parts.append('<div class="case-body">')
-        parts.append('<div class="top-row">')
-        if audio_src:
-            parts.append(f'<audio controls preload="none" src="{audio_src}"></audio>')
-        if audio_note:
-            parts.append(f"<div class='kv'>{html.escape(audio_note)}</div>")
-        parts.append(
-            "<div class='kv'>"
-            f"<div><strong>id</strong>: {html.escape(cid)}</div>"
-            f"<div><strong>score</strong>: {score:0.1f} &nbsp; <strong>cer</strong>: {cer:0.2f} &nbsp; <strong>wer</strong>: {wer:0.2f} &nbsp; <strong>critical</strong>: {critical:0.2f}</div>"
-            f"<div><strong>seed_id</strong>: {html.escape(str(seed_id))}</div>"
-            f"<div><strong>mutation_trace</strong>: {html.escape(str(mutation_trace))}</div>"
-            f"<div><strong>audio_path_wav</strong>: {html.escape(str(audio_path or ''))}</div>"
-            f"<div><strong>db</strong>: {html.escape(str(source_db))}</div>"
-            "</div>"
-        )
-        parts.append("</div>")
-        parts.append('<div class="grid">')
-        parts.append('<div class="panel">')
-        parts.append("<h3>GT (ref_text)</h3>")
-        parts.append(f'<pre class="text">{html.escape(ref)}</pre>')
-        parts.append("</div>")
-        parts.append('<div class="panel">')
-        parts.append("<h3>ASR (hyp_text)</h3>")
-        parts.append(f'<pre class="text">{html.escape(hyp)}</pre>')
-        parts.append("</div>")
-        parts.append("</div>")
-        parts.append("</div>")
-        parts.append("</details>")
-    parts.append("</div>")
-
-    parts.append(
-        """
+""".strip()
+
+# Search runs against the precomputed index in #searchIndex (see report_index.py):
+# every query term and facet is a bitmap over the cases, intersected byte by byte, and
+# only the cases whose visibility changed are touched in the DOM.
+_SCRIPT = """
 <script>
+__SEARCH_JS__
+  const IDX = prepareIndex(JSON.parse(document.getElementById('searchIndex').textContent));
   const q = document.getElementById('q');
   const list = document.getElementById('list');
   const details = () => Array.from(list.querySelectorAll('details.case'));
+  const facetSelects = Array.from(document.querySelectorAll('select[data-facet]'));
+  const minScore = document.getElementById('minScore');
+  const maxScore = document.getElementById('maxScore');
+
+  function matching() {
+    const facets = {};
+    for (const sel of facetSelects) if (sel.value) facets[sel.dataset.facet] = sel.value;
+    let acc = indexMatch(IDX, q.value, facets);
+    const lo = minScore.value === '' ? -Infinity : Number(minScore.value);
+    const hi = maxScore.value === '' ? Infinity : Number(maxScore.value);
+    if (lo > -Infinity || hi < Infinity) {
+      const bits = new Uint8Array(IDX.nb);
+      IDX.scores.forEach((s, i) => { if (s >= lo && s <= hi) bits[i >> 3] |= 1 << (i & 7); });
+      acc = and(acc, bits);
+    }
+    return acc;
+  }
 
+  let shown = null;
   function applyFilter() {
-    const needle = (q.value || '').trim().toLowerCase();
-    let shown = 0;
-    for (const el of details()) {
-      const hay = (el.getAttribute('data-search') || '').toLowerCase();
-      const ok = !needle || hay.includes(needle);
-      el.style.display = ok ? '' : 'none';
-      if (ok) shown++;
+    const bits = matching();
+    const els = list.children;
+    let count = 0;
+    for (let i = 0; i < IDX.n; i++) {
+      const ok = bits === null || ((bits[i >> 3] >> (i & 7)) & 1) === 1;
+      const was = shown === null || ((shown[i >> 3] >> (i & 7)) & 1) === 1;
+      if (ok !== was) els[i].style.display = ok ? '' : 'none';
+      if (ok) count++;
     }
-    document.getElementById('caseCount').textContent = String(shown);
+    shown = bits;
+    document.getElementById('caseCount').textContent = String(count);
   }
 
-  q.addEventListener('input', applyFilter);
+  let timer = 0;
+  function scheduleFilter() {
+    clearTimeout(timer);
+    timer = setTimeout(applyFilter, 120);
+  }
+
+  for (const sel of facetSelects) {
+    for (const [value, b64] of Object.entries(IDX.facets[sel.dataset.facet])) {
+      const opt = document.createElement('option');
+      opt.value = value;
+      opt.textContent = `${value} (${popcount(fromBase64(b64, IDX.nb))})`;
+      sel.appendChild(opt);
+    }
+    sel.addEventListener('change', applyFilter);
+  }
+  q.addEventListener('input', scheduleFilter);
+  minScore.addEventListener('input', scheduleFilter);
+  maxScore.addEventListener('input', scheduleFilter);
+
+  // Repeated clips are embedded once; point the copies at it when a case is opened.
+  list.addEventListener('toggle', (e) => {
+    if (!e.target.open) return;
+    for (const a of e.target.querySelectorAll('audio[data-audio-ref]:not([src])')) {
+      a.src = document.getElementById(a.dataset.audioRef).getAttribute('src');
+    }
+  }, true);
 
   document.getElementById('expandAll').addEventListener('click', () => {
     for (const el of details()) el.open = true;
@@ -249,12 +167,365 @@ def write_html_report(
     for (const el of details()) el.open = false;
   });
 </script>
-        """.strip()
+""".replace("__SEARCH_JS__", SEARCH_JS).strip()
+
+
+def _resolve_audio_path(audio_path_wav: str | None, *, db_path: pathlib.Path) -> pathlib.Path | None:
+    if not audio_path_wav:
+        return None
+    p = pathlib.Path(audio_path_wav)
+    candidates = [p, db_path.parent / p]
+    for c in candidates:
+        try:
+            if c.exists() and c.is_file():
+                return c
+        except Exception:
+            continue
+    return None
+
+
+def _write_audio_data_uri(f: IO[str], path: pathlib.Path) -> None:
+    f.write("data:audio/wav;base64,")
+    with path.open("rb") as audio:
+        while True:
+            chunk = audio.read(AUDIO_CHUNK_BYTES)
+            if not chunk:
+                break
+            f.write(base64.b64encode(chunk).decode("ascii"))
+
+
+def _file_sha256(path: pathlib.Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(AUDIO_CHUNK_BYTES)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _AudioEmbedder:
+    """Writes each distinct WAV (by content hash) into the page once.
+
+    Later cases with the same audio get an empty `<audio data-audio-ref=...>` that the
+    page points at the first copy when the case is opened.  With `preview`
+    (rate, bits) the clips are re-encoded smaller before embedding.
+    """
+
+    def __init__(self, preview: tuple[int, int] | None) -> None:
+        self._preview = preview
+        self._ids: dict[str, str] = {}
+        self.repeats = 0
+
+    @property
+    def distinct(self) -> int:
+        return len(self._ids)
+
+    def write(self, f: IO[str], path: pathlib.Path) -> None:
+        digest = _file_sha256(path)
+        ref = self._ids.get(digest)
+        if ref is not None:
+            self.repeats += 1
+            f.write(f'<audio controls preload="none" data-audio-ref="{ref}"></audio>\n')
+            return
+        ref = f"audio-{digest[:16]}"
+        self._ids[digest] = ref
+        f.write(f'<audio id="{ref}" controls preload="none" src="')
+        data = None
+        if self._preview is not None:
+            try:
+                data = preview_wav(path, rate=self._preview[0], bits=self._preview[1])
+            except (wave.Error, EOFError):
+                data = None  # not PCM WAV: embed as is
+        if data is None:
+            _write_audio_data_uri(f, path)
+        else:
+            f.write("data:audio/wav;base64," + base64.b64encode(data).decode("ascii"))
+        f.write('"></audio>\n')
+
+
+def _where(statuses: list[str] | None, case_filter: CaseFilter) -> tuple[str, tuple[Any, ...]]:
+    conds, params = case_filter.conditions()
+    if statuses is not None:
+        conds = [f"status IN ({', '.join('?' for _ in statuses)})", *conds]
+        params = (*statuses, *params)
+    return (" WHERE " + " AND ".join(conds) if conds else ""), params
+
+
+def _count_cases(db_path: pathlib.Path, *, statuses: list[str] | None, case_filter: CaseFilter = NO_FILTER) -> int:
+    where, params = _where(statuses, case_filter)
+    with BugDB(db_path, readonly=True) as db:
+        return int(db.conn.execute(f"SELECT COUNT(*) FROM cases{where}", params).fetchone()[0])
+
+
+def _iter_cases(
+    db_path: pathlib.Path,
+    *,
+    status: str | None,
+    limit: int,
+    columns: tuple[str, ...] = REPORT_COLUMNS,
+    case_filter: CaseFilter = NO_FILTER,
+) -> Iterator[dict[str, Any]]:
+    """Cases of one DB with one status (None: any), best score first, one row at a time.
+
+    ORDER BY/LIMIT run in SQLite and walk `idx_cases_status_score` (or `idx_cases_score`),
+    so only the rows that can make the report are read, and only `columns` of them.
+    A selective `case_filter` starts from `case_tags` or `idx_cases_cluster` instead.
+    """
+    where, params = _where(None if status is None else [status], case_filter)
+    sql = f"SELECT {', '.join(columns)} FROM cases{where} ORDER BY score_total DESC"
+    if limit > 0:
+        sql += " LIMIT ?"
+        params = params + (limit,)
+    with BugDB(db_path, readonly=True) as db:
+        for r in db.conn.execute(sql, params):
+            d = dict(r)
+            if d.get("tags"):
+                d["tags"] = json.loads(d["tags"])
+            d["_source_db"] = str(db_path)
+            yield d
+
+
+def _prefetched(make: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+    """Iterate `make()` on a worker thread, handed over in batches through a bounded queue.
+
+    SQLite releases the GIL while it steps a query, so several DBs are read in parallel
+    while the caller merges and renders.  Closing the returned generator stops the worker.
+    """
+    q: queue.Queue[Any] = queue.Queue(maxsize=_PREFETCH_DEPTH)
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def work() -> None:
+        try:
+            with contextlib.closing(make()) as it:
+                batch: list[Any] = []
+                for item in it:
+                    batch.append(item)
+                    if len(batch) >= _PREFETCH_ROWS:
+                        if not put(batch):
+                            return
+                        batch = []
+            if batch and not put(batch):
+                return
+            put(_DONE)
+        except BaseException as e:  # re-raised on the caller's thread
+            put(e)
+
+    worker = threading.Thread(target=work, name="report-fetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        worker.join()
+
+
+def _iter_merged(
+    db_paths: list[pathlib.Path],
+    *,
+    statuses: list[str] | None,
+    limit: int,
+    columns: tuple[str, ...] = REPORT_COLUMNS,
+    case_filter: CaseFilter = NO_FILTER,
+) -> Iterator[dict[str, Any]]:
+    """Cases of all DBs, best score first, at most `limit`.
+
+    One ordered cursor per DB and status (each with the LIMIT pushed down), read on its
+    own thread and combined by a k-way heap merge.  The merge is stable: equal scores
+    keep the --db order, then the --status order.
+    """
+    with contextlib.ExitStack() as stack:
+        streams = [
+            stack.enter_context(
+                contextlib.closing(
+                    _prefetched(
+                        functools.partial(
+                            _iter_cases, p, status=st, limit=limit, columns=columns, case_filter=case_filter
+                        )
+                    )
+                )
+            )
+            for p in db_paths
+            for st in (statuses if statuses is not None else [None])
+        ]
+        for n, r in enumerate(heapq.merge(*streams, key=lambda r: -float(r.get("score_total") or 0.0))):
+            if limit and n >= limit:
+                break
+            yield r
+
+
+def _fmt_tags(tags: Any) -> str:
+    if isinstance(tags, list):
+        return ", ".join(str(t) for t in tags)
+    return ""
+
+
+def _index_case(index: SearchIndex, r: dict[str, Any]) -> None:
+    tags = r.get("tags") or []
+    fields = (r.get("id"), _fmt_tags(tags), r.get("ref_text"), r.get("hyp_text"), r.get("seed_id"), r.get("mutation_trace"), r.get("_source_db"))
+    index.add(
+        text=" ".join(str(v or "") for v in fields),
+        status=str(r.get("status") or ""),
+        tags=[str(t) for t in tags] if isinstance(tags, list) else [],
+        db=str(r.get("_source_db") or ""),
+        score=float(r.get("score_total") or 0.0),
     )
 
-    parts.append("</body></html>")
+
+def _write_case(f: IO[str], r: dict[str, Any], *, bundle_audio: bool, audio: _AudioEmbedder) -> None:
+    cid = str(r.get("id") or "")
+    ref = str(r.get("ref_text") or "")
+    hyp = str(r.get("hyp_text") or "")
+    tags = r.get("tags") or []
+    tag_str = _fmt_tags(tags)
+    score = float(r.get("score_total") or 0.0)
+    cer = float(r.get("cer") or 0.0)
+    wer = float(r.get("wer") or 0.0)
+    critical = float(r.get("critical_error_score") or 0.0)
+    seed_id = r.get("seed_id") or ""
+    mutation_trace = r.get("mutation_trace") or ""
+    source_db = r.get("_source_db") or ""
+    audio_path = r.get("audio_path_wav")
+
+    audio_file: pathlib.Path | None = None
+    audio_src = ""
+    audio_note = ""
+    if bundle_audio:
+        audio_file = _resolve_audio_path(audio_path, db_path=pathlib.Path(source_db))
+        if audio_file is None:
+            audio_note = "audio missing"
+    else:
+        if audio_path:
+            audio_src = html.escape(str(audio_path))
+        else:
+            audio_note = "audio missing"
+
+    ref_preview = ref.replace("\n", " ").strip()
+    if len(ref_preview) > 140:
+        ref_preview = ref_preview[:140] + "…"
+
+    f.write('<details class="case">\n')
+    f.write("<summary>\n")
+    f.write(f'<div class="score">{score:0.1f}</div>\n')
+    f.write(
+        f'<div class="summary-line"><div>{html.escape(ref_preview)}</div>'
+        f'<div class="tags">{html.escape(tag_str)}</div></div>\n'
+    )
+    f.write("</summary>\n")
+    f.write('<div class="case-body">\n')
+    f.write('<div class="top-row">\n')
+    if audio_file is not None:
+        audio.write(f, audio_file)
+    elif audio_src:
+        f.write(f'<audio controls preload="none" src="{audio_src}"></audio>\n')
+    if audio_note:
+        f.write(f"<div class='kv'>{html.escape(audio_note)}</div>\n")
+    f.write(
+        "<div class='kv'>"
+        f"<div><strong>id</strong>: {html.escape(cid)}</div>"
+        f"<div><strong>score</strong>: {score:0.1f} &nbsp; <strong>cer</strong>: {cer:0.2f} &nbsp; <strong>wer</strong>: {wer:0.2f} &nbsp; <strong>critical</strong>: {critical:0.2f}</div>"
+        f"<div><strong>seed_id</strong>: {html.escape(str(seed_id))}</div>"
+        f"<div><strong>mutation_trace</strong>: {html.escape(str(mutation_trace))}</div>"
+        f"<div><strong>audio_path_wav</strong>: {html.escape(str(audio_path or ''))}</div>"
+        f"<div><strong>db</strong>: {html.escape(str(source_db))}</div>"
+        "</div>\n"
+    )
+    f.write("</div>\n")
+    f.write('<div class="grid">\n')
+    f.write('<div class="panel">\n')
+    f.write("<h3>GT (ref_text)</h3>\n")
+    f.write(f'<pre class="text">{html.escape(ref)}</pre>\n')
+    f.write("</div>\n")
+    f.write('<div class="panel">\n')
+    f.write("<h3>ASR (hyp_text)</h3>\n")
+    f.write(f'<pre class="text">{html.escape(hyp)}</pre>\n')
+    f.write("</div>\n")
+    f.write("</div>\n")
+    f.write("</div>\n")
+    f.write("</details>\n")
+
+
+def write_html_report(
+    *,
+    db_paths: list[pathlib.Path],
+    out_path: pathlib.Path,
+    status: str,
+    limit: int,
+    bundle_audio: bool,
+    preview: tuple[int, int] | None = None,
+    case_filter: CaseFilter = NO_FILTER,
+) -> None:
+    """Write the report as a stream: cases arrive best-first from a k-way merge of one
+    ordered cursor per DB, and bundled audio is base64-encoded chunk by chunk straight
+    into the file, so memory stays at one row plus one audio chunk (and the search
+    index, which is written after the cases).  Each distinct audio clip is embedded
+    once; `preview` (rate, bits) re-encodes the clips smaller (needs numpy).  `case_filter`
+    narrows the cases by tag, cluster or creation time."""
+    statuses = parse_statuses(status)
+    limit = limit if limit and limit > 0 else 0
+    total = sum(_count_cases(p, statuses=statuses, case_filter=case_filter) for p in db_paths)
+    n_cases = min(total, limit) if limit else total
+
+    generated_at = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text("\n".join(parts), encoding="utf-8")
-    print(f"Wrote {out_path} ({len(cases)} cases, bundle_audio={bundle_audio})")
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    written = 0
+    index = SearchIndex()
+    audio = _AudioEmbedder(preview)
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(tmp_path.open("w", encoding="utf-8"))
+        f.write("<!doctype html>\n")
+        f.write('<html lang="en">\n')
+        f.write("<head>\n")
+        f.write('<meta charset="utf-8" />\n')
+        f.write('<meta name="viewport" content="width=device-width, initial-scale=1" />\n')
+        f.write("<title>TTS Bug Finder Report</title>\n")
+        f.write(_STYLE + "\n")
+        f.write("</head>\n")
+        f.write("<body>\n")
+
+        db_list = ", ".join(html.escape(str(p)) for p in db_paths)
+        filter_desc = case_filter.describe()
+        f.write("<header>\n")
+        f.write("<h1>TTS Bug Finder Report</h1>\n")
+        f.write(
+            f'<div class="meta"><div><span class="pill">cases</span> <strong id="caseCount">{n_cases}</strong></div>'
+            f"<div><span class='pill'>generated</span> {html.escape(generated_at)}</div>"
+            f"<div><span class='pill'>db</span> {db_list}</div>"
+            f"<div><span class='pill'>status</span> {html.escape(status or 'all')}</div>"
+            + (f"<div><span class='pill'>filter</span> {html.escape(filter_desc)}</div>" if filter_desc else "")
+            + "</div>\n"
+        )
+        f.write(_CONTROLS + "\n")
+        f.write("</header>\n")
 
+        f.write('<div class="list" id="list">\n')
+        cases = _iter_merged(db_paths, statuses=statuses, limit=limit, case_filter=case_filter)
+        for r in stack.enter_context(contextlib.closing(cases)):
+            _write_case(f, r, bundle_audio=bundle_audio, audio=audio)
+            _index_case(index, r)
+            written += 1
+        f.write("</div>\n")
+        f.write(f'<script id="searchIndex" type="application/json">{index.to_json()}</script>\n')
+        f.write(_SCRIPT + "\n")
+        f.write("</body></html>")
+    os.replace(tmp_path, out_path)
+    dedupe = f", {audio.distinct} distinct clips, {audio.repeats} repeats" if bundle_audio else ""
+    print(f"Wrote {out_path} ({written} cases, bundle_audio={bundle_audio}{dedupe})")
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import base64
+import json
+import re
+from array import array
+from typing import Any, Iterable
+
+# Scripts indexed by character (unigrams + bigrams) rather than by word: kana, CJK
+# ideographs and hangul.  The report's JS tokenizer uses the same ranges.
+CJK_RANGES = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+
+_TERM_RE = re.compile(rf"[{CJK_RANGES}]+|(?:(?![{CJK_RANGES}])\w)+")
+_CJK_RE = re.compile(rf"[{CJK_RANGES}]")
+
+# Facets the page can filter on.
+FACETS = ("status", "tag", "db")
+
+
+def search_terms(text: str) -> set[str]:
+    """Index terms of `text`: lowercased word tokens, plus unigrams and bigrams of CJK runs."""
+    terms: set[str] = set()
+    for tok in _TERM_RE.findall(text.lower()):
+        if _CJK_RE.match(tok):
+            terms.update(tok)
+            terms.update(tok[i : i + 2] for i in range(len(tok) - 1))
+        else:
+            terms.add(tok)
+    return terms
+
+
+def _bitmap(ids: Iterable[int], n: int) -> str:
+    """Base64 of a little-endian bitmap (bit `i` of byte `i >> 3`) over `n` cases."""
+    bits = bytearray((n + 7) >> 3)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bits).decode("ascii")
+
+
+def _encode_postings(ids: array, n: int) -> list[int] | str:
+    """Delta-encoded ids, or a bitmap when that is smaller (terms present in most cases)."""
+    if len(ids) * 3 > ((n + 7) >> 3) * 4 // 3:
+        return _bitmap(ids, n)
+    out: list[int] = []
+    prev = 0
+    for i in ids:
+        out.append(i - prev)
+        prev = i
+    return out
+
+
+class SearchIndex:
+    """Inverted index and facet bitmaps for the cases of one report, built as they stream by.
+
+    Cases are numbered in the order they are added (the order they appear on the page).
+    Postings are kept as `array('I')`, so 50k cases with ~100 terms each stay at a few
+    tens of MB while the report is written.
+    """
+
+    def __init__(self) -> None:
+        self.n = 0
+        self._postings: dict[str, array] = {}
+        self._facets: dict[str, dict[str, array]] = {name: {} for name in FACETS}
+        self._scores: list[float] = []
+
+    def add(self, *, text: str, status: str, tags: Iterable[str], db: str, score: float) -> int:
+        """Index one case; returns its number."""
+        i = self.n
+        self.n += 1
+        for term in search_terms(text):
+            self._postings.setdefault(term, array("I")).append(i)
+        self._facets["status"].setdefault(status, array("I")).append(i)
+        for tag in dict.fromkeys(tags):
+            self._facets["tag"].setdefault(tag, array("I")).append(i)
+        self._facets["db"].setdefault(db, array("I")).append(i)
+        self._scores.append(round(score, 1))
+        return i
+
+    def to_dict(self) -> dict[str, Any]:
+        terms = sorted(self._postings)
+        return {
+            "n": self.n,
+            "terms": terms,
+            "postings": [_encode_postings(self._postings[t], self.n) for t in terms],
+            "scores": self._scores,
+            "facets": {
+                name: {value: _bitmap(ids, self.n) for value, ids in sorted(values.items())}
+                for name, values in self._facets.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        """Compact JSON, safe to embed in a `<script>` element."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+
+# Query side of `SearchIndex.to_dict()`, shared by the reports' pages.  `indexMatch(idx,
+# text, facets)` is the bitmap (little-endian, `idx.nb` bytes) of the cases of `idx`
+# matching every query term and every selected facet value, or null when nothing is
+# selected; bitmaps are intersected byte by byte.
+SEARCH_JS = """
+  const CJK = /^[__CJK__]/u;
+  const TERM_RE = /[__CJK__]+|(?:(?![__CJK__])[\\p{L}\\p{N}_])+/gu;
+
+  function prepareIndex(idx) {
+    idx.nb = (idx.n + 7) >> 3;
+    return idx;
+  }
+
+  function fromBase64(s, nb) {
+    const bin = atob(s);
+    const out = new Uint8Array(nb);
+    for (let i = 0; i < bin.length; i++) out[i] = bin.charCodeAt(i);
+    return out;
+  }
+
+  function postingBits(idx, k, out) {
+    const p = idx.postings[k];
+    if (typeof p === 'string') {
+      const b = fromBase64(p, idx.nb);
+      for (let i = 0; i < idx.nb; i++) out[i] |= b[i];
+      return;
+    }
+    let id = 0;
+    for (const d of p) {
+      id += d;
+      out[id >> 3] |= 1 << (id & 7);
+    }
+  }
+
+  function lowerBound(idx, t) {
+    let lo = 0, hi = idx.terms.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (idx.terms[mid] < t) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+
+  // Exact term, or every term starting with it (words are matched by prefix while typing).
+  function termBits(idx, t, prefix) {
+    const out = new Uint8Array(idx.nb);
+    for (let k = lowerBound(idx, t); k < idx.terms.length; k++) {
+      const term = idx.terms[k];
+      if (prefix ? !term.startsWith(t) : term !== t) break;
+      postingBits(idx, k, out);
+    }
+    return out;
+  }
+
+  function and(acc, bits) {
+    if (acc === null) return bits;
+    for (let i = 0; i < acc.length; i++) acc[i] &= bits[i];
+    return acc;
+  }
+
+  function popcount(bits) {
+    let c = 0;
+    for (let i = 0; i < bits.length; i++) for (let b = bits[i]; b; b &= b - 1) c++;
+    return c;
+  }
+
+  function indexMatch(idx, text, facets) {
+    let acc = null;
+    for (const tok of (text || '').toLowerCase().match(TERM_RE) || []) {
+      if (!CJK.test(tok)) acc = and(acc, termBits(idx, tok, true));
+      else if (tok.length === 1) acc = and(acc, termBits(idx, tok, false));
+      else for (let i = 0; i + 1 < tok.length; i++) acc = and(acc, termBits(idx, tok.slice(i, i + 2), false));
+    }
+    for (const [name, value] of Object.entries(facets)) {
+      const b64 = idx.facets[name][value];
+      acc = and(acc, b64 === undefined ? new Uint8Array(idx.nb) : fromBase64(b64, idx.nb));
+    }
+    return acc;
+  }
+""".replace("__CJK__", CJK_RANGES)
@@ -0,0 +1,586 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import html
+import json
+import os
+import pathlib
+import shutil
+import wave
+from typing import Any, Iterator
+
+from .audio_preview import preview_wav
+from .db import NO_FILTER, BugDB, CaseFilter, parse_statuses
+from .report_html import AUDIO_CHUNK_BYTES, REPORT_COLUMNS, _fmt_tags, _iter_merged, _resolve_audio_path
+from .report_index import SEARCH_JS, SearchIndex
+
+# Cases per metadata chunk (one JSONP file each).
+CHUNK_CASES = 500
+
+MANIFEST_NAME = "manifest.json"
+_MANIFEST_VERSION = 2
+
+# Enough to tell whether a rendered case is still current.
+_STATE_COLUMNS = ("id", "score_total", "status", "audio_path_wav")
+
+_ID_BATCH = 500
+
+
+def files_dir_for(out_path: pathlib.Path) -> pathlib.Path:
+    """Sidecar directory of a sharded report: `report.html` -> `report_files/`."""
+    return out_path.with_name(out_path.stem + "_files")
+
+
+def _store_audio(src: pathlib.Path, audio_dir: pathlib.Path, *, preview: tuple[int, int] | None = None) -> str:
+    """Copy `src` (or its `preview` re-encoding) into the content-addressed store, once per
+    distinct content.  Returns its relative path."""
+    h = hashlib.sha256()
+    tmp = audio_dir / f".incoming-{os.getpid()}.wav"
+    data = None
+    if preview is not None:
+        try:
+            data = preview_wav(src, rate=preview[0], bits=preview[1])
+        except (wave.Error, EOFError):
+            data = None  # not PCM WAV: store as is
+    if data is not None:
+        h.update(data)
+        tmp.write_bytes(data)
+    else:
+        with src.open("rb") as fin, tmp.open("wb") as fout:
+            while True:
+                chunk = fin.read(AUDIO_CHUNK_BYTES)
+                if not chunk:
+                    break
+                h.update(chunk)
+                fout.write(chunk)
+    digest = h.hexdigest()
+    rel = f"audio/{digest[:2]}/{digest}.wav"
+    dest = audio_dir.parent / rel
+    if dest.exists():
+        tmp.unlink()
+    else:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, dest)
+    return rel
+
+
+def _case_key(r: dict[str, Any]) -> str:
+    return f"{r['_source_db']}\n{r['id']}"
+
+
+def _audio_stamp(r: dict[str, Any]) -> list[int] | None:
+    """(size, mtime_ns) of the case's WAV, so re-synthesized audio counts as a change."""
+    src = _resolve_audio_path(r.get("audio_path_wav"), db_path=pathlib.Path(r["_source_db"]))
+    if src is None:
+        return None
+    st = src.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _case_state(r: dict[str, Any]) -> list[Any]:
+    """What the manifest remembers per rendered case; a case is re-rendered when this differs."""
+    return [round(float(r.get("score_total") or 0.0), 3), str(r.get("status") or ""), str(r.get("audio_path_wav") or ""), _audio_stamp(r)]
+
+
+def _case_record(r: dict[str, Any], audio: str | None) -> dict[str, Any]:
+    return {
+        "id": str(r.get("id") or ""),
+        "score": round(float(r.get("score_total") or 0.0), 3),
+        "status": str(r.get("status") or ""),
+        "tags": _fmt_tags(r.get("tags") or []),
+        "ref": str(r.get("ref_text") or ""),
+        "hyp": str(r.get("hyp_text") or ""),
+        "cer": round(float(r.get("cer") or 0.0), 4),
+        "wer": round(float(r.get("wer") or 0.0), 4),
+        "crit": round(float(r.get("critical_error_score") or 0.0), 4),
+        "seed": str(r.get("seed_id") or ""),
+        "trace": str(r.get("mutation_trace") or ""),
+        "wav": str(r.get("audio_path_wav") or ""),
+        "db": str(r.get("_source_db") or ""),
+        "audio": audio,
+    }
+
+
+def _chunk_prefix(index: int) -> str:
+    return f"window.reportChunk({index},"
+
+
+def _index_rel(chunk_rel: str) -> str:
+    """Search index file of a chunk: `cases/chunk-00003.js` -> `cases/index-00003.js`."""
+    return chunk_rel.replace("/chunk-", "/index-")
+
+
+def _chunk_index(records: list[dict[str, Any]]) -> SearchIndex:
+    """Search index over the records of one chunk, tombstones skipped (the page numbers
+    the remaining records the same way)."""
+    index = SearchIndex()
+    for rec in records:
+        if rec.get("removed"):
+            continue
+        fields = (rec["id"], rec["tags"], rec["ref"], rec["hyp"], rec["seed"], rec["trace"], rec["db"])
+        index.add(
+            text=" ".join(fields),
+            status=rec["status"],
+            tags=[t for t in rec["tags"].split(", ") if t],
+            db=rec["db"],
+            score=rec["score"],
+        )
+    return index
+
+
+def _write_js(path: pathlib.Path, text: str) -> None:
+    tmp = path.with_name(f".{path.stem}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _write_chunk(cases_dir: pathlib.Path, index: int, records: list[dict[str, Any]]) -> str:
+    """Write chunk `index` and its search index; returns the chunk's relative path."""
+    rel = f"cases/chunk-{index:05d}.js"
+    payload = json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+    _write_js(cases_dir.parent / _index_rel(rel), f"window.reportIndex({index},{_chunk_index(records).to_json()});\n")
+    _write_js(cases_dir.parent / rel, f"{_chunk_prefix(index)}{payload});\n")
+    return rel
+
+
+def _read_chunk(files_dir: pathlib.Path, rel: str, index: int) -> list[dict[str, Any]]:
+    text = (files_dir / rel).read_text(encoding="utf-8")
+    return json.loads(text[len(_chunk_prefix(index)) : -len(");\n")])
+
+
+def _load_manifest(files_dir: pathlib.Path, settings: dict[str, Any]) -> dict[str, Any] | None:
+    """The previous run's manifest, or None when there is none or it was made with other settings."""
+    try:
+        manifest = json.loads((files_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if manifest.get("version") != _MANIFEST_VERSION or manifest.get("settings") != settings:
+        return None
+    if not all((files_dir / rel).exists() for rel in manifest.get("chunks", []) + manifest.get("indexes", [])):
+        return None
+    return manifest
+
+
+def _save_manifest(files_dir: pathlib.Path, manifest: dict[str, Any]) -> None:
+    tmp = files_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, files_dir / MANIFEST_NAME)
+
+
+def _fetch_cases(db_path: pathlib.Path, ids: list[str]) -> Iterator[dict[str, Any]]:
+    """Full rows for `ids` of one DB, looked up by primary key in batches."""
+    with BugDB(db_path, readonly=True) as db:
+        for i in range(0, len(ids), _ID_BATCH):
+            batch = ids[i : i + _ID_BATCH]
+            sql = f"SELECT {', '.join(REPORT_COLUMNS)} FROM cases WHERE id IN ({', '.join('?' for _ in batch)})"
+            for row in db.conn.execute(sql, batch):
+                d = dict(row)
+                if d.get("tags"):
+                    d["tags"] = json.loads(d["tags"])
+                d["_source_db"] = str(db_path)
+                yield d
+
+
+class _ChunkAppender:
+    """Packs records into CHUNK_CASES-sized chunk files after the existing ones.
+
+    A trailing chunk that is not full yet is read back and rewritten with the new records,
+    so repeated small runs do not leave one tiny file each.
+    """
+
+    def __init__(self, files_dir: pathlib.Path, chunks: list[str]) -> None:
+        self._files_dir = files_dir
+        self._cases_dir = files_dir / "cases"
+        self.chunks = chunks
+        self._pending: list[dict[str, Any]] = []
+        self._reopened: str | None = None
+        if chunks:
+            last = _read_chunk(files_dir, chunks[-1], len(chunks) - 1)
+            if len(last) < CHUNK_CASES:
+                self._reopened = self.chunks.pop()
+                self._pending = last
+        self.appended = 0
+
+    def add(self, record: dict[str, Any]) -> None:
+        self._pending.append(record)
+        self.appended += 1
+        if len(self._pending) >= CHUNK_CASES:
+            self.chunks.append(_write_chunk(self._cases_dir, len(self.chunks), self._pending))
+            self._pending = []
+
+    def close(self) -> None:
+        if self._reopened is not None and not self.appended:
+            self.chunks.append(self._reopened)
+        elif self._pending:
+            self.chunks.append(_write_chunk(self._cases_dir, len(self.chunks), self._pending))
+        self._pending = []
+
+
+def _render(
+    r: dict[str, Any], *, files_dir: pathlib.Path, bundle_audio: bool, preview: tuple[int, int] | None
+) -> tuple[dict[str, Any], str | None]:
+    """The chunk record of a case, plus its stored audio path (bundle mode)."""
+    stored: str | None = None
+    audio: str | None = None
+    if bundle_audio:
+        src = _resolve_audio_path(r.get("audio_path_wav"), db_path=pathlib.Path(r["_source_db"]))
+        if src is not None:
+            stored = _store_audio(src, files_dir / "audio", preview=preview)
+            audio = f"{files_dir.name}/{stored}"
+    elif r.get("audio_path_wav"):
+        audio = pathlib.Path(str(r["audio_path_wav"])).resolve().as_uri()
+    return _case_record(r, audio), stored
+
+
+def _remove_unreferenced_audio(files_dir: pathlib.Path, cases: dict[str, list[Any]]) -> None:
+    keep = {entry[4] for entry in cases.values() if entry[4]}
+    for path in (files_dir / "audio").glob("*/*.wav"):
+        if path.relative_to(files_dir).as_posix() not in keep:
+            path.unlink()
+
+
+def write_sharded_report(
+    *,
+    db_paths: list[pathlib.Path],
+    out_path: pathlib.Path,
+    status: str,
+    limit: int,
+    bundle_audio: bool,
+    incremental: bool = False,
+    preview: tuple[int, int] | None = None,
+    case_filter: CaseFilter = NO_FILTER,
+) -> None:
+    """Static report split into a small index page plus sidecar files.
+
+    Case metadata goes to JSONP chunks (`<script>` loading works from `file://`, where
+    `fetch` does not), each with a `SearchIndex` file of its records that the page's
+    search and facets run on, audio to content-addressed copies that are only requested
+    when a case is opened, and the page renders just the rows in view.  Without
+    `bundle_audio` the cases point at the original WAV paths instead; with `preview`
+    (rate, bits) the stored copies are re-encoded smaller (needs numpy), and
+    `case_filter` narrows the cases by tag, cluster or creation time.
+
+    A manifest records the state (score, status, audio path and size/mtime) and stored
+    audio of every rendered case.  With `incremental`, only the light state columns are
+    scanned; new and changed cases are rendered and appended as new chunk records (the
+    page keeps the last record per case), cases that dropped out get a tombstone, and
+    nothing else is re-read or re-encoded.  Without a usable manifest (first run, other
+    settings), or once superseded records outnumber live ones, the report is rebuilt.
+    """
+    statuses = parse_statuses(status)
+    limit = limit if limit and limit > 0 else 0
+    settings = {
+        "db": [str(p) for p in db_paths],
+        "status": status or "all",
+        "limit": limit,
+        "bundle_audio": bundle_audio,
+        "preview": list(preview) if preview and bundle_audio else None,
+        "filter": case_filter.describe(),
+    }
+
+    files_dir = files_dir_for(out_path)
+    cases_dir = files_dir / "cases"
+    (files_dir / "audio").mkdir(parents=True, exist_ok=True)
+    cases_dir.mkdir(exist_ok=True)
+
+    manifest = _load_manifest(files_dir, settings) if incremental else None
+    rendered = removed = 0
+    if manifest is not None:
+        live: dict[str, list[Any]] = manifest["cases"]
+        wanted: dict[str, list[Any]] = {}
+        changed: dict[str, list[str]] = {}
+        for r in _iter_merged(
+            db_paths, statuses=statuses, limit=limit, columns=_STATE_COLUMNS, case_filter=case_filter
+        ):
+            key = _case_key(r)
+            state = _case_state(r)
+            wanted[key] = state
+            prev = live.get(key)
+            if prev is None or prev[:4] != state:
+                changed.setdefault(r["_source_db"], []).append(str(r["id"]))
+        gone = [key for key in live if key not in wanted]
+        records = manifest["records"] + sum(len(ids) for ids in changed.values()) + len(gone)
+        if records - len(wanted) > len(wanted):
+            manifest = None
+    if manifest is not None:
+        appender = _ChunkAppender(files_dir, list(manifest["chunks"]))
+        for db_path in db_paths:
+            for r in _fetch_cases(db_path, changed.get(str(db_path), [])):
+                record, stored = _render(r, files_dir=files_dir, bundle_audio=bundle_audio, preview=preview)
+                live[_case_key(r)] = [*wanted[_case_key(r)], stored]
+                appender.add(record)
+                rendered += 1
+        for key in gone:
+            db, case_id = key.split("\n", 1)
+            appender.add({"id": case_id, "db": db, "removed": True})
+            del live[key]
+            removed += 1
+        appender.close()
+        manifest["chunks"] = appender.chunks
+        manifest["indexes"] = [_index_rel(c) for c in appender.chunks]
+        manifest["records"] += appender.appended
+    else:
+        if cases_dir.exists():
+            shutil.rmtree(cases_dir)
+        cases_dir.mkdir()
+        live = {}
+        appender = _ChunkAppender(files_dir, [])
+        for r in _iter_merged(db_paths, statuses=statuses, limit=limit, case_filter=case_filter):
+            record, stored = _render(r, files_dir=files_dir, bundle_audio=bundle_audio, preview=preview)
+            live[_case_key(r)] = [*_case_state(r), stored]
+            appender.add(record)
+            rendered += 1
+        appender.close()
+        manifest = {
+            "version": _MANIFEST_VERSION,
+            "settings": settings,
+            "chunks": appender.chunks,
+            "indexes": [_index_rel(c) for c in appender.chunks],
+            "records": rendered,
+            "cases": live,
+        }
+        _remove_unreferenced_audio(files_dir, live)
+
+    meta = {
+        "count": len(live),
+        "chunks": [f"{files_dir.name}/{c}" for c in manifest["chunks"]],
+        "indexes": [f"{files_dir.name}/{c}" for c in manifest["indexes"]],
+        "generated": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "db": settings["db"],
+        "status": settings["status"],
+        "filter": settings["filter"],
+    }
+    page = _INDEX_HTML.replace("__SEARCH_JS__", SEARCH_JS)
+    page = page.replace("__META__", json.dumps(meta, ensure_ascii=False).replace("</", "<\\/"))
+    page = page.replace("__COUNT__", str(len(live))).replace("__DB__", html.escape(", ".join(meta["db"])))
+    status_text = meta["status"] + (f"; {meta['filter']}" if meta["filter"] else "")
+    page = page.replace("__STATUS__", html.escape(status_text)).replace("__GENERATED__", html.escape(meta["generated"]))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    tmp.write_text(page, encoding="utf-8")
+    os.replace(tmp, out_path)
+    _save_manifest(files_dir, manifest)
+    print(
+        f"Wrote {out_path} + {files_dir}/ ({len(live)} cases in {len(manifest['chunks'])} chunks; "
+        f"rendered {rendered}, removed {removed}; bundle_audio={bundle_audio})"
+    )
+
+
+_INDEX_HTML = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1" />
+<title>TTS Bug Finder Report</title>
+<style>
+  :root { color-scheme: light dark; --row: 58px; }
+  body { font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif; margin: 0; height: 100vh; display: flex; flex-direction: column; }
+  header { padding: 10px 18px; border-bottom: 1px solid rgba(0,0,0,0.10); }
+  h1 { font-size: 18px; margin: 0 0 8px 0; }
+  .meta { font-size: 12px; opacity: 0.8; display: flex; gap: 12px; flex-wrap: wrap; }
+  .controls { margin-top: 10px; display: flex; gap: 10px; flex-wrap: wrap; align-items: center; }
+  input[type="search"] { width: min(520px, 100%); padding: 8px 10px; border-radius: 10px; border: 1px solid rgba(0,0,0,0.20); background: transparent; }
+  .pill { display: inline-block; padding: 2px 8px; border-radius: 999px; border: 1px solid rgba(0,0,0,0.20); font-size: 12px; opacity: 0.9; }
+  main { flex: 1; display: flex; min-height: 0; }
+  #scroller { flex: 1; overflow-y: auto; position: relative; }
+  #spacer { position: relative; }
+  .row { position: absolute; left: 0; right: 0; height: var(--row); box-sizing: border-box; padding: 8px 18px; display: grid; grid-template-columns: 70px 1fr; gap: 10px; align-items: center; border-bottom: 1px solid rgba(0,0,0,0.06); cursor: pointer; }
+  .row:hover, .row.sel { background: rgba(127,127,127,0.12); }
+  .score { font-variant-numeric: tabular-nums; font-weight: 700; }
+  .line { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; font-size: 13px; }
+  .tags { font-size: 12px; opacity: 0.75; }
+  #detail { width: min(560px, 45vw); overflow-y: auto; border-left: 1px solid rgba(0,0,0,0.10); padding: 12px 18px; box-sizing: border-box; }
+  #detail[hidden] { display: none; }
+  audio { width: 100%; }
+  .panel { border: 1px solid rgba(0,0,0,0.10); border-radius: 12px; padding: 10px; margin-top: 10px; }
+  .panel h3 { margin: 0 0 8px 0; font-size: 13px; opacity: 0.9; }
+  pre.text { margin: 0; white-space: pre-wrap; word-break: break-word; font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", monospace; font-size: 12.5px; line-height: 1.35; }
+  .kv { font-size: 12px; opacity: 0.85; display: grid; gap: 2px; margin-top: 8px; word-break: break-all; }
+</style>
+</head>
+<body>
+<header>
+<h1>TTS Bug Finder Report</h1>
+<div class="meta"><div><span class="pill">cases</span> <strong id="caseCount">__COUNT__</strong> <span id="loading"></span></div><div><span class='pill'>generated</span> __GENERATED__</div><div><span class='pill'>db</span> __DB__</div><div><span class='pill'>status</span> __STATUS__</div></div>
+<div class="controls">
+  <input id="q" type="search" placeholder="Search in GT / ASR / tags..." />
+  <select id="f-status" data-facet="status"><option value="">status: all</option></select>
+  <select id="f-tag" data-facet="tag"><option value="">tag: all</option></select>
+  <select id="f-db" data-facet="db"><option value="">db: all</option></select>
+</div>
+</header>
+<main>
+<div id="scroller"><div id="spacer"></div></div>
+<aside id="detail" hidden></aside>
+</main>
+<script>
+__SEARCH_JS__
+  const META = __META__;
+  const ROW = 58;
+  const cases = [];
+  const byKey = new Map();
+  // Per chunk: its search index, its records other than tombstones (record j is case j
+  // of the index), and the first `cases` slot it created.
+  const indexes = [];
+  const indexed = [];
+  const firstNew = [];
+  let view = [];
+  let selected = -1;
+  const scroller = document.getElementById('scroller');
+  const spacer = document.getElementById('spacer');
+  const detail = document.getElementById('detail');
+  const q = document.getElementById('q');
+  const facetSelects = Array.from(document.querySelectorAll('select[data-facet]'));
+
+  const esc = (s) => String(s).replace(/[&<>"']/g, (c) => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+  const keyOf = (c) => JSON.stringify([c.db, c.id]);
+
+  function render() {
+    spacer.style.height = (view.length * ROW) + 'px';
+    const first = Math.max(0, Math.floor(scroller.scrollTop / ROW) - 5);
+    const last = Math.min(view.length, Math.ceil((scroller.scrollTop + scroller.clientHeight) / ROW) + 5);
+    let out = '';
+    for (let i = first; i < last; i++) {
+      const c = cases[view[i]];
+      if (c.removed) continue;
+      out += `<div class="row${view[i] === selected ? ' sel' : ''}" data-i="${view[i]}" style="top:${i * ROW}px">`
+        + `<div class="score">${c.score.toFixed(1)}</div>`
+        + `<div><div class="line">${esc(c.ref)}</div><div class="line tags">${esc(c.tags)}</div></div></div>`;
+    }
+    spacer.innerHTML = out;
+  }
+
+  // Appends to `out` the slots of chunk `k`'s records set in `bits` (null: all) that are
+  // still current, i.e. not superseded by a later record of the same case.
+  function current(k, bits, out) {
+    const rows = indexed[k];
+    for (let j = 0; j < rows.length; j++) {
+      if (bits !== null && ((bits[j >> 3] >> (j & 7)) & 1) === 0) continue;
+      const at = byKey.get(keyOf(rows[j]));
+      if (cases[at] === rows[j]) out.push(at);
+    }
+    return out;
+  }
+
+  function selectedFacets() {
+    const facets = {};
+    for (const sel of facetSelects) if (sel.value) facets[sel.dataset.facet] = sel.value;
+    return facets;
+  }
+
+  function applyFilter() {
+    const facets = selectedFacets();
+    view = [];
+    indexes.forEach((idx, k) => current(k, indexMatch(idx, q.value, facets), view));
+    view.sort((a, b) => cases[b].score - cases[a].score || a - b);
+    document.getElementById('caseCount').textContent = String(view.length);
+    render();
+  }
+
+  let timer = 0;
+  function scheduleFilter() {
+    clearTimeout(timer);
+    timer = setTimeout(applyFilter, 120);
+  }
+
+  // Facet options with the number of current cases per value; selections are kept.
+  function fillFacets() {
+    for (const sel of facetSelects) {
+      const name = sel.dataset.facet;
+      const counts = new Map();
+      indexes.forEach((idx, k) => {
+        for (const [value, b64] of Object.entries(idx.facets[name])) {
+          counts.set(value, (counts.get(value) || 0) + current(k, fromBase64(b64, idx.nb), []).length);
+        }
+      });
+      const keep = sel.value;
+      sel.length = 1;
+      for (const value of Array.from(counts.keys()).sort()) {
+        if (!counts.get(value)) continue;
+        const opt = document.createElement('option');
+        opt.value = value;
+        opt.textContent = `${value} (${counts.get(value)})`;
+        sel.appendChild(opt);
+      }
+      sel.value = keep;
+    }
+  }
+
+  function show(i) {
+    selected = i;
+    const c = cases[i];
+    // The audio element (and so the audio file) is only created when a case is opened.
+    detail.innerHTML = (c.audio ? `<audio controls autoplay src="${esc(c.audio)}"></audio>` : `<div class="kv">audio missing</div>`)
+      + `<div class="kv"><div><strong>id</strong>: ${esc(c.id)}</div>`
+      + `<div><strong>score</strong>: ${c.score.toFixed(1)} &nbsp; <strong>cer</strong>: ${c.cer.toFixed(2)} &nbsp; <strong>wer</strong>: ${c.wer.toFixed(2)} &nbsp; <strong>critical</strong>: ${c.crit.toFixed(2)}</div>`
+      + `<div><strong>status</strong>: ${esc(c.status)} &nbsp; <strong>tags</strong>: ${esc(c.tags)}</div>`
+      + `<div><strong>seed_id</strong>: ${esc(c.seed)}</div><div><strong>mutation_trace</strong>: ${esc(c.trace)}</div>`
+      + `<div><strong>audio_path_wav</strong>: ${esc(c.wav)}</div><div><strong>db</strong>: ${esc(c.db)}</div></div>`
+      + `<div class="panel"><h3>GT (ref_text)</h3><pre class="text">${esc(c.ref)}</pre></div>`
+      + `<div class="panel"><h3>ASR (hyp_text)</h3><pre class="text">${esc(c.hyp)}</pre></div>`;
+    detail.hidden = false;
+    render();
+  }
+
+  function loadScript(src) {
+    const s = document.createElement('script');
+    s.src = src;
+    document.body.appendChild(s);
+  }
+
+  let nextChunk = 0;
+  function loadNext() {
+    if (nextChunk >= META.chunks.length) {
+      document.getElementById('loading').textContent = '';
+      fillFacets();
+      applyFilter();
+      return;
+    }
+    document.getElementById('loading').textContent = `(loading ${nextChunk + 1}/${META.chunks.length})`;
+    loadScript(META.chunks[nextChunk]);
+  }
+
+  // Incremental runs append newer records for a case (or a tombstone with `removed`);
+  // the last one wins.  New cases are shown at the end until loading finishes and the
+  // list is sorted by score.  Each chunk is followed by its search index.
+  window.reportChunk = (index, rows) => {
+    indexed[index] = rows.filter((c) => !c.removed);
+    firstNew[index] = cases.length;
+    for (const c of rows) {
+      const key = keyOf(c);
+      const at = byKey.get(key);
+      if (at !== undefined) {
+        cases[at] = c;
+        continue;
+      }
+      if (c.removed) continue;
+      byKey.set(key, cases.length);
+      cases.push(c);
+    }
+    loadScript(META.indexes[index]);
+  };
+
+  window.reportIndex = (index, idx) => {
+    indexes[index] = prepareIndex(idx);
+    for (const at of current(index, indexMatch(idx, q.value, selectedFacets()), [])) {
+      if (at >= firstNew[index]) view.push(at);
+    }
+    document.getElementById('caseCount').textContent = String(view.length);
+    render();
+    nextChunk++;
+    loadNext();
+  };
+
+  scroller.addEventListener('scroll', () => requestAnimationFrame(render));
+  window.addEventListener('resize', render);
+  spacer.addEventListener('click', (e) => {
+    const row = e.target.closest('.row');
+    if (row) show(Number(row.dataset.i));
+  });
+  for (const sel of facetSelects) sel.addEventListener('change', applyFilter);
+  q.addEventListener('input', scheduleFilter);
+  loadNext();
+</script>
+</body></html>
+"""
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures as cf
+import contextlib
+import json
+import os
+import pathlib
+from typing import Any
+
+from .db import BugDB
+from .runner import ComparedCase, _compared_case, _dedupe_decision, _max_sims
+from .scoring import case_status, clamp, evaluate_pairs, metric_columns, score_total
+from .text_utils import normalize_for_similarity_no_punct
+
+# (rowid, old status, new status, ref_text, hyp_text, update row)
+_Rescored = tuple[int, str, str, str, str, tuple[Any, ...]]
+
+_UPDATE_SQL = (
+    "UPDATE cases SET status=?, score_total=?, cer=?, wer=?, len_ratio=?, critical_error_score=?, "
+    "lang_guess=?, tags=?, signature=COALESCE(?, signature), cluster_id=COALESCE(cluster_id, ?), "
+    "llm_summary=COALESCE(?, llm_summary), novelty=?, is_duplicate=?, plausibility=?, crit_numbers=?, crit_negation=?, "
+    "crit_truncation=?, crit_repetition=? WHERE rowid=?"
+)
+
+
+def _stored_novelty(row: dict[str, Any]) -> tuple[float, bool] | None:
+    """(novelty, duplicate) as the runner scored them, None if the row never went through dedupe.
+
+    Novelty depends on the cases accepted before this one, which an offline pass cannot
+    replay, so the stored values are kept.  Rows written before the `novelty` or
+    `is_duplicate` columns existed have them solved back from the stored score, `60*err
+    + 25*crit + 10*novelty - 20*dup`: the remainder after the error and critical parts
+    recovers both (unless the score was clamped at 0).  Tier-1 rows (no signature) were
+    never deduped; whatever novelty they carry is not a real one.
+    """
+    if row["signature"] is None:
+        return None
+    err = row["wer"] if row["lang_guess"] == "en" else row["cer"]
+    stored = float(row["score_total"] or 0.0)
+    bonus = stored - 60.0 * clamp(float(err or 0.0)) - 25.0 * clamp(float(row["critical_error_score"] or 0.0))
+    if row["novelty"] is None:
+        novelty, duplicate = (clamp((bonus + 20.0) / 10.0), True) if bonus < -5.0 else (clamp(bonus / 10.0), False)
+    elif row["is_duplicate"] is not None:
+        novelty, duplicate = float(row["novelty"]), bool(row["is_duplicate"])
+    else:
+        novelty = float(row["novelty"])
+        # The penalty takes 20 off the 10*novelty a non-duplicate scores; only the
+        # penalty can bring a score down to the clamp at 0.
+        duplicate = bonus < 10.0 * novelty - (0.0 if stored <= 0.0 else 10.0)
+    return novelty, duplicate or row["status"] == "duplicate"
+
+
+def _parse_tags(raw: str | None) -> tuple[str, ...]:
+    try:
+        tags = json.loads(raw) if raw else []
+    except json.JSONDecodeError:
+        return ()
+    return tuple(str(t) for t in tags) if isinstance(tags, list) else ()
+
+
+# Accepted cases that rows never deduped by the runner are compared against; set once
+# per pool worker by `_init_rescore_worker`.
+_WORKER_COMPARED: list[ComparedCase] = []
+
+
+def _init_rescore_worker(compared: list[ComparedCase]) -> None:
+    global _WORKER_COMPARED
+    _WORKER_COMPARED = compared
+
+
+def _rescore_chunk(rows: list[dict[str, Any]], t2s: bool, thresholds: dict[str, float]) -> list[_Rescored]:
+    evals = evaluate_pairs(
+        [{"ref_text": r["ref_text"], "hyp_text": r["hyp_text"], "base_tags": _parse_tags(r["tags"])} for r in rows],
+        t2s=t2s,
+        thresholds=thresholds,
+    )
+    out: list[_Rescored] = []
+    for row, ev in zip(rows, evals):
+        tier2 = ev["tier"] != 1
+        stored = _stored_novelty(row)
+        novelty: float | None
+        if stored is not None:
+            novelty, duplicate = stored
+        elif tier2:
+            # Newly past tier 1: dedupe it now, against the accepted cases in the DB.
+            sims = _max_sims(
+                normalize_for_similarity_no_punct(row["ref_text"]),
+                normalize_for_similarity_no_punct(row["hyp_text"]),
+                ev["signature"],
+                _WORKER_COMPARED,
+            )
+            duplicate, novelty = _dedupe_decision(sims[0], sims[2])
+        else:
+            novelty, duplicate = None, False
+        # Like the runner, tier-1 results score without novelty bonus or duplicate penalty;
+        # a stored novelty itself is left as it is.
+        s_total = score_total(
+            cer=float(ev["cer"]),
+            wer=float(ev["wer"]),
+            critical=float(ev["critical_error_score"]),
+            novelty=novelty if tier2 and novelty is not None else 0.0,
+            duplication_penalty=1.0 if duplicate and tier2 else 0.0,
+            lang_guess=str(ev["lang_guess"]),
+        )
+        old_status = str(row["status"])
+        status = case_status(
+            plausibility=float(ev["plausibility"]),
+            cer=float(ev["cer"]),
+            wer=float(ev["wer"]),
+            critical=float(ev["critical_error_score"]),
+            lang_guess=str(ev["lang_guess"]),
+            duplicate=duplicate,
+            s_total=s_total,
+            thresholds=thresholds,
+        )
+        update = (
+            status,
+            float(s_total),
+            float(ev["cer"]),
+            float(ev["wer"]),
+            float(ev["len_ratio"]),
+            float(ev["critical_error_score"]),
+            ev["lang_guess"],
+            json.dumps(ev["tags"], ensure_ascii=False),
+            ev["signature_json"],
+            ev["cluster_id"],
+            ev["summary"],
+            novelty,
+            None if novelty is None else int(duplicate),
+            *metric_columns(ev["plausibility"], ev["critical_parts"]).values(),
+            int(row["rowid"]),
+        )
+        out.append((int(row["rowid"]), old_status, status, row["ref_text"], row["hyp_text"], update))
+    return out
+
+
+def rescore(
+    *,
+    db_path: pathlib.Path,
+    statuses: list[str] | None,
+    thresholds: dict[str, float],
+    t2s: bool = True,
+    workers: int = 0,
+    batch_size: int = 2000,
+    dry_run: bool = False,
+    examples: int = 3,
+) -> dict[str, Any]:
+    """Re-evaluate stored cases with the current scoring code and thresholds.
+
+    Rows are paged by rowid (`batch_size` at a time, at most `2 * workers` pages in
+    flight), so memory stays bounded however large the DB is.  Each page is written back
+    in one transaction, including the persisted metric columns (which also backfills
+    them for rows stored before they existed).  Novelty and duplicate flags are kept
+    from the original run; rows the runner rejected at tier 1 that now pass it are
+    deduped against the DB's accepted cases instead.  Kimi decisions are not redone, and
+    rows that become kept have no audio.
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    batch_size = max(1, batch_size)
+    transitions: collections.Counter[tuple[str, str]] = collections.Counter()
+    samples: dict[tuple[str, str], list[tuple[str, str]]] = {}
+    total = 0
+    no_audio = 0
+
+    sql = (
+        "SELECT rowid, ref_text, hyp_text, tags, status, lang_guess, cer, wer, critical_error_score, score_total, novelty, "
+        "is_duplicate, signature "
+        "FROM cases WHERE rowid > ?"
+    )
+    filter_params: tuple[Any, ...] = ()
+    if statuses is not None:
+        sql += f" AND status IN ({', '.join('?' for _ in statuses)})"
+        filter_params = tuple(statuses)
+    sql += " ORDER BY rowid LIMIT ?"
+
+    # A dry run opens the DB read-only: no migration, statistics or other writes.
+    with contextlib.ExitStack() as stack:
+        db = stack.enter_context(BugDB(db_path, readonly=dry_run))
+        compared = [_compared_case(c) for c in db.list_cases_minimal(status="accepted")]
+        pool = stack.enter_context(
+            cf.ProcessPoolExecutor(max_workers=workers, initializer=_init_rescore_worker, initargs=(compared,))
+        )
+        in_flight: set[cf.Future] = set()
+
+        def drain(wait_all: bool) -> None:
+            nonlocal in_flight, total, no_audio
+            done, in_flight = cf.wait(in_flight, return_when=cf.ALL_COMPLETED if wait_all else cf.FIRST_COMPLETED)
+            for fut in done:
+                results = fut.result()
+                total += len(results)
+                for _, old, new, ref_text, hyp_text, _ in results:
+                    transitions[(old, new)] += 1
+                    if old != new:
+                        picked = samples.setdefault((old, new), [])
+                        if len(picked) < examples:
+                            picked.append((ref_text, hyp_text))
+                        if old == "rejected":
+                            no_audio += 1
+                if not dry_run:
+                    with db.conn:
+                        db.conn.executemany(_UPDATE_SQL, [r[5] for r in results])
+
+        last = 0
+        while True:
+            page = [dict(r) for r in db.conn.execute(sql, (last, *filter_params, batch_size))]
+            if not page:
+                break
+            last = int(page[-1]["rowid"])
+            in_flight.add(pool.submit(_rescore_chunk, page, t2s, thresholds))
+            if len(in_flight) >= 2 * workers:
+                drain(False)
+        if in_flight:
+            drain(True)
+
+    changed = sum(c for (old, new), c in transitions.items() if old != new)
+    print(f"Rescored {total} cases: {changed} changed status (workers={workers}, dry_run={dry_run})")
+    for (old, new), c in sorted(transitions.items(), key=lambda kv: (-kv[1], kv[0])):
+        print(f"  {old:>10} -> {new:<10} {c}")
+    for (old, new), picked in sorted(samples.items()):
+        for ref_text, hyp_text in picked:
+            print(f"  [{old}->{new}] GT={ref_text} | ASR={hyp_text}")
+    if no_audio:
+        print(f"  note: {no_audio} previously rejected cases changed status but have no stored audio")
+    return {"cases": total, "changed": changed, "transitions": dict(transitions)}
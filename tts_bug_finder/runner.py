@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures as cf
+import contextlib
 import datetime as dt
-import hashlib
+import functools
+import itertools
 import json
+import multiprocessing
 import os
 import pathlib
 import random
@@ -17,13 +21,14 @@ from .adapters.dummy import DummyASRAdapter, DummyLLMAdapter, DummyTTSAdapter
 from .adapters.http_api import HTTPAPIASRAdapter, HTTPAPILLMAdapter, HTTPAPITTSAdapter
 from .adapters.macos_say import MacOSSayTTSAdapter
 from .adapters.whisper_cli import WhisperCLIASRAdapter
-from .db import BugDB
-from .dedupe import signature_similarity, text_similarity_no_punct
+from .db import BatchWriter, BugDB, SeenSet, seen_key
+from .dedupe import normalized_text_similarity, signature_similarity
+from .dedupe_index import GlobalDedupeIndex
 from .kimi_cli import KimiCLI
 from .mutators import mutate_all
-from .scoring import evaluate_pair, score_total
+from .scoring import case_status, evaluate_pairs, metric_columns, score_total
 from .seeds import SEEDS
-from .text_utils import collapse_whitespace, normalize_nfkc
+from .text_utils import collapse_whitespace, normalize_for_similarity_no_punct, normalize_nfkc
 from .types import QueueItem
 
 
@@ -52,6 +57,10 @@ def run_search(
     kimi_timeout_sec: float,
     kimi_max_patterns: int,
     thresholds: dict,
+    global_dedupe_index: pathlib.Path | None = None,
+    scoring_workers: int = 0,
+    inline_scoring: bool = False,
+    seen_store_text: bool = False,
 ) -> None:
     asyncio.run(
         _run_search_async(
@@ -78,6 +87,10 @@ def run_search(
             kimi_timeout_sec=kimi_timeout_sec,
             kimi_max_patterns=kimi_max_patterns,
             thresholds=thresholds,
+            global_dedupe_index=global_dedupe_index,
+            scoring_workers=scoring_workers,
+            inline_scoring=inline_scoring,
+            seen_store_text=seen_store_text,
         )
     )
 
@@ -90,10 +103,6 @@ def _norm_key(text: str) -> str:
     return collapse_whitespace(normalize_nfkc(text))
 
 
-def _text_key(norm_text: str) -> str:
-    return hashlib.sha1(norm_text.encode("utf-8", errors="ignore")).hexdigest()
-
-
 def _parse_tag_filter(s: str) -> set[str] | None:
     raw = (s or "").strip()
     if not raw:
@@ -220,24 +229,6 @@ def _diff_hint(top_subs: list[list[str]]) -> str:
     return "; ".join(pairs)[:200]
 
 
-def _is_accepted(
-    *,
-    plausibility: float,
-    cer: float,
-    wer: float,
-    critical: float,
-    lang_guess: str,
-    thresholds: dict[str, float],
-) -> bool:
-    if plausibility < float(thresholds["min_plausibility"]):
-        return False
-    if critical >= float(thresholds["min_critical"]):
-        return True
-    if lang_guess == "en":
-        return wer >= float(thresholds["min_wer"])
-    return cer >= float(thresholds["min_cer"])
-
-
 async def _evaluate_once(
     item: QueueItem,
     *,
@@ -245,13 +236,104 @@ async def _evaluate_once(
     asr: Any,
     voice: str | None,
     semaphore: asyncio.Semaphore,
-    t2s: bool,
 ) -> dict[str, Any]:
     async with semaphore:
         audio_bytes = await asyncio.to_thread(tts.synthesize, item.text, voice=voice)
         hyp_text = await asyncio.to_thread(asr.transcribe, audio_bytes)
-        eval_info = evaluate_pair(ref_text=item.text, hyp_text=hyp_text, base_tags=item.tags, t2s=t2s)
-        return {"item": item, "audio_bytes": audio_bytes, "hyp_text": hyp_text, "eval": eval_info}
+        return {"item": item, "audio_bytes": audio_bytes, "hyp_text": hyp_text}
+
+
+# A compared (already accepted) case for dedupe: normalized ref, normalized hyp, signature.
+ComparedCase = tuple[str, str, dict[str, Any]]
+
+# Smallest scoring task sent to a worker process.
+SCORING_MIN_BATCH = 8
+
+
+def _compared_case(c: dict[str, Any]) -> ComparedCase:
+    sig = c.get("signature")
+    return (
+        normalize_for_similarity_no_punct(str(c.get("ref_text", ""))),
+        normalize_for_similarity_no_punct(str(c.get("hyp_text", ""))),
+        sig if isinstance(sig, dict) else {},
+    )
+
+
+def _max_sims(
+    ref_n: str, hyp_n: str, sig: dict[str, Any], cases: list[ComparedCase]
+) -> tuple[float, float, float]:
+    best_text = 0.0
+    best_hyp = 0.0
+    best_sig = 0.0
+    for c_ref, c_hyp, c_sig in cases:
+        best_text = max(best_text, normalized_text_similarity(ref_n, c_ref))
+        best_hyp = max(best_hyp, normalized_text_similarity(hyp_n, c_hyp))
+        if c_sig:
+            best_sig = max(best_sig, signature_similarity(sig, c_sig))
+    return best_text, best_hyp, best_sig
+
+
+def _dedupe_decision(best_text_sim: float, best_sig_sim: float) -> tuple[bool, float]:
+    """(duplicate, novelty) from the best similarities against the compared cases."""
+    duplicate = (best_text_sim > 0.85) or (best_sig_sim > 0.8)
+    return duplicate, max(0.0, min(1.0, 1.0 - max(best_text_sim, best_sig_sim)))
+
+
+def _score_batch(
+    pairs: list[dict[str, Any]],
+    *,
+    t2s: bool,
+    thresholds: dict[str, float],
+    compared: list[ComparedCase],
+) -> list[dict[str, Any]]:
+    """CPU-bound scoring of one batch: `evaluate_pairs` plus dedupe similarities against `compared`.
+
+    Runs in a worker process, so only the compact fields the runner uses are returned.
+    """
+    out: list[dict[str, Any]] = []
+    for p, ev in zip(pairs, evaluate_pairs(pairs, t2s=t2s, thresholds=thresholds)):
+        ev.pop("alignment", None)
+        ev["metrics"] = metric_columns(ev["plausibility"], ev.pop("critical_parts"))
+        if ev["tier"] != 1:
+            ev["sims"] = _max_sims(
+                normalize_for_similarity_no_punct(p["ref_text"]),
+                normalize_for_similarity_no_punct(p["hyp_text"]),
+                ev["signature"],
+                compared,
+            )
+        out.append(ev)
+    return out
+
+
+# The history pool workers dedupe against: the runner's `compared` as of pool start
+# (sent once, by `_init_scoring_worker`), then the newer entries each batch brings along.
+_WORKER_COMPARED: list[ComparedCase] = []
+_WORKER_BASE = 0
+
+
+def _init_scoring_worker(compared: list[ComparedCase]) -> None:
+    global _WORKER_COMPARED, _WORKER_BASE
+    _WORKER_COMPARED = compared
+    _WORKER_BASE = len(compared)
+
+
+def _score_batch_in_worker(
+    pairs: list[dict[str, Any]],
+    *,
+    t2s: bool,
+    thresholds: dict[str, float],
+    new: list[ComparedCase],
+) -> list[dict[str, Any]]:
+    """`_score_batch` in a pool worker; `new` is the runner's `compared[base:snapshot]`."""
+    _WORKER_COMPARED[_WORKER_BASE:] = new
+    return _score_batch(pairs, t2s=t2s, thresholds=thresholds, compared=_WORKER_COMPARED)
+
+
+def _scoring_mp_context() -> Any:
+    # The runner already has threads (asyncio.to_thread, BatchWriter); a forked child
+    # could inherit locks they hold.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
 
 
 async def _run_search_async(
@@ -279,6 +361,10 @@ async def _run_search_async(
     kimi_timeout_sec: float,
     kimi_max_patterns: int,
     thresholds: dict,
+    global_dedupe_index: pathlib.Path | None = None,
+    scoring_workers: int = 0,
+    inline_scoring: bool = False,
+    seen_store_text: bool = False,
 ) -> None:
     artifacts_dir.mkdir(parents=True, exist_ok=True)
     (artifacts_dir / "audio").mkdir(parents=True, exist_ok=True)
@@ -306,13 +392,30 @@ async def _run_search_async(
     start = time.monotonic()
     total_eval = 0
     accepted_new = 0
+    # Results are counted a batch at a time, so progress is printed on crossing each
+    # multiple of 50 rather than on hitting it.
+    next_progress = 50
 
     semaphore = asyncio.Semaphore(max(1, int(concurrency)))
 
-    with BugDB(db_path) as db:
+    with contextlib.ExitStack() as stack:
+        db = stack.enter_context(BugDB(db_path))
         accepted_cases = db.list_cases_minimal(status="accepted")
+        # Texts evaluated by earlier runs; new ones are recorded write-behind.
+        seen_keys = db.load_seen() if persist_seen else SeenSet()
+        writer = stack.enter_context(BatchWriter(db_path))
+
+        global_index: GlobalDedupeIndex | None = None
+        if global_dedupe_index is not None:
+            global_index = stack.enter_context(GlobalDedupeIndex(global_dedupe_index, source=str(db_path)))
+            # Publish this campaign's history so other runs dedupe against it as well.
+            global_index.append(accepted_cases)
+
+        loop = asyncio.get_running_loop()
 
         pending: set[asyncio.Task] = set()
+        dispatch_order: dict[asyncio.Task, int] = {}
+        dispatch_seq = itertools.count()
 
         def stop() -> bool:
             if accepted_new >= budget_accepted:
@@ -358,19 +461,61 @@ async def _run_search_async(
 
         existing_patterns = build_pattern_lines()
 
-        def max_sims(candidate_ref: str, candidate_hyp: str, candidate_sig: dict[str, Any]) -> tuple[float, float, float]:
-            if not accepted_cases:
-                return 0.0, 0.0, 0.0
-            best_text = 0.0
-            best_hyp = 0.0
-            best_sig = 0.0
-            for c in accepted_cases:
-                best_text = max(best_text, text_similarity_no_punct(candidate_ref, str(c.get("ref_text", ""))))
-                best_hyp = max(best_hyp, text_similarity_no_punct(candidate_hyp, str(c.get("hyp_text", ""))))
-                sig = c.get("signature") or {}
-                if isinstance(sig, dict):
-                    best_sig = max(best_sig, signature_similarity(candidate_sig, sig))
-            return best_text, best_hyp, best_sig
+        local_ids = {str(c.get("id") or "") for c in accepted_cases}
+
+        # Everything new results are deduped against (local accepted cases, then other
+        # campaigns' entries of the global index); append-only, so a prefix length is a snapshot.
+        compared: list[ComparedCase] = [_compared_case(c) for c in accepted_cases]
+        global_consumed = 0
+
+        scoring_pool: cf.ProcessPoolExecutor | None = None
+        if not inline_scoring:
+            scoring_workers = scoring_workers if scoring_workers > 0 else (os.cpu_count() or 1)
+            scoring_pool = stack.enter_context(
+                cf.ProcessPoolExecutor(
+                    max_workers=scoring_workers,
+                    mp_context=_scoring_mp_context(),
+                    initializer=_init_scoring_worker,
+                    # A copy: workers start lazily, while `compared` keeps growing.
+                    initargs=(list(compared),),
+                )
+            )
+        # Length of `compared` the workers start with; batches only carry what came after.
+        pool_base = len(compared)
+
+        def refresh_compared() -> int:
+            nonlocal global_consumed
+            if global_index is not None:
+                global_index.refresh()
+                for c in global_index.entries[global_consumed:]:
+                    if str(c.get("id") or "") not in local_ids:
+                        compared.append(_compared_case(c))
+                global_consumed = len(global_index.entries)
+            return len(compared)
+
+        # Scoring batches in submission order: (results, compared snapshot length, future).
+        scoring: deque[tuple[list[dict[str, Any]], int, asyncio.Future]] = deque()
+        in_scoring = 0
+
+        def submit_scoring(results: list[dict[str, Any]]) -> None:
+            nonlocal in_scoring
+            if not results:
+                return
+            snapshot = refresh_compared()
+            pairs = [{"ref_text": r["item"].text, "hyp_text": r["hyp_text"], "base_tags": r["item"].tags} for r in results]
+            size = len(results) if scoring_pool is None else max(SCORING_MIN_BATCH, -(-len(results) // scoring_workers))
+            new = compared[pool_base:snapshot]
+            for i in range(0, len(results), size):
+                if scoring_pool is None:
+                    fut = loop.create_future()
+                    fut.set_result(_score_batch(pairs[i : i + size], t2s=t2s, thresholds=thresholds, compared=compared[:snapshot]))
+                else:
+                    fut = loop.run_in_executor(
+                        scoring_pool,
+                        functools.partial(_score_batch_in_worker, pairs[i : i + size], t2s=t2s, thresholds=thresholds, new=new),
+                    )
+                scoring.append((results[i : i + size], snapshot, fut))
+                in_scoring += len(results[i : i + size])
 
         def enqueue(item: QueueItem) -> None:
             if len(queue) >= 20000:
@@ -416,126 +561,167 @@ async def _run_search_async(
                         )
                     )
 
-        while (queue or pending) and not stop():
-            while queue and len(pending) < concurrency and (total_eval + len(pending)) < budget_total_eval:
+        while ((queue or pending) and not stop()) or scoring:
+            while (
+                not stop()
+                and queue
+                and len(pending) < concurrency
+                and (total_eval + len(pending) + in_scoring) < budget_total_eval
+            ):
                 item = queue.popleft()
                 queued.discard(_norm_key(item.text))
                 key = _norm_key(item.text)
                 if key in seen:
                     continue
                 if persist_seen:
-                    if not db.mark_text_seen(text_key=_text_key(key), text_norm=key, first_seen_at=_now_iso()):
+                    text_key = seen_key(key)
+                    if text_key in seen_keys:
                         continue
-                seen.add(key)
-                pending.add(
-                    asyncio.create_task(
-                        _evaluate_once(item, tts=tts, asr=asr, voice=voice, semaphore=semaphore, t2s=t2s)
+                    seen_keys.add(text_key)
+                    writer.mark_text_seen(
+                        key=text_key, first_seen_at=int(time.time()), text_norm=key if seen_store_text else None
                     )
-                )
+                seen.add(key)
+                task = asyncio.create_task(_evaluate_once(item, tts=tts, asr=asr, voice=voice, semaphore=semaphore))
+                dispatch_order[task] = next(dispatch_seq)
+                pending.add(task)
 
-            if not pending:
+            if not pending and not scoring:
                 continue
 
-            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
-            for task in done:
+            # Wait for TTS/ASR completions and, while scoring runs in the pool, for the
+            # oldest scoring batch; new work keeps being dispatched in between.
+            waiting: set[asyncio.Future] = set(pending)
+            if scoring:
+                waiting.add(scoring[0][2])
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            results: list[dict[str, Any]] = []
+            # `done` is a set; handle completions in dispatch order so batches stay reproducible.
+            for task in sorted((t for t in done if t in dispatch_order), key=dispatch_order.__getitem__):
+                del dispatch_order[task]
+                pending.discard(task)
                 try:
-                    result = task.result()
+                    results.append(task.result())
                 except Exception as e:
                     total_eval += 1
                     print(f"[ERROR] {type(e).__name__}: {e}")
+            # Score everything that completed together as one batch (split across workers).
+            submit_scoring(results)
+
+            # Results are handled strictly in submission order: dedupe and status depend
+            # on the cases accepted before them.
+            while scoring and scoring[0][2].done():
+                results, snapshot, fut = scoring.popleft()
+                in_scoring -= len(results)
+                try:
+                    evals = fut.result()
+                except Exception as e:
+                    total_eval += len(results)
+                    print(f"[ERROR] scoring: {type(e).__name__}: {e}")
                     continue
+                for result, ev in zip(results, evals):
+                    total_eval += 1
+                    item = result["item"]
+                    audio_bytes: bytes = result["audio_bytes"]
+                    hyp_text: str = result["hyp_text"]
+
+                    if ev["tier"] == 1:
+                        # Rejected whatever its novelty: skip dedupe, the row is written without
+                        # signature/cluster/summary/novelty and its score without the novelty bonus.
+                        duplicate = False
+                        novelty = 0.0
+                    else:
+                        best_text_sim, best_hyp_sim, best_sig_sim = ev["sims"]
+                        # Cases accepted after the batch was submitted were not seen by the worker.
+                        late = compared[snapshot : refresh_compared()]
+                        if late:
+                            late_sims = _max_sims(
+                                normalize_for_similarity_no_punct(item.text),
+                                normalize_for_similarity_no_punct(hyp_text),
+                                ev["signature"],
+                                late,
+                            )
+                            best_text_sim = max(best_text_sim, late_sims[0])
+                            best_hyp_sim = max(best_hyp_sim, late_sims[1])
+                            best_sig_sim = max(best_sig_sim, late_sims[2])
+                        duplicate, novelty = _dedupe_decision(best_text_sim, best_sig_sim)
+                    dup_penalty = 1.0 if duplicate else 0.0
+
+                    s_total = score_total(
+                        cer=float(ev["cer"]),
+                        wer=float(ev["wer"]),
+                        critical=float(ev["critical_error_score"]),
+                        novelty=float(novelty),
+                        duplication_penalty=float(dup_penalty),
+                        lang_guess=str(ev["lang_guess"]),
+                    )
 
-                total_eval += 1
-                item = result["item"]
-                audio_bytes: bytes = result["audio_bytes"]
-                hyp_text: str = result["hyp_text"]
-                ev: dict[str, Any] = result["eval"]
-
-                best_text_sim, best_hyp_sim, best_sig_sim = max_sims(item.text, hyp_text, ev["signature"])
-                duplicate = (best_text_sim > 0.85) or (best_sig_sim > 0.8)
-                novelty = max(0.0, min(1.0, 1.0 - max(best_text_sim, best_sig_sim)))
-                dup_penalty = 1.0 if duplicate else 0.0
-
-                s_total = score_total(
-                    cer=float(ev["cer"]),
-                    wer=float(ev["wer"]),
-                    critical=float(ev["critical_error_score"]),
-                    novelty=float(novelty),
-                    duplication_penalty=float(dup_penalty),
-                    lang_guess=str(ev["lang_guess"]),
-                )
-
-                accepted = _is_accepted(
-                    plausibility=float(ev["plausibility"]),
-                    cer=float(ev["cer"]),
-                    wer=float(ev["wer"]),
-                    critical=float(ev["critical_error_score"]),
-                    lang_guess=str(ev["lang_guess"]),
-                    thresholds=thresholds,
-                )
-
-                status = "rejected"
-                if accepted and not duplicate:
-                    status = "accepted"
-                elif accepted and duplicate:
-                    status = "duplicate"
-                else:
-                    if float(ev["plausibility"]) >= float(thresholds["min_plausibility"]) and 40.0 <= s_total <= 60.0:
-                        status = "candidate"
-
-                if status == "accepted" and kimi_cli is not None:
-                    same = await asyncio.to_thread(kimi_cli.semantic_equivalent, ev["ref_eval"], ev["hyp_eval"])
-                    if same is True:
-                        status = "rejected"
-
-                if status == "accepted" and kimi_cli is not None and existing_patterns:
-                    novel = await asyncio.to_thread(
-                        kimi_cli.is_novel,
-                        ref_text=ev["ref_eval"],
-                        hyp_text=ev["hyp_eval"],
-                        existing_patterns=existing_patterns,
-                        max_patterns=kimi_max_patterns,
+                    status = case_status(
+                        plausibility=float(ev["plausibility"]),
+                        cer=float(ev["cer"]),
+                        wer=float(ev["wer"]),
+                        critical=float(ev["critical_error_score"]),
+                        lang_guess=str(ev["lang_guess"]),
+                        duplicate=duplicate,
+                        s_total=s_total,
+                        thresholds=thresholds,
                     )
-                    if novel is False:
-                        status = "duplicate"
-
-                case_id = str(uuid.uuid4())
-                duration_sec = _wav_duration_sec(audio_bytes)
-
-                audio_path = None
-                if status in {"accepted", "candidate", "duplicate"}:
-                    wav_path = artifacts_dir / "audio" / f"{case_id}.wav"
-                    wav_path.write_bytes(audio_bytes)
-                    audio_path = str(wav_path)
-
-                row = {
-                    "id": case_id,
-                    "created_at": _now_iso(),
-                    "seed_id": item.seed_id,
-                    "mutation_trace": item.mutation_trace,
-                    "ref_text": item.text,
-                    "hyp_text": hyp_text,
-                    "audio_path_wav": audio_path,
-                    "audio_path_mp3": None,
-                    "duration_sec": duration_sec,
-                    "lang_guess": ev["lang_guess"],
-                    "cer": float(ev["cer"]),
-                    "wer": float(ev["wer"]),
-                    "len_ratio": float(ev["len_ratio"]),
-                    "critical_error_score": float(ev["critical_error_score"]),
-                    "score_total": float(s_total),
-                    "tags": json.dumps(ev["tags"], ensure_ascii=False),
-                    "signature": ev["signature_json"],
-                    "cluster_id": ev["cluster_id"],
-                    "llm_summary": ev["summary"],
-                    "status": status,
-                }
-                db.upsert_case(row)
-
-                if status == "accepted":
-                    accepted_new += 1
-                    accepted_cases.append(
-                        {
+
+                    if status == "accepted" and kimi_cli is not None:
+                        same = await asyncio.to_thread(kimi_cli.semantic_equivalent, ev["ref_eval"], ev["hyp_eval"])
+                        if same is True:
+                            status = "rejected"
+
+                    if status == "accepted" and kimi_cli is not None and existing_patterns:
+                        novel = await asyncio.to_thread(
+                            kimi_cli.is_novel,
+                            ref_text=ev["ref_eval"],
+                            hyp_text=ev["hyp_eval"],
+                            existing_patterns=existing_patterns,
+                            max_patterns=kimi_max_patterns,
+                        )
+                        if novel is False:
+                            status = "duplicate"
+
+                    case_id = str(uuid.uuid4())
+                    duration_sec = _wav_duration_sec(audio_bytes)
+
+                    audio_path = None
+                    if status in {"accepted", "candidate", "duplicate"}:
+                        wav_path = artifacts_dir / "audio" / f"{case_id}.wav"
+                        wav_path.write_bytes(audio_bytes)
+                        audio_path = str(wav_path)
+
+                    row = {
+                        "id": case_id,
+                        "created_at": _now_iso(),
+                        "seed_id": item.seed_id,
+                        "mutation_trace": item.mutation_trace,
+                        "ref_text": item.text,
+                        "hyp_text": hyp_text,
+                        "audio_path_wav": audio_path,
+                        "audio_path_mp3": None,
+                        "duration_sec": duration_sec,
+                        "lang_guess": ev["lang_guess"],
+                        "cer": float(ev["cer"]),
+                        "wer": float(ev["wer"]),
+                        "len_ratio": float(ev["len_ratio"]),
+                        "critical_error_score": float(ev["critical_error_score"]),
+                        "score_total": float(s_total),
+                        "tags": json.dumps(ev["tags"], ensure_ascii=False),
+                        "signature": ev["signature_json"],
+                        "cluster_id": ev["cluster_id"],
+                        "llm_summary": ev["summary"],
+                        "status": status,
+                        "novelty": None if ev["tier"] == 1 else float(novelty),
+                        "is_duplicate": None if ev["tier"] == 1 else int(duplicate),
+                        **ev["metrics"],
+                    }
+                    writer.upsert_case(row)
+
+                    if status == "accepted":
+                        accepted_new += 1
+                        accepted_case = {
                             "id": case_id,
                             "ref_text": item.text,
                             "hyp_text": hyp_text,
@@ -544,59 +730,64 @@ async def _run_search_async(
                             "cluster_id": ev["cluster_id"],
                             "score_total": float(s_total),
                         }
-                    )
-                    existing_patterns = build_pattern_lines()
-                    line = (
-                        f"[ACCEPT] score={s_total:.1f} cer={float(ev['cer']):.2f} wer={float(ev['wer']):.2f} "
-                        f"crit={float(ev['critical_error_score']):.2f} tags={','.join(ev['tags'])} id={case_id}"
-                    )
-                    print(line)
-                    log_f.write(line + "\n")
-                    log_f.write(f"  ref: {item.text}\n  hyp: {hyp_text}\n")
-
-                if mutate and status == "accepted" and novelty >= 0.5 and item.depth < max_depth:
-                    allow_expand = s_total >= 60.0
-                    if not allow_expand and expand_low_score_polyphone and ("polyphone" in ev["tags"] or "guwen" in ev["tags"]):
-                        allow_expand = True
-                    if allow_expand:
-                        for m in mutate_all(item.text, item.tags, rng):
-                            enqueue(
-                                QueueItem(
-                                    text=m.text,
-                                    seed_id=item.seed_id,
-                                    tags=tuple(sorted(set(item.tags) | set(m.tags))),
-                                    mutation_trace=m.mutation_trace,
-                                    depth=item.depth + 1,
-                                )
-                            )
-
-                if llm and item.depth < max_depth and float(ev["plausibility"]) >= float(thresholds["min_plausibility"]):
-                    if 40.0 <= s_total <= 60.0:
-                        prompt = _llm_prompt(item.text, hyp_text, ev["tags"], _diff_hint(ev["top_subs"]))
-                        try:
-                            j = await asyncio.to_thread(llm.generate_json, prompt, _LLM_SCHEMA, temperature=0.7)
-                        except Exception as e:
-                            print(f"[LLM ERROR] {type(e).__name__}: {e}")
-                            j = {}
-                        cands = j.get("candidates") if isinstance(j, dict) else None
-                        if isinstance(cands, list):
-                            for i, c in enumerate(cands[:12]):
-                                if not isinstance(c, dict):
-                                    continue
-                                txt = str(c.get("text", "")).strip()
-                                if not txt:
-                                    continue
+                        accepted_cases.append(accepted_case)
+                        compared.append(_compared_case(accepted_case))
+                        local_ids.add(case_id)
+                        if global_index is not None:
+                            global_index.append([accepted_case])
+                        existing_patterns = build_pattern_lines()
+                        line = (
+                            f"[ACCEPT] score={s_total:.1f} cer={float(ev['cer']):.2f} wer={float(ev['wer']):.2f} "
+                            f"crit={float(ev['critical_error_score']):.2f} tags={','.join(ev['tags'])} id={case_id}"
+                        )
+                        print(line)
+                        log_f.write(line + "\n")
+                        log_f.write(f"  ref: {item.text}\n  hyp: {hyp_text}\n")
+
+                    if mutate and status == "accepted" and novelty >= 0.5 and item.depth < max_depth:
+                        allow_expand = s_total >= 60.0
+                        if not allow_expand and expand_low_score_polyphone and ("polyphone" in ev["tags"] or "guwen" in ev["tags"]):
+                            allow_expand = True
+                        if allow_expand:
+                            for m in mutate_all(item.text, item.tags, rng):
                                 enqueue(
                                     QueueItem(
-                                        text=txt,
+                                        text=m.text,
                                         seed_id=item.seed_id,
-                                        tags=tuple(ev["tags"]),
-                                        mutation_trace=f"llm:candidate_{i+1:02d}",
+                                        tags=tuple(sorted(set(item.tags) | set(m.tags))),
+                                        mutation_trace=m.mutation_trace,
                                         depth=item.depth + 1,
                                     )
                                 )
 
-            if total_eval and (total_eval % 50 == 0):
+                    if llm and item.depth < max_depth and float(ev["plausibility"]) >= float(thresholds["min_plausibility"]):
+                        if 40.0 <= s_total <= 60.0:
+                            prompt = _llm_prompt(item.text, hyp_text, ev["tags"], _diff_hint(ev["top_subs"]))
+                            try:
+                                j = await asyncio.to_thread(llm.generate_json, prompt, _LLM_SCHEMA, temperature=0.7)
+                            except Exception as e:
+                                print(f"[LLM ERROR] {type(e).__name__}: {e}")
+                                j = {}
+                            cands = j.get("candidates") if isinstance(j, dict) else None
+                            if isinstance(cands, list):
+                                for i, c in enumerate(cands[:12]):
+                                    if not isinstance(c, dict):
+                                        continue
+                                    txt = str(c.get("text", "")).strip()
+                                    if not txt:
+                                        continue
+                                    enqueue(
+                                        QueueItem(
+                                            text=txt,
+                                            seed_id=item.seed_id,
+                                            tags=tuple(ev["tags"]),
+                                            mutation_trace=f"llm:candidate_{i+1:02d}",
+                                            depth=item.depth + 1,
+                                        )
+                                    )
+
+            if total_eval >= next_progress:
+                next_progress = (total_eval // 50 + 1) * 50
                 counts = db.count_by_status()
                 print(
                     f"[PROGRESS] eval={total_eval}/{budget_total_eval} accepted_new={accepted_new}/{budget_accepted} "
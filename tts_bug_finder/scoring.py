@@ -6,16 +6,17 @@ import math
 from typing import Any
 
 from .dedupe import signature_to_json
-from .metrics import Alignment, align_tokens
-from .text_utils import (
-    canonicalize_number_token,
-    extract_negation_markers,
-    extract_number_tokens,
-    guess_language,
-    plausibility_rule_score,
-    tokenize_cer,
-    tokenize_wer,
+from .metrics import (
+    BATCH_MIN_PAIRS,
+    Alignment,
+    _get_numpy,
+    align_tokens,
+    batch_edit_distance,
+    bounded_edit_distance,
+    edit_distance,
+    intern_pairs,
 )
+from .text_utils import TextView, plausibility_rule_score, text_view
 from .zh_normalize import normalize_for_eval
 
 
@@ -23,68 +24,95 @@ def clamp(v: float, lo: float = 0.0, hi: float = 1.0) -> float:
     return max(lo, min(hi, v))
 
 
-def plausibility_score(text: str, llm_score: float | None = None) -> float:
+def plausibility_score(text: str | TextView, llm_score: float | None = None) -> float:
     rule = plausibility_rule_score(text)
     if llm_score is None:
         return rule
     return clamp(0.7 * rule + 0.3 * clamp(llm_score))
 
 
-def compute_alignment(ref: str, hyp: str, lang_guess: str) -> tuple[Alignment, float, float]:
+def compute_alignment(ref: str | TextView, hyp: str | TextView, lang_guess: str) -> tuple[Alignment, float, float]:
+    ref = text_view(ref)
+    hyp = text_view(hyp)
     if lang_guess == "en":
-        a = tokenize_wer(ref)
-        b = tokenize_wer(hyp)
+        a = ref.wer_tokens
+        b = hyp.wer_tokens
         ali = align_tokens(a, b)
         wer = ali.distance / max(1, len(a))
         cer = 0.0
         return ali, cer, wer
 
-    a = tokenize_cer(ref)
-    b = tokenize_cer(hyp)
+    a = ref.cer_tokens
+    b = hyp.cer_tokens
     ali = align_tokens(a, b)
     cer = ali.distance / max(1, len(a))
     wer = 0.0
     return ali, cer, wer
 
 
-def repetition_score(hyp: str) -> float:
-    s = "".join(ch for ch in hyp if not ch.isspace())
-    if len(s) < 25:
-        return 0.0
-    n = 5
-    counts: dict[str, int] = {}
-    for i in range(0, len(s) - n + 1):
-        gram = s[i : i + n]
-        counts[gram] = counts.get(gram, 0) + 1
-    max_count = max(counts.values(), default=1)
-    if max_count >= 4:
-        return 1.0
-    if max_count == 3:
-        return 0.8
-    if max_count == 2:
-        return 0.4
-    return 0.0
+# A repeated span at least this long covering at least LONG_LOOP_COVERAGE of the hyp
+# counts as a loop even when it only occurs twice.
+LONG_LOOP_MIN_LEN = 15
+LONG_LOOP_COVERAGE = 0.5
+
 
+def repetition_score(hyp: str | TextView, ref: str | TextView | None = None) -> float:
+    """Loop/stutter score from the hyp's repetition stats.
 
-def numbers_mismatch_score(ref: str, hyp: str) -> tuple[float, list[str], list[str]]:
-    ref_tokens = extract_number_tokens(ref)
-    hyp_tokens = extract_number_tokens(hyp)
+    The max 5-gram count drives the score as before; a long repeated span covering
+    most of the hyp is also a loop, unless `ref` itself repeats that span.
+    """
+    stats = text_view(hyp).repetition
+    if stats.length < 25:
+        return 0.0
+    score = 0.0
+    if stats.max_count >= 4:
+        score = 1.0
+    elif stats.max_count == 3:
+        score = 0.8
+    elif stats.max_count == 2:
+        score = 0.4
+    if (
+        score < 0.8
+        and len(stats.longest_repeat) >= LONG_LOOP_MIN_LEN
+        and stats.loop_coverage >= LONG_LOOP_COVERAGE
+        and (ref is None or "".join(text_view(ref).text.split()).count(stats.longest_repeat) < 2)
+    ):
+        score = 0.8
+    return score
+
+
+# (raw tokens, canonical tokens) for ref and hyp.
+NumberTokens = tuple[tuple[list[str], list[str]], tuple[list[str], list[str]]]
+
+
+def canonical_number_tokens(text: str | TextView) -> tuple[list[str], list[str]]:
+    view = text_view(text)
+    return view.number_tokens, view.canonical_numbers
+
+
+def numbers_mismatch_score(
+    ref: str | TextView,
+    hyp: str | TextView,
+    *,
+    numbers: NumberTokens | None = None,
+    distance: int | None = None,
+) -> tuple[float, list[str], list[str]]:
+    """`numbers`/`distance` let batched callers pass precomputed number tokens and edit distance."""
+    (ref_tokens, a), (hyp_tokens, b) = numbers or (canonical_number_tokens(ref), canonical_number_tokens(hyp))
     if not ref_tokens and not hyp_tokens:
         return 0.0, ref_tokens, hyp_tokens
     if (not ref_tokens) != (not hyp_tokens):
         return 1.0, ref_tokens, hyp_tokens
 
-    a = [canonicalize_number_token(t) for t in ref_tokens]
-    b = [canonicalize_number_token(t) for t in hyp_tokens]
-    ali = align_tokens(a, b)
-    dist = ali.distance
+    dist = edit_distance(a, b) if distance is None else distance
     denom = max(1, max(len(a), len(b)))
     return clamp(dist / denom), ref_tokens, hyp_tokens
 
 
-def negation_flip_score(ref: str, hyp: str) -> tuple[float, set[str], set[str]]:
-    a = extract_negation_markers(ref)
-    b = extract_negation_markers(hyp)
+def negation_flip_score(ref: str | TextView, hyp: str | TextView) -> tuple[float, frozenset[str], frozenset[str]]:
+    a = text_view(ref).negations
+    b = text_view(hyp).negations
     if not a and not b:
         return 0.0, a, b
     if a == b:
@@ -92,7 +120,9 @@ def negation_flip_score(ref: str, hyp: str) -> tuple[float, set[str], set[str]]:
     return 1.0, a, b
 
 
-def truncation_score(len_ratio: float, hyp: str) -> float:
+def truncation_score(len_ratio: float, hyp: str | TextView) -> float:
+    if isinstance(hyp, TextView):
+        hyp = hyp.text
     if not hyp.strip():
         return 1.0
     if len_ratio >= 0.9:
@@ -102,11 +132,21 @@ def truncation_score(len_ratio: float, hyp: str) -> float:
     return clamp((0.9 - len_ratio) / 0.3)
 
 
-def critical_error_components(ref: str, hyp: str, len_ratio: float) -> dict[str, Any]:
-    num_score, ref_nums, hyp_nums = numbers_mismatch_score(ref, hyp)
+def critical_error_components(
+    ref: str | TextView,
+    hyp: str | TextView,
+    len_ratio: float,
+    *,
+    numbers: NumberTokens | None = None,
+    numbers_distance: int | None = None,
+) -> dict[str, Any]:
+    ref = text_view(ref)
+    hyp = text_view(hyp)
+    num_score, ref_nums, hyp_nums = numbers_mismatch_score(ref, hyp, numbers=numbers, distance=numbers_distance)
     neg_score, ref_neg, hyp_neg = negation_flip_score(ref, hyp)
     trunc_score = truncation_score(len_ratio, hyp)
-    rep_score = repetition_score(hyp)
+    rep_score = repetition_score(hyp, ref)
+    rep = hyp.repetition
     critical = clamp(max(num_score, neg_score, trunc_score, rep_score))
     return {
         "critical": critical,
@@ -118,6 +158,21 @@ def critical_error_components(ref: str, hyp: str, len_ratio: float) -> dict[str,
         "hyp_negations": sorted(hyp_neg),
         "truncation": trunc_score,
         "repetition": rep_score,
+        "repeat_max_count": rep.max_count,
+        "longest_repeat": rep.longest_repeat,
+        "longest_repeat_count": rep.longest_count,
+        "loop_coverage": rep.loop_coverage,
+    }
+
+
+def metric_columns(plausibility: float, critical_parts: dict[str, Any]) -> dict[str, float]:
+    """Per-case metrics stored next to `cer`/`wer`/`critical_error_score` (for `sweep`)."""
+    return {
+        "plausibility": float(plausibility),
+        "crit_numbers": float(critical_parts.get("numbers_mismatch", 0.0)),
+        "crit_negation": 1.0 if critical_parts.get("negation_flip") else 0.0,
+        "crit_truncation": float(critical_parts.get("truncation", 0.0)),
+        "crit_repetition": float(critical_parts.get("repetition", 0.0)),
     }
 
 
@@ -188,6 +243,72 @@ def score_total(
     return clamp((base + critical_part + bonus - penalty) / 100.0, 0.0, 1.0) * 100.0
 
 
+def is_accepted(
+    *,
+    plausibility: float,
+    cer: float,
+    wer: float,
+    critical: float,
+    lang_guess: str,
+    thresholds: dict[str, float],
+) -> bool:
+    if plausibility < float(thresholds["min_plausibility"]):
+        return False
+    if critical >= float(thresholds["min_critical"]):
+        return True
+    if lang_guess == "en":
+        return wer >= float(thresholds["min_wer"])
+    return cer >= float(thresholds["min_cer"])
+
+
+def case_status(
+    *,
+    plausibility: float,
+    cer: float,
+    wer: float,
+    critical: float,
+    lang_guess: str,
+    duplicate: bool,
+    s_total: float,
+    thresholds: dict[str, float],
+) -> str:
+    """accepted / duplicate / candidate / rejected, before any external (kimi) checks."""
+    accepted = is_accepted(
+        plausibility=plausibility,
+        cer=cer,
+        wer=wer,
+        critical=critical,
+        lang_guess=lang_guess,
+        thresholds=thresholds,
+    )
+    if accepted:
+        return "duplicate" if duplicate else "accepted"
+    if plausibility >= float(thresholds["min_plausibility"]) and 40.0 <= s_total <= 60.0:
+        return "candidate"
+    return "rejected"
+
+
+def min_error_to_keep(
+    *,
+    plausibility: float,
+    critical: float,
+    lang_guess: str,
+    thresholds: dict[str, float],
+) -> float | None:
+    """Smallest CER (WER for English) at which a result can still end up accepted, candidate or duplicate.
+
+    None when it is rejected whatever its error rate (implausible text).  Candidates need
+    `score_total >= 40`, and `score_total` is at most `60 * err + 25 * critical + 10`
+    (full novelty bonus, no duplication penalty).
+    """
+    if plausibility < float(thresholds["min_plausibility"]):
+        return None
+    if critical >= float(thresholds["min_critical"]):
+        return 0.0
+    min_err = float(thresholds["min_wer"] if lang_guess == "en" else thresholds["min_cer"])
+    return max(0.0, min(min_err, (30.0 - 25.0 * clamp(critical)) / 60.0))
+
+
 def summarize_case(
     *,
     cer: float,
@@ -219,30 +340,146 @@ def evaluate_pair(
     base_tags: tuple[str, ...] = (),
     llm_plausibility: float | None = None,
     t2s: bool = True,
+    thresholds: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    return evaluate_pairs(
+        [
+            {
+                "ref_text": ref_text,
+                "hyp_text": hyp_text,
+                "base_tags": base_tags,
+                "llm_plausibility": llm_plausibility,
+            }
+        ],
+        t2s=t2s,
+        thresholds=thresholds,
+    )[0]
+
+
+def evaluate_pairs(
+    pairs: list[dict[str, Any]],
+    *,
+    t2s: bool = True,
+    thresholds: dict[str, float] | None = None,
+) -> list[dict[str, Any]]:
+    """`evaluate_pair` for several pending pairs (dicts of its keyword arguments).
+
+    The CER/WER edit distances of all pairs, and the distances of their number tokens,
+    go through one `batch_edit_distance` call (vectorized with NumPy) instead of one DP
+    per pair; opcodes are only computed for the pairs that need them.  Tiered batches
+    too small for the vectorized path (or without NumPy) skip the exact distance and
+    settle the tier check with `bounded_edit_distance` instead.
+
+    With `thresholds`, evaluation is tiered: tier 1 (error rate, critical errors,
+    plausibility) decides whether the result can still be kept at all, and only those
+    that can get tier 2 (opcodes, top substitutions, signature, cluster id, summary).
+    Tier-1 results have `tier == 1` and None for the tier-2 fields; their cer/wer are
+    still exact.
+    """
+    prepared: list[dict[str, Any]] = []
+    for p in pairs:
+        ref_view = TextView(normalize_for_eval(p["ref_text"], t2s=t2s))
+        hyp_view = TextView(normalize_for_eval(p["hyp_text"], t2s=t2s))
+        lang = ref_view.language
+        prepared.append(
+            {
+                "ref_view": ref_view,
+                "hyp_view": hyp_view,
+                "ref_toks": ref_view.tokens(lang),
+                "hyp_toks": hyp_view.tokens(lang),
+                "numbers": (canonical_number_tokens(ref_view), canonical_number_tokens(hyp_view)),
+            }
+        )
+
+    bounded = thresholds is not None and (len(prepared) < BATCH_MIN_PAIRS or not _get_numpy())
+    num_idx = [k for k, pr in enumerate(prepared) if pr["numbers"][0][1] and pr["numbers"][1][1]]
+    a_ids, b_ids = intern_pairs(
+        ([] if bounded else [(pr["ref_toks"], pr["hyp_toks"]) for pr in prepared])
+        + [(prepared[k]["numbers"][0][1], prepared[k]["numbers"][1][1]) for k in num_idx]
+    )
+    dists = batch_edit_distance(a_ids, b_ids)
+    n_main = 0 if bounded else len(prepared)
+    numbers_distance: dict[int, int] = dict(zip(num_idx, dists[n_main:]))
+
+    return [
+        _evaluate_prepared(
+            ref_text=p["ref_text"],
+            base_tags=tuple(p.get("base_tags") or ()),
+            llm_plausibility=p.get("llm_plausibility"),
+            ref_view=pr["ref_view"],
+            hyp_view=pr["hyp_view"],
+            ref_toks=pr["ref_toks"],
+            hyp_toks=pr["hyp_toks"],
+            distance=None if bounded else dists[k],
+            numbers=pr["numbers"],
+            numbers_distance=numbers_distance.get(k),
+            thresholds=thresholds,
+        )
+        for k, (p, pr) in enumerate(zip(pairs, prepared))
+    ]
+
+
+def _error_rates(lang: str, distance: int, ref_toks: list[str]) -> tuple[float, float]:
+    err = distance / max(1, len(ref_toks))
+    return (0.0, err) if lang == "en" else (err, 0.0)
+
+
+def _evaluate_prepared(
+    *,
+    ref_text: str,
+    base_tags: tuple[str, ...],
+    llm_plausibility: float | None,
+    ref_view: TextView,
+    hyp_view: TextView,
+    ref_toks: list[str],
+    hyp_toks: list[str],
+    distance: int | None,
+    numbers: NumberTokens,
+    numbers_distance: int | None,
+    thresholds: dict[str, float] | None,
 ) -> dict[str, Any]:
-    ref_eval = normalize_for_eval(ref_text, t2s=t2s)
-    hyp_eval = normalize_for_eval(hyp_text, t2s=t2s)
-
-    lang = guess_language(ref_eval)
-    ali, cer, wer = compute_alignment(ref_eval, hyp_eval, lang)
-
-    if lang == "en":
-        ref_len = len(tokenize_wer(ref_eval))
-        hyp_len = len(tokenize_wer(hyp_eval))
-    else:
-        ref_len = len(tokenize_cer(ref_eval))
-        hyp_len = len(tokenize_cer(hyp_eval))
-    len_ratio = (hyp_len / max(1, ref_len)) if ref_len else 0.0
+    lang = ref_view.language
+    len_ratio = (len(hyp_toks) / max(1, len(ref_toks))) if ref_toks else 0.0
     plaus = plausibility_score(ref_text, llm_score=llm_plausibility)
-    crit_parts = critical_error_components(ref_eval, hyp_eval, len_ratio)
+    crit_parts = critical_error_components(
+        ref_view, hyp_view, len_ratio, numbers=numbers, numbers_distance=numbers_distance
+    )
     tags = build_tags(lang, base_tags, crit_parts)
 
-    if lang == "en":
-        ref_toks = tokenize_wer(ref_eval)
-        hyp_toks = tokenize_wer(hyp_eval)
-    else:
-        ref_toks = tokenize_cer(ref_eval)
-        hyp_toks = tokenize_cer(hyp_eval)
+    if thresholds is not None:
+        floor = min_error_to_keep(
+            plausibility=plaus, critical=float(crit_parts["critical"]), lang_guess=lang, thresholds=thresholds
+        )
+        # Distances below `k` are certainly under the floor (with a margin for float noise).
+        k = len(ref_toks) + len(hyp_toks) + 1 if floor is None else math.ceil(floor * max(1, len(ref_toks)) - 1e-6)
+        # Without a batched distance, stop the DP as soon as it is known to reach `k`;
+        # below `k` the bounded distance is exact.
+        below = distance if distance is not None else bounded_edit_distance(ref_toks, hyp_toks, k)
+        if below < k:
+            cer, wer = _error_rates(lang, below, ref_toks)
+            return {
+                "tier": 1,
+                "lang_guess": lang,
+                "alignment": None,
+                "cer": cer,
+                "wer": wer,
+                "len_ratio": len_ratio,
+                "plausibility": plaus,
+                "critical_parts": crit_parts,
+                "critical_error_score": float(crit_parts["critical"]),
+                "tags": tags,
+                "top_subs": [],
+                "signature": None,
+                "signature_json": None,
+                "cluster_id": None,
+                "summary": None,
+                "ref_eval": ref_view.text,
+                "hyp_eval": hyp_view.text,
+            }
+
+    # Opcodes only for results that can be kept.
+    ali = align_tokens(ref_toks, hyp_toks)
+    cer, wer = _error_rates(lang, ali.distance if distance is None else distance, ref_toks)
     subs = top_substitutions(ref_toks, hyp_toks, ali)
 
     signature = build_signature(
@@ -254,6 +491,7 @@ def evaluate_pair(
     cluster_id = cluster_id_from(tags, subs)
 
     return {
+        "tier": 2,
         "lang_guess": lang,
         "alignment": ali,
         "cer": cer,
@@ -268,6 +506,6 @@ def evaluate_pair(
         "signature_json": signature_to_json(signature),
         "cluster_id": cluster_id,
         "summary": summarize_case(cer=cer, wer=wer, critical_parts=crit_parts, lang_guess=lang),
-        "ref_eval": ref_eval,
-        "hyp_eval": hyp_eval,
+        "ref_eval": ref_view.text,
+        "hyp_eval": hyp_view.text,
     }
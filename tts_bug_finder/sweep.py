@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import pathlib
+import time
+from typing import Any
+
+from .db import BugDB
+from .metrics import _get_numpy
+
+THRESHOLD_KEYS = ("min_plausibility", "min_cer", "min_wer", "min_critical")
+
+
+def parse_grid(spec: str) -> list[float]:
+    """`0.3,0.35,0.4` or `start:stop:step` (stop inclusive) → sorted unique values."""
+    s = (spec or "").strip()
+    if ":" in s:
+        start, stop, step = (float(x) for x in s.split(":"))
+        if step <= 0:
+            raise ValueError(f"grid step must be positive: {spec!r}")
+        n = int(round((stop - start) / step)) + 1
+        values = [round(start + i * step, 10) for i in range(max(0, n))]
+    else:
+        values = [float(x) for x in s.split(",") if x.strip()]
+    if not values:
+        raise ValueError(f"empty grid: {spec!r}")
+    return sorted(set(values))
+
+
+def _level_sql(column: str, grid: list[float]) -> tuple[str, list[float]]:
+    """SQL for the number of grid values <= column (so `>= grid[i]` iff level > i)."""
+    return "(" + " + ".join(f"({column} >= ?)" for _ in grid) + ")", list(grid)
+
+
+def _load_groups(db_paths: list[pathlib.Path], grids: dict[str, list[float]]) -> tuple[list[tuple[int, int, int, int, str | None, int]], int]:
+    """Distinct (plausibility level, critical level, is_en, error level, cluster_id) with counts.
+
+    The grouping runs inside SQLite over the covering threshold index; rows from before
+    the metric columns existed (NULL plausibility) are only counted.
+    """
+    p_sql, p_args = _level_sql("plausibility", grids["min_plausibility"])
+    c_sql, c_args = _level_sql("critical_error_score", grids["min_critical"])
+    w_sql, w_args = _level_sql("wer", grids["min_wer"])
+    e_sql, e_args = _level_sql("cer", grids["min_cer"])
+    sql = (
+        f"SELECT {p_sql} AS p, {c_sql} AS c, lang_guess = 'en' AS en, "
+        f"CASE WHEN lang_guess = 'en' THEN {w_sql} ELSE {e_sql} END AS e, cluster_id, COUNT(*) AS n "
+        "FROM cases WHERE plausibility IS NOT NULL GROUP BY p, c, en, e, cluster_id"
+    )
+    args = p_args + c_args + w_args + e_args
+    groups: list[tuple[int, int, int, int, str | None, int]] = []
+    missing = 0
+    for db_path in db_paths:
+        with BugDB(db_path, readonly=True) as db:
+            for r in db.conn.execute(sql, args):
+                groups.append((int(r["p"]), int(r["c"]), int(r["en"] or 0), int(r["e"]), r["cluster_id"], int(r["n"])))
+            missing += int(db.conn.execute("SELECT COUNT(*) FROM cases WHERE plausibility IS NULL").fetchone()[0])
+    return groups, missing
+
+
+def _combos(grids: dict[str, list[float]]) -> list[tuple[int, int, int, int]]:
+    return list(
+        itertools.product(
+            range(len(grids["min_plausibility"])),
+            range(len(grids["min_cer"])),
+            range(len(grids["min_wer"])),
+            range(len(grids["min_critical"])),
+        )
+    )
+
+
+_EXTRACT_DTYPE = [
+    ("plausibility", "<f8"),
+    ("critical", "<f8"),
+    ("cer", "<f8"),
+    ("wer", "<f8"),
+    ("en", "u1"),
+    ("cluster", "<i4"),
+]
+
+
+def _db_stamp(db_path: pathlib.Path) -> list[list[int]]:
+    stamp: list[list[int]] = []
+    for p in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            st = p.stat()
+        except OSError:
+            stamp.append([0, 0])
+            continue
+        stamp.append([st.st_mtime_ns, st.st_size])
+    return stamp
+
+
+def _build_extract(np: Any, db_path: pathlib.Path, npy_path: pathlib.Path, meta_path: pathlib.Path) -> None:
+    clusters: dict[str, int] = {}
+    with BugDB(db_path, readonly=True) as db:
+        n = int(db.conn.execute("SELECT COUNT(*) FROM cases WHERE plausibility IS NOT NULL").fetchone()[0])
+        missing = int(db.conn.execute("SELECT COUNT(*) FROM cases WHERE plausibility IS NULL").fetchone()[0])
+        cur = db.conn.execute(
+            "SELECT plausibility, COALESCE(critical_error_score, 0), COALESCE(cer, 0), COALESCE(wer, 0), "
+            "lang_guess = 'en', cluster_id FROM cases WHERE plausibility IS NOT NULL"
+        )
+        cur.row_factory = None
+        arr = np.fromiter(
+            (
+                (p, c, e, w, en or 0, -1 if cl is None else clusters.setdefault(cl, len(clusters)))
+                for p, c, e, w, en, cl in cur
+            ),
+            dtype=_EXTRACT_DTYPE,
+            count=n,
+        )
+    stamp = _db_stamp(db_path)
+    tmp = npy_path.with_name(npy_path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, npy_path)
+    meta = {"stamp": stamp, "missing": missing, "clusters": list(clusters)}
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, meta_path)
+
+
+def load_extract(db_path: pathlib.Path) -> tuple[Any, dict[str, Any], bool]:
+    """Memory-mapped column extract of the threshold inputs of one DB (NumPy required).
+
+    Stored next to the DB as `<db>.sweep.npy` plus a JSON sidecar, and rebuilt when
+    the DB (or its WAL) changed since.  Returns (array, meta, rebuilt).
+    """
+    np = _get_numpy()
+    if not np:
+        raise RuntimeError("numpy is required for the column extract")
+    npy_path = db_path.with_name(db_path.name + ".sweep.npy")
+    meta_path = db_path.with_name(db_path.name + ".sweep.json")
+    rebuilt = False
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        fresh = meta.get("stamp") == _db_stamp(db_path) and npy_path.exists()
+    except (OSError, json.JSONDecodeError):
+        fresh = False
+    if not fresh:
+        _build_extract(np, db_path, npy_path, meta_path)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        rebuilt = True
+    return np.load(npy_path, mmap_mode="r"), meta, rebuilt
+
+
+def _count_numpy(
+    np: Any, db_paths: list[pathlib.Path], grids: dict[str, list[float]], combos: list[tuple[int, int, int, int]]
+) -> tuple[list[tuple[int, int, int]], int, int, int]:
+    """Returns (per-combo (kept, clusters, kept without cluster), cases, cases without metrics, extracts rebuilt)."""
+    g_p = np.array(grids["min_plausibility"])
+    g_c = np.array(grids["min_critical"])
+    g_e = np.array(grids["min_cer"])
+    g_w = np.array(grids["min_wer"])
+    n_c = len(g_c) + 1
+    n_e = max(len(g_e), len(g_w)) + 1
+    n_keys = (len(g_p) + 1) * n_c * 2 * n_e
+
+    cluster_index: dict[str, int] = {}  # only used to merge several DBs
+    keys_parts: list[Any] = []
+    cl_parts: list[Any] = []
+    total = missing = rebuilt = 0
+    for db_path in db_paths:
+        arr, meta, was_rebuilt = load_extract(db_path)
+        rebuilt += int(was_rebuilt)
+        missing += int(meta.get("missing") or 0)
+        total += len(arr)
+        en = arr["en"].astype(np.int64)
+        # Level = number of grid values <= the metric, so `metric >= grid[i]` iff level > i.
+        lp = np.searchsorted(g_p, arr["plausibility"], side="right")
+        lc = np.searchsorted(g_c, arr["critical"], side="right")
+        le = np.where(en == 1, np.searchsorted(g_w, arr["wer"], side="right"), np.searchsorted(g_e, arr["cer"], side="right"))
+        keys_parts.append(((lp * n_c + lc) * 2 + en) * n_e + le)
+        cl = np.asarray(arr["cluster"], dtype=np.int64)
+        if len(db_paths) > 1:
+            # Merge cluster ids across DBs by value (index -1 maps to the trailing -1).
+            remap = np.array([cluster_index.setdefault(c, len(cluster_index)) for c in meta["clusters"]] + [-1], dtype=np.int64)
+            cl = remap[cl]
+        cl_parts.append(cl)
+    keys = np.concatenate(keys_parts) if keys_parts else np.zeros(0, dtype=np.int64)
+    cl = np.concatenate(cl_parts) if cl_parts else np.zeros(0, dtype=np.int64)
+
+    key_counts = np.bincount(keys, minlength=n_keys)
+    unclustered_counts = np.bincount(keys[cl < 0], minlength=n_keys)
+    # Distinct (cluster, key) pairs, grouped by cluster: coverage is an any() per cluster.
+    pairs = np.unique(cl[cl >= 0] * n_keys + keys[cl >= 0])
+    pair_cluster = pairs // n_keys
+    pair_key = pairs % n_keys
+    starts = np.flatnonzero(np.r_[True, pair_cluster[1:] != pair_cluster[:-1]]) if pairs.size else None
+
+    k = np.arange(n_keys)
+    k_e = k % n_e
+    k_en = (k // n_e) % 2
+    k_c = (k // (n_e * 2)) % n_c
+    k_p = k // (n_e * 2 * n_c)
+    out: list[tuple[int, int, int]] = []
+    for a, ic, iw, b in combos:
+        # is_accepted: plausibility >= P and (critical >= C or err >= E), err being wer for en.
+        passing = (k_p > a) & ((k_c > b) | (k_e > np.where(k_en == 1, iw, ic)))
+        clusters = int(np.logical_or.reduceat(passing[pair_key], starts).sum()) if starts is not None else 0
+        out.append((int(key_counts[passing].sum()), clusters, int(unclustered_counts[passing].sum())))
+    return out, total, missing, rebuilt
+
+
+def _count_python(
+    groups: list[tuple[int, int, int, int, str | None, int]], combos: list[tuple[int, int, int, int]]
+) -> list[tuple[int, int, int]]:
+    out: list[tuple[int, int, int]] = []
+    for a, ic, iw, b in combos:
+        kept = unclustered = 0
+        clusters: set[str] = set()
+        for p, c, en, e, cluster_id, n in groups:
+            if p > a and (c > b or e > (iw if en else ic)):
+                kept += n
+                if cluster_id is None:
+                    unclustered += n
+                else:
+                    clusters.add(cluster_id)
+        out.append((kept, len(clusters), unclustered))
+    return out
+
+
+def sweep(*, db_paths: list[pathlib.Path], grids: dict[str, list[float]]) -> list[dict[str, Any]]:
+    """Kept-case counts and cluster coverage for every combination of threshold grids.
+
+    Uses the stored per-case metrics, so no case is re-evaluated: one grouped SQL scan
+    per DB, then each combination is a pass over the (small) group table.  A case is
+    kept when it passes `is_accepted`, whatever its duplicate status; `clusters` counts
+    distinct `cluster_id` among kept cases.  Rows rejected at tier 1 by the runner (or
+    rescore) have no cluster: looser thresholds keep them, but they cannot add to
+    `clusters`, so they are counted in `unclustered` instead.
+    """
+    t0 = time.monotonic()
+    grids = {k: sorted(grids[k]) for k in THRESHOLD_KEYS}
+    combos = _combos(grids)
+    np = _get_numpy()
+    rebuilt = 0
+    if np:
+        counts, total, missing, rebuilt = _count_numpy(np, db_paths, grids, combos)
+    else:
+        groups, missing = _load_groups(db_paths, grids)
+        counts = _count_python(groups, combos)
+        total = sum(g[5] for g in groups)
+
+    rows: list[dict[str, Any]] = []
+    for (a, ic, iw, b), (kept, clusters, unclustered) in zip(combos, counts):
+        rows.append(
+            {
+                "min_plausibility": grids["min_plausibility"][a],
+                "min_cer": grids["min_cer"][ic],
+                "min_wer": grids["min_wer"][iw],
+                "min_critical": grids["min_critical"][b],
+                "kept": kept,
+                "clusters": clusters,
+                "unclustered": unclustered,
+            }
+        )
+
+    print(f"{'min_plaus':>9} {'min_cer':>7} {'min_wer':>7} {'min_crit':>8} {'kept':>9} {'clusters':>9} {'unclustered':>11}")
+    for r in rows:
+        print(
+            f"{r['min_plausibility']:>9.3g} {r['min_cer']:>7.3g} {r['min_wer']:>7.3g} {r['min_critical']:>8.3g} "
+            f"{r['kept']:>9} {r['clusters']:>9} {r['unclustered']:>11}"
+        )
+    print(f"Swept {len(rows)} combinations over {total} cases in {time.monotonic() - t0:.2f}s")
+    if rebuilt:
+        print(f"  note: rebuilt {rebuilt} column extract(s); later sweeps reuse them until the DB changes")
+    if any(r["unclustered"] for r in rows):
+        print("  note: `unclustered` kept cases were rejected at tier 1 when scored, so they have no cluster_id")
+    if missing:
+        print(f"  note: {missing} cases have no stored metrics (run `rescore` to backfill them)")
+    return rows
@@ -5,6 +5,8 @@ import re
 import unicodedata
 from collections import Counter
 
+from .repetition import RepetitionStats, analyze_repetition
+
 
 def normalize_nfkc(text: str) -> str:
     return unicodedata.normalize("NFKC", text)
@@ -26,14 +28,18 @@ def normalize_for_similarity_no_punct(text: str) -> str:
     return text
 
 
-def guess_language(text: str) -> str:
-    text = normalize_nfkc(text)
-    if not text.strip():
+def _char_class_counts(text_nfkc: str) -> tuple[int, int, int, int]:
+    """(cjk, latin, spaces, length) of an NFKC-normalized string."""
+    cjk = sum(1 for ch in text_nfkc if "\u4e00" <= ch <= "\u9fff")
+    latin = sum(1 for ch in text_nfkc if ("A" <= ch <= "Z") or ("a" <= ch <= "z"))
+    return cjk, latin, text_nfkc.count(" "), len(text_nfkc)
+
+
+def _language_from_counts(text_nfkc: str, counts: tuple[int, int, int, int]) -> str:
+    if not text_nfkc.strip():
         return "mixed"
-    cjk = sum(1 for ch in text if "\u4e00" <= ch <= "\u9fff")
-    latin = sum(1 for ch in text if ("A" <= ch <= "Z") or ("a" <= ch <= "z"))
-    spaces = text.count(" ")
-    total = max(1, len(text))
+    cjk, latin, spaces, length = counts
+    total = max(1, length)
     cjk_ratio = cjk / total
     latin_ratio = latin / total
     if cjk_ratio >= 0.6 and spaces <= 2:
@@ -43,8 +49,16 @@ def guess_language(text: str) -> str:
     return "mixed"
 
 
-def tokenize_cer(text: str) -> list[str]:
+def guess_language(text: str) -> str:
     text = normalize_nfkc(text)
+    return _language_from_counts(text, _char_class_counts(text))
+
+
+def tokenize_cer(text: str) -> list[str]:
+    return _tokenize_cer_nfkc(normalize_nfkc(text))
+
+
+def _tokenize_cer_nfkc(text: str) -> list[str]:
     text = re.sub(r"\s+", "", text)
     chars = list(text)
     always_keep = {"@", "#", "%", "+", "=", "&"}
@@ -67,7 +81,10 @@ def tokenize_cer(text: str) -> list[str]:
 
 
 def tokenize_wer(text: str) -> list[str]:
-    text = normalize_nfkc(text)
+    return _tokenize_wer_nfkc(normalize_nfkc(text))
+
+
+def _tokenize_wer_nfkc(text: str) -> list[str]:
     text = collapse_whitespace(text)
     if not text:
         return []
@@ -98,26 +115,49 @@ _RE_NUMBER = re.compile(r"\b[+-]?\d{1,3}(?:,\d{3})*(?:\.\d+)?%?\b|\b[+-]?\d+(?:\
 _RE_PERCENT_ZH = re.compile(r"百分之[零一二三四五六七八九十百千万亿两点幺〇]+")
 _RE_ZH_NUMBER = re.compile(r"[零一二三四五六七八九十百千万亿两点幺〇]+")
 
+# Order matters: tokens found at the same position are reported in this order.
+_NUMBER_REGEXES = (_RE_IPV4, _RE_VERSION, _RE_HEX, _RE_RATIO, _RE_SCI, _RE_NUMBER, _RE_PERCENT_ZH, _RE_ZH_NUMBER)
+_NUMBER_GROUPS = tuple(f"n{k}" for k in range(len(_NUMBER_REGEXES)))
+
+
+def _compile_number_scan() -> re.Pattern[str]:
+    # Every regex is tried as a capturing lookahead at each position, so one
+    # `finditer` reports all (possibly overlapping) candidates.  The leading class
+    # holds every character a number token can start with and lets the regex
+    # engine skip other positions without entering the alternatives.
+    parts = []
+    for name, regex in zip(_NUMBER_GROUPS, _NUMBER_REGEXES):
+        inner = regex.pattern if not regex.flags & re.IGNORECASE else f"(?i:{regex.pattern})"
+        parts.append(f"(?:(?=(?P<{name}>{inner}))|)")
+    return re.compile(r"(?=[\d+\-v零一二三四五六七八九十百千万亿两点幺〇])" + "".join(parts))
+
+
+_RE_NUMBER_SCAN = _compile_number_scan()
+
 
 def extract_number_tokens(text: str) -> list[str]:
-    text = normalize_nfkc(text)
-    tokens: list[tuple[int, str]] = []
+    return _number_tokens_nfkc(normalize_nfkc(text))
 
-    for regex in (_RE_IPV4, _RE_VERSION, _RE_HEX, _RE_RATIO, _RE_SCI, _RE_NUMBER, _RE_PERCENT_ZH, _RE_ZH_NUMBER):
-        for m in regex.finditer(text):
-            tokens.append((m.start(), m.group(0)))
 
-    tokens.sort(key=lambda x: x[0])
-    merged: list[str] = []
+def _number_tokens_nfkc(text: str) -> list[str]:
+    tokens: list[str] = []
+    # Per-regex end of the last accepted match: emulates each regex's own
+    # non-overlapping `finditer` while scanning all of them in one pass.
+    next_allowed = [0] * len(_NUMBER_GROUPS)
     last_start = -10
     last_tok = ""
-    for start, tok in tokens:
-        if merged and start == last_start and tok == last_tok:
-            continue
-        merged.append(tok)
-        last_start = start
-        last_tok = tok
-    return merged
+    for m in _RE_NUMBER_SCAN.finditer(text):
+        start = m.start()
+        for k, tok in enumerate(m.group(*_NUMBER_GROUPS)):
+            if tok is None or start < next_allowed[k]:
+                continue
+            next_allowed[k] = start + len(tok)
+            if tokens and start == last_start and tok == last_tok:
+                continue
+            tokens.append(tok)
+            last_start = start
+            last_tok = tok
+    return tokens
 
 
 _ZH_DIGITS = {
@@ -272,18 +312,175 @@ _NEG_EN = ["not", "no", "never", "none", "cannot", "can't", "don't", "doesn't",
 
 
 def extract_negation_markers(text: str) -> set[str]:
-    text_nfkc = normalize_nfkc(text)
-    found: set[str] = set()
-    for t in _NEG_ZH:
-        if t in text_nfkc:
-            found.add(t)
+    return _negation_markers_nfkc(normalize_nfkc(text))
+
+
+def _build_negation_automaton(markers: list[str]) -> tuple[list[dict[str, int]], list[tuple[str, ...]]]:
+    """Aho-Corasick automaton for `markers`, flattened to a DFA.
+
+    Returns (delta, out): `delta[state][ch]` is the next state (characters not in the
+    dict go back to the root) and `out[state]` lists the markers ending there.
+    """
+    goto: list[dict[str, int]] = [{}]
+    out: list[list[str]] = [[]]
+    for marker in markers:
+        state = 0
+        for ch in marker:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                out.append([])
+            state = nxt
+        out[state].append(marker)
+
+    fail = [0] * len(goto)
+    delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+    queue = list(goto[0].values())
+    while queue:
+        next_queue: list[int] = []
+        for state in queue:
+            out[state].extend(out[fail[state]])
+            # Inherit the failure state's transitions, then override with our own goto edges.
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                next_queue.append(nxt)
+        queue = next_queue
+    return delta, [tuple(o) for o in out]
+
+
+_NEG_DELTA, _NEG_OUT = _build_negation_automaton(_NEG_ZH + _NEG_EN)
+_NEG_EN_SET = frozenset(_NEG_EN)
+
+
+def _is_ascii_letter(ch: str) -> bool:
+    return ("A" <= ch <= "Z") or ("a" <= ch <= "z")
+
+
+def _negation_markers_nfkc(text_nfkc: str) -> set[str]:
     low = text_nfkc.lower()
-    for w in _NEG_EN:
-        if re.search(rf"(?<![A-Za-z]){re.escape(w)}(?![A-Za-z])", low):
-            found.add(w)
+    found: set[str] = set()
+    delta = _NEG_DELTA
+    out = _NEG_OUT
+    state = 0
+    for i, ch in enumerate(low):
+        state = delta[state].get(ch, 0)
+        if not out[state]:
+            continue
+        for marker in out[state]:
+            if marker in _NEG_EN_SET:
+                start = i - len(marker) + 1
+                if start > 0 and _is_ascii_letter(low[start - 1]):
+                    continue
+                if i + 1 < len(low) and _is_ascii_letter(low[i + 1]):
+                    continue
+            found.add(marker)
     return found
 
 
+class TextView:
+    """Lazily computed, memoized analyses of one text.
+
+    Every scoring helper needs the NFKC form and some tokenization of the same
+    ref/hyp strings; a view computes each of them at most once.  Returned lists
+    and sets are shared between callers and must not be mutated.
+    """
+
+    __slots__ = (
+        "text",
+        "_nfkc",
+        "_cer_tokens",
+        "_wer_tokens",
+        "_number_tokens",
+        "_canonical_numbers",
+        "_negations",
+        "_language",
+        "_char_counts",
+        "_repetition",
+    )
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._nfkc: str | None = None
+        self._cer_tokens: list[str] | None = None
+        self._wer_tokens: list[str] | None = None
+        self._number_tokens: list[str] | None = None
+        self._canonical_numbers: list[str] | None = None
+        self._negations: frozenset[str] | None = None
+        self._language: str | None = None
+        self._char_counts: tuple[int, int, int, int] | None = None
+        self._repetition: RepetitionStats | None = None
+
+    def __repr__(self) -> str:
+        return f"TextView({self.text!r})"
+
+    @property
+    def nfkc(self) -> str:
+        if self._nfkc is None:
+            self._nfkc = normalize_nfkc(self.text)
+        return self._nfkc
+
+    @property
+    def cer_tokens(self) -> list[str]:
+        if self._cer_tokens is None:
+            self._cer_tokens = _tokenize_cer_nfkc(self.nfkc)
+        return self._cer_tokens
+
+    @property
+    def wer_tokens(self) -> list[str]:
+        if self._wer_tokens is None:
+            self._wer_tokens = _tokenize_wer_nfkc(self.nfkc)
+        return self._wer_tokens
+
+    def tokens(self, lang_guess: str) -> list[str]:
+        """WER tokens for English, CER tokens otherwise (the unit used for alignment)."""
+        return self.wer_tokens if lang_guess == "en" else self.cer_tokens
+
+    @property
+    def number_tokens(self) -> list[str]:
+        if self._number_tokens is None:
+            self._number_tokens = _number_tokens_nfkc(self.nfkc)
+        return self._number_tokens
+
+    @property
+    def canonical_numbers(self) -> list[str]:
+        if self._canonical_numbers is None:
+            self._canonical_numbers = [canonicalize_number_token(t) for t in self.number_tokens]
+        return self._canonical_numbers
+
+    @property
+    def negations(self) -> frozenset[str]:
+        if self._negations is None:
+            self._negations = frozenset(_negation_markers_nfkc(self.nfkc))
+        return self._negations
+
+    @property
+    def char_counts(self) -> tuple[int, int, int, int]:
+        """(cjk, latin, spaces, length) of the NFKC form."""
+        if self._char_counts is None:
+            self._char_counts = _char_class_counts(self.nfkc)
+        return self._char_counts
+
+    @property
+    def language(self) -> str:
+        if self._language is None:
+            self._language = _language_from_counts(self.nfkc, self.char_counts)
+        return self._language
+
+    @property
+    def repetition(self) -> RepetitionStats:
+        """Repeated spans of the text as given (not NFKC), see `analyze_repetition`."""
+        if self._repetition is None:
+            self._repetition = analyze_repetition(self.text)
+        return self._repetition
+
+
+def text_view(text: str | TextView) -> TextView:
+    return text if isinstance(text, TextView) else TextView(text)
+
+
 def char_variety_penalty(text: str) -> float:
     text = normalize_nfkc(text)
     chars = [ch for ch in text if not ch.isspace()]
@@ -323,8 +520,8 @@ def control_char_penalty(text: str) -> float:
     return 1.0
 
 
-def plausibility_rule_score(text: str) -> float:
-    text = normalize_nfkc(text)
+def plausibility_rule_score(text: str | TextView) -> float:
+    text = text.nfkc if isinstance(text, TextView) else normalize_nfkc(text)
     length = len(text.strip())
     if length == 0:
         return 0.0
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import functools
 import re
 import unicodedata
 
 
 _OPENCC = None
+_T2S_TABLES = None
+
+T2S_CACHE_SIZE = 8192
 
 
 def _get_opencc_t2s():
@@ -23,12 +27,64 @@ def _get_opencc_t2s():
     return _OPENCC
 
 
+def _get_t2s_tables():
+    """Fast-path tables built from OpenCC's own t2s dictionaries.
+
+    Returns (trigger chars, bare phrases, phrase regex, translate table).
+
+    OpenCC's t2s chain is a single group [TSPhrases, TSCharacters]: the longest phrase
+    match wins and the remaining characters are mapped one by one (first candidate).
+    When no phrase key occurs, that is exactly `str.translate` with the character
+    table.  False when the dictionaries do not have that shape.
+    """
+    global _T2S_TABLES
+    if _T2S_TABLES is not None:
+        return _T2S_TABLES
+    cc = _get_opencc_t2s()
+    _T2S_TABLES = False
+    if not cc:
+        return _T2S_TABLES
+    try:
+        chain = cc._dict_chain_data
+        if len(chain) != 1 or len(chain[0]) != 2:
+            return _T2S_TABLES
+        (_, _, phrases), (max_len, min_len, chars) = chain[0]
+    except Exception:
+        return _T2S_TABLES
+    if max_len != 1 or min_len != 1:
+        return _T2S_TABLES
+
+    table = {ord(k): v.split(" ")[0] for k, v in chars.items() if not cc.split_chars_re.fullmatch(k)}
+    if len(table) != len(chars):
+        return _T2S_TABLES
+    # Any text OpenCC would change contains a character key or a phrase key; only a
+    # few phrase keys consist of characters that are not character keys themselves.
+    trigger = frozenset(chars)
+    bare_phrases = tuple(k for k in phrases if trigger.isdisjoint(k))
+    phrase_re = re.compile("|".join(re.escape(k) for k in sorted(phrases, key=len, reverse=True)))
+    _T2S_TABLES = (trigger, bare_phrases, phrase_re, table)
+    return _T2S_TABLES
+
+
+@functools.lru_cache(maxsize=T2S_CACHE_SIZE)
+def _convert_t2s(text: str) -> str:
+    cc = _get_opencc_t2s()
+    tables = _get_t2s_tables()
+    if tables:
+        trigger, bare_phrases, phrase_re, table = tables
+        if trigger.isdisjoint(text) and not any(k in text for k in bare_phrases):
+            return text
+        if phrase_re.search(text) is None:
+            return text.translate(table)
+    return cc.convert(text)
+
+
 def to_simplified(text: str) -> str:
     cc = _get_opencc_t2s()
     if not cc:
         return text
     try:
-        return cc.convert(text)
+        return _convert_t2s(text)
     except Exception:
         return text
 
@@ -39,4 +95,3 @@ def normalize_for_eval(text: str, *, t2s: bool = True) -> str:
         text = to_simplified(text)
     text = re.sub(r"\s+", " ", text).strip()
     return text
-